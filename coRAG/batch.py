@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+from src.agents import orchestrator as orchestrator_module
+from src.agents.orchestrator import CoRAGOrchestrator
+from src.config.init_logging import init_logging, log_startup
+from src.tools import tools as tools_module
+from openai import OpenAI
+from dotenv import load_dotenv
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.batch_runner import run_batch, print_report
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of queries with the coRAG orchestrator")
+    parser.add_argument("input", help="JSONL file of {\"id\": ..., \"query\": ...} records")
+    parser.add_argument("output", help="JSONL results file (appended to; rerun to resume)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--rate", type=float, default=None, help="Maximum query starts per second")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--no-resume", action="store_true", help="Re-run queries already in the output")
+    args = parser.parse_args()
+
+    init_logging()
+    log_startup()
+
+    # Per-query panels are noise when thousands of queries run at once
+    orchestrator_module.console.quiet = True
+    tools_module.console.quiet = True
+
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    orchestrator = CoRAGOrchestrator(client, max_retries=args.max_retries)
+
+    report = run_batch(
+        args.input,
+        args.output,
+        orchestrator.run,
+        concurrency=args.concurrency,
+        rate_limit=args.rate,
+        resume=not args.no_resume
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Thin command-line client for server.py. It only imports httpx and rich, so
+it starts in a fraction of the time main.py needs to load the agents.
+
+    python client.py "Describe the nations table."
+    python client.py --url http://localhost:8000
+"""
+import argparse
+import json
+import os
+
+import httpx
+from httpx_sse import connect_sse
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.prompt import Prompt
+from rich.text import Text
+
+console = Console()
+
+
+def show_event(event: str, data: dict):
+    if event == "attempt":
+        console.print(f"\n[bold cyan]Attempt {data['attempt']}/{data['max_attempts']}[/bold cyan]")
+    elif event == "research":
+        status = "answer drafted" if data.get("answer") else "no response"
+        console.print(f"[dim]Attempt {data['attempt']}: {status}, evaluating...[/dim]")
+    elif event == "evaluation":
+        if data["fully_answered"]:
+            console.print(f"[green]✓ {data['reason']}[/green]")
+        else:
+            console.print(f"[red]✗ {data['reason']}[/red]")
+
+
+def show_result(result: dict):
+    console.print("\n" + "=" * 60)
+    if result["success"]:
+        console.print(Panel(
+            Markdown(result["final_answer"]),
+            title=f"[bold green]✓ Final Answer (Attempt {result['attempts']})[/bold green]",
+            border_style="green"
+        ))
+    else:
+        console.print(Panel(
+            Text("Failed to get a satisfactory answer after maximum retries.", style="bold red"),
+            title="[bold red]✗ Failed[/bold red]",
+            border_style="red"
+        ))
+        if result["answer"]:
+            console.print("\n[yellow]Last response:[/yellow]")
+            console.print(Markdown(result["answer"]))
+
+
+def ask(url: str, query: str, timeout: float = 300.0) -> dict:
+    """Stream one query's progress from the server and return its result"""
+    with httpx.Client(timeout=httpx.Timeout(timeout, connect=5.0)) as client:
+        with connect_sse(client, "POST", f"{url}/query/stream", json={"query": query}) as source:
+            source.response.raise_for_status()
+            for sse in source.iter_sse():
+                data = json.loads(sse.data)
+                if sse.event == "result":
+                    return data
+                if sse.event == "error":
+                    raise RuntimeError(data["error"])
+                show_event(sse.event, data)
+    raise RuntimeError("Server closed the stream without a result")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask the coRAG server a question")
+    parser.add_argument("query", nargs="?", help="Prompted for when omitted")
+    parser.add_argument("--url", default=os.getenv("CORAG_SERVER_URL", "http://127.0.0.1:8000"))
+    args = parser.parse_args()
+
+    query = args.query or Prompt.ask("\n[bold green]Enter your query[/bold green]")
+    try:
+        result = ask(args.url.rstrip("/"), query)
+    except httpx.ConnectError:
+        console.print(f"[red]No coRAG server at {args.url}. Start one with: python server.py[/red]")
+        raise SystemExit(1)
+    show_result(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Long-lived coRAG service. The OpenAI client, retrieval backend, connection
+pools and result cache are built once at startup and shared by every request.
+
+    python server.py --port 8000
+    python client.py "What is the difference between the nations and regions table?"
+
+Endpoints:
+    GET  /health        liveness and warm-up status
+    GET  /stats         queries in flight and retrieval cache counters
+    POST /query         {"query": ...} -> final result as JSON
+    POST /query/stream  {"query": ...} -> SSE: attempt, research, evaluation, result
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from loguru import logger
+from openai import OpenAI
+from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
+
+from src.agents import orchestrator as orchestrator_module
+from src.agents.orchestrator import CoRAGOrchestrator
+from src.config.init_logging import init_logging, log_startup
+from src.tools import tools as tools_module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.retrieval import get_backend, get_rag_cache
+
+load_dotenv()
+
+
+class QueryRequest(BaseModel):
+    query: str
+
+
+def final_answer(answer: str) -> str:
+    """The 'Final Synthesis' section of a researcher answer, as main.py displays it"""
+    if not answer or "Final Synthesis" not in answer:
+        return answer
+    synthesis = answer.split("Final Synthesis", 1)[1].strip()
+    if synthesis.startswith("**"):
+        synthesis = synthesis[2:].strip()
+    if synthesis.startswith("-"):
+        synthesis = synthesis[1:].strip()
+    return synthesis
+
+
+def build_orchestrator() -> CoRAGOrchestrator:
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return CoRAGOrchestrator(
+        client,
+        max_retries=int(os.getenv("CORAG_MAX_RETRIES", 3)),
+        speculative_attempts=int(os.getenv("CORAG_SPECULATIVE_ATTEMPTS", 1))
+    )
+
+
+def create_app(orchestrator=None, max_concurrent: int = None) -> FastAPI:
+    """
+    Args:
+        orchestrator: Shared orchestrator (built from the environment at startup when None)
+        max_concurrent: Queries run at once; further requests wait for a slot
+    """
+    max_concurrent = max_concurrent or int(os.getenv("CORAG_MAX_CONCURRENT", 8))
+    state = {"orchestrator": orchestrator, "in_flight": 0, "served": 0}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Per-query panels would interleave across concurrent requests
+        orchestrator_module.console.quiet = True
+        tools_module.console.quiet = True
+        if state["orchestrator"] is None:
+            state["orchestrator"] = build_orchestrator()
+        # Build the retrieval backend and load the cache index before the first request
+        get_backend()
+        get_rag_cache()
+        state["executor"] = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="query")
+        state["slots"] = asyncio.Semaphore(max_concurrent)
+        logger.info(f"coRAG server ready: {max_concurrent} concurrent queries")
+        yield
+        state["executor"].shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(title="coRAG", lifespan=lifespan)
+
+    async def run_query(query: str, progress=None, cancel_event: threading.Event = None) -> dict:
+        # The orchestrator is synchronous; it runs on the pool while the loop keeps serving
+        async with state["slots"]:
+            state["in_flight"] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    state["executor"], state["orchestrator"].run, query, progress, cancel_event
+                )
+            finally:
+                state["in_flight"] -= 1
+                state["served"] += 1
+        return {**result, "final_answer": final_answer(result["answer"]) if result["success"] else None}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "ready": state["orchestrator"] is not None}
+
+    @app.get("/stats")
+    async def stats():
+        cache = get_rag_cache()
+        return {
+            "in_flight": state["in_flight"],
+            "served": state["served"],
+            "max_concurrent": max_concurrent,
+            "retrieval_cache": cache.stats.snapshot() if cache is not None else None
+        }
+
+    @app.post("/query")
+    async def query(request: QueryRequest):
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="query must not be empty")
+        return await run_query(request.query)
+
+    @app.post("/query/stream")
+    async def query_stream(request: QueryRequest):
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="query must not be empty")
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        # Set when the client goes away: the run stops before its next LLM call and frees its slot
+        cancel_event = threading.Event()
+
+        def progress(event: dict):
+            # Called on orchestrator threads; hand the event to the loop
+            if not cancel_event.is_set():
+                loop.call_soon_threadsafe(events.put_nowait, event)
+
+        async def stream():
+            task = asyncio.create_task(run_query(request.query, progress, cancel_event))
+            try:
+                while not (task.done() and events.empty()):
+                    getter = asyncio.ensure_future(events.get())
+                    try:
+                        done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        if not getter.done():
+                            getter.cancel()
+                    if getter in done:
+                        event = getter.result()
+                        yield {"event": event.pop("event"), "data": json.dumps(event)}
+                try:
+                    yield {"event": "result", "data": json.dumps(task.result())}
+                except Exception as e:
+                    logger.error(f"Query failed: {e}")
+                    yield {"event": "error", "data": json.dumps({"error": f"{type(e).__name__}: {e}"})}
+            finally:
+                if not task.done():
+                    logger.info("Stream closed before the query finished; cancelling it")
+                cancel_event.set()
+
+        return EventSourceResponse(stream())
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve coRAG over HTTP with warm clients and caches")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-concurrent", type=int, default=None, help="Queries run at once (default CORAG_MAX_CONCURRENT or 8)")
+    args = parser.parse_args()
+
+    init_logging()
+    log_startup()
+    uvicorn.run(create_app(max_concurrent=args.max_concurrent), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,158 @@
 import dotenv
 import os
 import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 dotenv.load_dotenv()
 from openai import OpenAI
-from ..tools.tools import rag_search_tool_schema, AVAILABLE_TOOLS
+from ..tools.tools import rag_search_tool_schema, rag_search_batch_tool_schema, AVAILABLE_TOOLS
 from rich.console import Console
 from rich.markdown import Markdown
 from loguru import logger
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.retrieval import EvidenceLedger, ContextPacker, search_many
+from shared.telemetry import phase, tool_span, traced_completion, bind_context
+from .pre_evaluator import PreEvaluator
 
 console = Console()
 
+
+class UsageMeter:
+    """Thread-safe LLM call and token counters shared by the agents of one run"""
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, completion):
+        usage = getattr(completion, "usage", None)
+        with self._lock:
+            self.llm_calls += 1
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens
+            }
+
+
 class ResearcherAgent:
-    def __init__(self, client: OpenAI, system_prompt: str):
+    def __init__(
+        self,
+        client: OpenAI,
+        system_prompt: str,
+        concurrent_tools: bool = True,
+        max_concurrency: int = 5,
+        ledger: EvidenceLedger = None,
+        context_token_budget: int = 6000,
+        usage: UsageMeter = None,
+        cancel_event: threading.Event = None
+    ):
+        """
+        Args:
+            client: OpenAI client instance
+            system_prompt: The system prompt for the researcher
+            concurrent_tools: Run all tool calls of a turn in parallel instead of one by one
+            max_concurrency: Maximum number of tool calls in flight at once
+            ledger: Evidence shared with other attempts; rag_search is served from it first
+            context_token_budget: Tokens of retrieved chunks kept per turn after
+                tag stripping and near-duplicate removal (None disables packing)
+            usage: Meter that LLM calls and tokens are recorded on
+            cancel_event: When set, the researcher stops before its next LLM call
+        """
         self.client = client
         self.system_prompt = system_prompt
+        self.concurrent_tools = concurrent_tools
+        self.max_concurrency = max(1, max_concurrency)
+        self.ledger = ledger
+        self.packer = ContextPacker(token_budget=context_token_budget) if context_token_budget else None
+        self.evidence = []  # Chunks shown to the model, used by the pre-evaluator
+        self.usage = usage or UsageMeter()
+        self.cancel_event = cancel_event
         self.memory = []
-        self.tools = [rag_search_tool_schema]
+        self.tools = [rag_search_tool_schema, rag_search_batch_tool_schema]
         if self.system_prompt is not None:
             self.memory.append({"role": "system", "content": self.system_prompt})
+
+    def _search(self, query: str) -> list:
+        """rag_search, served from the evidence ledger when one is attached"""
+        if self.ledger is not None:
+            return self.ledger.get_or_fetch(query, AVAILABLE_TOOLS["rag_search"])
+        return AVAILABLE_TOOLS["rag_search"](query)
+
+    def _execute_tool_call(self, tool_call):
+        """Run a single tool call, returning an error payload instead of raising"""
+        function_name = tool_call.function.name
+        with tool_span(function_name, tool_call_id=tool_call.id) as span:
+            try:
+                function_args = json.loads(tool_call.function.arguments)
+                if function_name not in AVAILABLE_TOOLS:
+                    span.record_error(f"Unknown tool: {function_name}")
+                    return {"error": f"Unknown tool: {function_name}"}
+                if function_name == "rag_search":
+                    return self._search(function_args["query"])
+                if function_name == "rag_search_batch":
+                    # Same fan-out as the tool, through this agent's ledger and concurrency cap
+                    logger.info(f"RAG SEARCH BATCH TOOL CALLED FOR QUERIES: {function_args['queries']}")
+                    return search_many(function_args["queries"], self._search, max_concurrency=self.max_concurrency)
+                return AVAILABLE_TOOLS[function_name](**function_args)
+            except Exception as e:
+                logger.error(f"Tool {function_name} failed for call {tool_call.id}: {e}")
+                span.record_error(e)
+                return {"error": f"{type(e).__name__}: {e}"}
+
+    def _execute_tool_calls(self, tool_calls) -> list:
+        """Execute tool calls, returning results in the same order as the calls"""
+        if not self.concurrent_tools or len(tool_calls) < 2:
+            return [self._execute_tool_call(tool_call) for tool_call in tool_calls]
+
+        max_workers = min(self.max_concurrency, len(tool_calls))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag") as pool:
+            # map() yields results in submission order, so tool messages stay deterministic
+            # bind_context keeps each tool span under the current attempt span
+            return list(pool.map(bind_context(self._execute_tool_call), tool_calls))
     
+    def _pack_tool_results(self, tool_results: list) -> list:
+        """Run all chunks retrieved this turn through the packer, keeping each result's shape"""
+        # rag_search returns a chunk list, rag_search_batch a {query: chunks} mapping
+        groups, slots = [], []
+        for i, result in enumerate(tool_results):
+            if isinstance(result, list):
+                slots.append((i, None))
+                groups.append(result)
+            elif isinstance(result, dict):
+                for query, chunks in result.items():
+                    if isinstance(chunks, list):
+                        slots.append((i, query))
+                        groups.append(chunks)
+
+        if self.packer is not None:
+            groups = self.packer.pack(groups)
+
+        packed_results = [dict(result) if isinstance(result, dict) else result for result in tool_results]
+        for (i, query), chunks in zip(slots, groups):
+            self.evidence.extend(chunks)
+            if query is None:
+                packed_results[i] = chunks
+            else:
+                packed_results[i][query] = chunks
+        return packed_results
+
+    def _cancelled(self) -> bool:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            logger.info("Research attempt cancelled")
+            return True
+        return False
+
     def __call__(self, message=None):
 
         logger.info(f"NEW QUERY: {message}")
@@ -26,12 +160,17 @@ class ResearcherAgent:
         if message:
             self.memory.append({"role": "user", "content": message})
         
-        response_message = self.client.chat.completions.create(
+        if self._cancelled():
+            return None
+        completion = traced_completion(
+            self.client,
             model="gpt-4o-mini",
             messages=self.memory,
             stream=False,
             tools=self.tools
-        ).choices[0].message
+        )
+        self.usage.record(completion)
+        response_message = completion.choices[0].message
 
         logger.info(f"RESPONSE MESSAGE: {response_message}")
         self.memory.append(response_message)
@@ -39,30 +178,31 @@ class ResearcherAgent:
         if response_message.tool_calls:
             logger.info(f"TOOL CALLS: {response_message.tool_calls}")
 
-            # Execute tool calls
-            for tool_call in response_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                if function_name in AVAILABLE_TOOLS:
-                    tool_result = AVAILABLE_TOOLS[function_name](**function_args)
-                    
-                    # Add tool result to memory
-                    self.memory.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(tool_result)
-                    })
-
-                    logger.info(f"TOOL RESULT: {tool_result}")
+            # Execute tool calls (concurrently when enabled)
+            tool_results = self._pack_tool_results(self._execute_tool_calls(response_message.tool_calls))
+
+            for tool_call, tool_result in zip(response_message.tool_calls, tool_results):
+                # Add tool result to memory
+                self.memory.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": json.dumps(tool_result)
+                })
+
+                logger.info(f"TOOL RESULT: {tool_result}")
 
             # Get final response after tool execution
-            final_response = self.client.chat.completions.create(
+            if self._cancelled():
+                return None
+            completion = traced_completion(
+                self.client,
                 model="gpt-4o-mini",
                 messages=self.memory,
                 stream=False,
                 tools=self.tools
-            ).choices[0].message
+            )
+            self.usage.record(completion)
+            final_response = completion.choices[0].message
 
             logger.info(f"FINAL RESPONSE: {final_response}")
             self.memory.append(final_response)
@@ -73,15 +213,51 @@ class ResearcherAgent:
     
 
 class EvaluatorAgent:
-    def __init__(self, client: OpenAI, system_prompt: str):
+    def __init__(self, client: OpenAI, system_prompt: str, pre_evaluator: PreEvaluator = None):
+        """
+        Args:
+            client: OpenAI client instance
+            system_prompt: The system prompt for the evaluator
+            pre_evaluator: Local scorer consulted first; clear passes and fails skip the LLM
+        """
         self.client = client
         self.system_prompt = system_prompt
+        self.pre_evaluator = pre_evaluator
     
-    def evaluate(self, initial_query: str, synthesized_response: str) -> dict:
+    def evaluate(self, initial_query: str, synthesized_response: str, evidence: list = None, usage: UsageMeter = None) -> dict:
         """
         Evaluate if the synthesized response fully answers the initial query.
-        Returns a dict with 'fully_answered' (bool) and 'reason' (str).
+        Returns a dict with 'fully_answered' (bool), 'reason' (str) and 'tier'
+        ('local' when the pre-evaluator decided, 'llm' otherwise).
         """
+        with phase("evaluate") as span:
+            result = self._evaluate(initial_query, synthesized_response, evidence, usage)
+            span.set(tier=result.get('tier'), fully_answered=result.get('fully_answered'))
+            return result
+
+    def _evaluate(self, initial_query: str, synthesized_response: str, evidence: list = None, usage: UsageMeter = None) -> dict:
+        decision = None
+        if self.pre_evaluator is not None and evidence is not None:
+            decision = self.pre_evaluator.decide(initial_query, synthesized_response, evidence)
+            logger.info(f"Pre-evaluation: {decision}")
+            if decision["verdict"] != "uncertain" and not decision.get("audit"):
+                self.pre_evaluator.log(initial_query, decision)
+                return self._local_result(decision)
+
+        result = self._llm_evaluate(initial_query, synthesized_response, usage)
+        if decision is not None:
+            self.pre_evaluator.log(initial_query, decision, llm_verdict=result['fully_answered'])
+        return result
+
+    def _local_result(self, decision: dict) -> dict:
+        if decision["verdict"] == "pass":
+            reason = f"All query facets are covered and grounded in the evidence (local score {decision['score']:.2f})"
+        else:
+            missing = ", ".join(decision["missing_facets"]) or "most facets"
+            reason = f"The answer does not cover: {missing} (local score {decision['score']:.2f})"
+        return {"fully_answered": decision["verdict"] == "pass", "reason": reason, "tier": "local"}
+
+    def _llm_evaluate(self, initial_query: str, synthesized_response: str, usage: UsageMeter = None) -> dict:
         # The EVALUATOR_PROMPT already instructs to return JSON, just provide the data
         evaluation_message = f"""
 Initial Query: {initial_query}
@@ -94,18 +270,23 @@ Synthesized Response: {synthesized_response}
             {"role": "user", "content": evaluation_message}
         ]
         
-        response = self.client.chat.completions.create(
+        completion = traced_completion(
+            self.client,
             model="gpt-4o-mini",
             messages=messages,
             stream=False,
             response_format={"type": "json_object"}
-        ).choices[0].message
+        )
+        if usage is not None:
+            usage.record(completion)
+        response = completion.choices[0].message
         
         try:
             result = json.loads(response.content)
             # Normalize the response to boolean
             result['fully_answered'] = result.get('fully_answered', 'NO').upper() == 'YES'
+            result['tier'] = 'llm'
             return result
         except json.JSONDecodeError:
             logger.error(f"Failed to parse evaluator response: {response.content}")
-            return {"fully_answered": False, "reason": "Failed to parse evaluation response"}
\ No newline at end of file
+            return {"fully_answered": False, "reason": "Failed to parse evaluation response", "tier": "llm"}
\ No newline at end of file
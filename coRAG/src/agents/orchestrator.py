@@ -1,90 +1,181 @@
 from openai import OpenAI
-from .agent import ResearcherAgent, EvaluatorAgent
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .agent import ResearcherAgent, EvaluatorAgent, UsageMeter
+from .pre_evaluator import PreEvaluator
 from ..prompts.system_prompts import RESEARCHER_PROMPT, EVALUATOR_PROMPT
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 from rich.markdown import Markdown
 from loguru import logger
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.retrieval import EvidenceLedger
+from shared.telemetry import phase, bind_context
 
 console = Console()
 
+
+class _EitherEvent:
+    """Set when either event is set; set() only sets the first (the run's own)"""
+
+    def __init__(self, own: threading.Event, caller: threading.Event = None):
+        self.own = own
+        self.caller = caller
+
+    def is_set(self) -> bool:
+        return self.own.is_set() or (self.caller is not None and self.caller.is_set())
+
+    def set(self):
+        self.own.set()
+
+
 class CoRAGOrchestrator:
-    def __init__(self, client: OpenAI, max_retries: int = 3):
+    def __init__(
+        self,
+        client: OpenAI,
+        max_retries: int = 3,
+        concurrent_tools: bool = True,
+        max_concurrency: int = 5,
+        context_token_budget: int = 6000,
+        pre_evaluator: PreEvaluator = None,
+        speculative_attempts: int = 1
+    ):
         """
         Initialize the CoRAG Orchestrator that manages the research-evaluate loop.
         
         Args:
             client: OpenAI client instance
             max_retries: Maximum number of retries if evaluation fails
+            concurrent_tools: Run the researcher's subqueries in parallel
+            max_concurrency: Maximum number of subqueries in flight at once
+            context_token_budget: Tokens of retrieved chunks the researcher keeps per turn
+            pre_evaluator: Enables tiered evaluation; the local scorer settles clear
+                passes/fails and only the uncertain band reaches the LLM evaluator
+            speculative_attempts: Research attempts run at once (1 = sequential). The
+                first attempt to pass wins and the rest are cancelled; at most
+                max_retries attempts are started in total
         """
         self.client = client
         self.max_retries = max_retries
-        self.evaluator = EvaluatorAgent(client, EVALUATOR_PROMPT)
+        self.concurrent_tools = concurrent_tools
+        self.max_concurrency = max_concurrency
+        self.context_token_budget = context_token_budget
+        self.speculative_attempts = max(1, min(speculative_attempts, max_retries))
+        self.evaluator = EvaluatorAgent(client, EVALUATOR_PROMPT, pre_evaluator=pre_evaluator)
     
-    def run(self, query: str) -> dict:
+    def run(self, query: str, progress=None, cancel_event: threading.Event = None) -> dict:
         """
         Run the research-evaluate loop with the given query.
         
         Args:
             query: The user's initial query
+            progress: Optional callback receiving event dicts ('attempt', 'research',
+                'evaluation') as the run advances; called from worker threads
+            cancel_event: When set (e.g. the caller went away), no further attempt is
+                started and running ones stop before their next LLM call
             
         Returns:
-            Dict with 'answer', 'attempts', and 'evaluation' keys
+            Dict with 'answer', 'attempts', 'evaluation', 'success' and 'usage' keys,
+            plus 'cancelled' when cancel_event stopped the run
         """
+        with phase("query", query=query, speculative_attempts=self.speculative_attempts) as span:
+            if self.speculative_attempts > 1:
+                result = self._run_speculative(query, progress, cancel_event)
+            else:
+                result = self._run_sequential(query, progress, cancel_event)
+            span.set(attempts=result['attempts'], success=result['success'])
+            return result
+
+    @staticmethod
+    def _notify(progress, event: str, **data):
+        """Send a progress event; a failing callback must not fail the run"""
+        if progress is None:
+            return
+        try:
+            progress({"event": event, **data})
+        except Exception as e:
+            logger.warning(f"Progress callback failed on {event}: {e}")
+
+    def _run_sequential(self, query: str, progress=None, cancel_event: threading.Event = None) -> dict:
+        """Run attempts one after another, each with a fresh researcher"""
         attempts = 0
+        # Evidence retrieved by any attempt is reused by later attempts
+        ledger = EvidenceLedger()
+        usage = UsageMeter()
         
         while attempts < self.max_retries:
+            if cancel_event is not None and cancel_event.is_set():
+                return self._cancelled_result(attempts, usage)
             attempts += 1
             
-            # Create a fresh researcher agent for each attempt (empty context)
-            console.print(f"\n[bold cyan]Attempt {attempts}/{self.max_retries}[/bold cyan]")
-            researcher = ResearcherAgent(self.client, RESEARCHER_PROMPT)
+            with phase("attempt", attempt=attempts):
+                # Create a fresh researcher agent for each attempt (empty context)
+                console.print(f"\n[bold cyan]Attempt {attempts}/{self.max_retries}[/bold cyan]")
+                self._notify(progress, "attempt", attempt=attempts, max_attempts=self.max_retries)
+                researcher = ResearcherAgent(
+                    self.client,
+                    RESEARCHER_PROMPT,
+                    concurrent_tools=self.concurrent_tools,
+                    max_concurrency=self.max_concurrency,
+                    ledger=ledger,
+                    context_token_budget=self.context_token_budget,
+                    usage=usage,
+                    cancel_event=cancel_event
+                )
             
-            # Get the synthesized response from the researcher
-            logger.info(f"Research attempt {attempts} for query: {query}")
-            synthesized_response = researcher(query)
+                # Get the synthesized response from the researcher
+                logger.info(f"Research attempt {attempts} for query: {query}")
+                synthesized_response = researcher(query)
+                if cancel_event is not None and cancel_event.is_set():
+                    return self._cancelled_result(attempts, usage)
+                logger.info(f"Evidence ledger: {len(ledger)} subqueries, {ledger.hits} reused, {ledger.misses} fetched")
+                self._notify(progress, "research", attempt=attempts, answer=synthesized_response)
             
-            if synthesized_response:
-                # Display the response
-                console.print(Panel(
-                    Markdown(synthesized_response),
-                    title="[bold green]Research Result[/bold green]",
-                    border_style="green"
-                ))
-                
-                # Evaluate the response
-                console.print("\n[bold yellow]Evaluating response...[/bold yellow]")
-                evaluation = self.evaluator.evaluate(query, synthesized_response)
-                
-                logger.info(f"Evaluation result: {evaluation}")
-                
-                # Display evaluation result
-                if evaluation['fully_answered']:
+                if synthesized_response:
+                    # Display the response
                     console.print(Panel(
-                        Text(f"✓ {evaluation['reason']}", style="bold green"),
-                        title="[bold green]Evaluation: PASSED[/bold green]",
+                        Markdown(synthesized_response),
+                        title="[bold green]Research Result[/bold green]",
                         border_style="green"
                     ))
+                
+                    # Evaluate the response
+                    console.print("\n[bold yellow]Evaluating response...[/bold yellow]")
+                    evaluation = self.evaluator.evaluate(query, synthesized_response, evidence=researcher.evidence, usage=usage)
+                
+                    logger.info(f"Evaluation result: {evaluation}")
+                    self._notify(progress, "evaluation", attempt=attempts, **evaluation)
+                
+                    # Display evaluation result
+                    if evaluation['fully_answered']:
+                        console.print(Panel(
+                            Text(f"✓ {evaluation['reason']}", style="bold green"),
+                            title="[bold green]Evaluation: PASSED[/bold green]",
+                            border_style="green"
+                        ))
                     
-                    return {
-                        'answer': synthesized_response,
-                        'attempts': attempts,
-                        'evaluation': evaluation,
-                        'success': True
-                    }
-                else:
-                    console.print(Panel(
-                        Text(f"✗ {evaluation['reason']}", style="bold red"),
-                        title="[bold red]Evaluation: FAILED[/bold red]",
-                        border_style="red"
-                    ))
+                        return {
+                            'answer': synthesized_response,
+                            'attempts': attempts,
+                            'evaluation': evaluation,
+                            'success': True,
+                            'usage': usage.as_dict()
+                        }
+                    else:
+                        console.print(Panel(
+                            Text(f"✗ {evaluation['reason']}", style="bold red"),
+                            title="[bold red]Evaluation: FAILED[/bold red]",
+                            border_style="red"
+                        ))
                     
-                    if attempts < self.max_retries:
-                        console.print(f"\n[yellow]Response incomplete. Retrying with fresh context...[/yellow]")
-            else:
-                logger.error(f"No response from researcher on attempt {attempts}")
-                console.print("[red]No response received from researcher.[/red]")
+                        if attempts < self.max_retries:
+                            console.print(f"\n[yellow]Response incomplete. Retrying with fresh context...[/yellow]")
+                else:
+                    logger.error(f"No response from researcher on attempt {attempts}")
+                    console.print("[red]No response received from researcher.[/red]")
         
         # Max retries reached
         console.print(Panel(
@@ -98,5 +189,129 @@ class CoRAGOrchestrator:
             'answer': synthesized_response if synthesized_response else None,
             'attempts': attempts,
             'evaluation': evaluation if 'evaluation' in locals() else {'fully_answered': False, 'reason': 'No valid response'},
-            'success': False
+            'success': False,
+            'usage': usage.as_dict()
+        }
+
+    def _cancelled_result(self, attempts: int, usage: UsageMeter) -> dict:
+        logger.info(f"Run cancelled by the caller after {attempts} attempts")
+        return {
+            'answer': None,
+            'attempts': attempts,
+            'evaluation': {'fully_answered': False, 'reason': 'Cancelled'},
+            'success': False,
+            'cancelled': True,
+            'usage': usage.as_dict()
+        }
+
+    def _attempt(self, attempt: int, query: str, ledger: EvidenceLedger, usage: UsageMeter, cancel_event: threading.Event, progress=None) -> dict:
+        """Run one speculative research + evaluation attempt on a worker thread"""
+        researcher = ResearcherAgent(
+            self.client,
+            RESEARCHER_PROMPT,
+            concurrent_tools=self.concurrent_tools,
+            max_concurrency=self.max_concurrency,
+            ledger=ledger,
+            context_token_budget=self.context_token_budget,
+            usage=usage,
+            cancel_event=cancel_event
+        )
+        logger.info(f"Speculative research attempt {attempt} for query: {query}")
+        self._notify(progress, "attempt", attempt=attempt, max_attempts=self.max_retries)
+        with phase("attempt", attempt=attempt) as span:
+            response = researcher(query)
+            self._notify(progress, "research", attempt=attempt, answer=response)
+            if not response or cancel_event.is_set():
+                span.set(cancelled=cancel_event.is_set())
+                return {'attempt': attempt, 'answer': response, 'evaluation': None}
+            evaluation = self.evaluator.evaluate(query, response, evidence=researcher.evidence, usage=usage)
+            logger.info(f"Speculative attempt {attempt} evaluation: {evaluation}")
+            self._notify(progress, "evaluation", attempt=attempt, **evaluation)
+            return {'attempt': attempt, 'answer': response, 'evaluation': evaluation}
+
+    def _run_speculative(self, query: str, progress=None, caller_cancel: threading.Event = None) -> dict:
+        """
+        Run up to speculative_attempts research attempts at once, evaluating
+        each as it finishes. The first passing attempt is returned and the
+        others are cancelled before their next LLM call. Token spend of every
+        attempt, including cancelled ones, is reported under 'usage': the
+        result waits for calls already in flight to come back.
+        """
+        ledger = EvidenceLedger()
+        usage = UsageMeter()
+        # Set by a passing attempt here, or by the caller
+        cancel_event = _EitherEvent(threading.Event(), caller_cancel)
+        started = finished = 0
+        last = {'answer': None, 'evaluation': None}
+
+        console.print(f"\n[bold cyan]Speculative mode: {self.speculative_attempts} attempts in parallel (max {self.max_retries})[/bold cyan]")
+        pool = ThreadPoolExecutor(max_workers=self.speculative_attempts, thread_name_prefix="attempt")
+        pending = set()
+        try:
+            while started < self.speculative_attempts:
+                started += 1
+                pending.add(pool.submit(bind_context(self._attempt), started, query, ledger, usage, cancel_event, progress))
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished += 1
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        logger.error(f"Speculative attempt failed: {e}")
+                        outcome = {'attempt': None, 'answer': None, 'evaluation': None}
+                    evaluation = outcome['evaluation']
+                    if outcome['answer']:
+                        last = outcome
+                    if evaluation and evaluation['fully_answered']:
+                        cancel_event.set()
+                        for other in pending:
+                            other.cancel()
+                        # Attempts already running stop before their next LLM call; wait for
+                        # the call in flight so its tokens are counted
+                        wait(pending)
+                        console.print(Panel(
+                            Markdown(outcome['answer']),
+                            title=f"[bold green]Research Result (attempt {outcome['attempt']})[/bold green]",
+                            border_style="green"
+                        ))
+                        console.print(Panel(
+                            Text(f"✓ {evaluation['reason']}", style="bold green"),
+                            title="[bold green]Evaluation: PASSED[/bold green]",
+                            border_style="green"
+                        ))
+                        logger.info(f"Speculative run finished: attempt {outcome['attempt']} passed, usage {usage.as_dict()}")
+                        return {
+                            'answer': outcome['answer'],
+                            'attempts': started,
+                            'evaluation': evaluation,
+                            'success': True,
+                            'usage': {**usage.as_dict(), 'cancelled_attempts': started - finished}
+                        }
+                    if evaluation:
+                        console.print(f"[red]✗ Attempt {outcome['attempt']} failed evaluation: {evaluation['reason']}[/red]")
+                    # Keep the number of attempts in flight at the cap until max_retries is reached
+                    if started < self.max_retries and not cancel_event.is_set():
+                        started += 1
+                        pending.add(pool.submit(bind_context(self._attempt), started, query, ledger, usage, cancel_event, progress))
+        finally:
+            cancel_event.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        if caller_cancel is not None and caller_cancel.is_set():
+            return self._cancelled_result(started, usage)
+
+        console.print(Panel(
+            Text(f"Maximum retries ({self.max_retries}) reached without satisfactory answer.", 
+                 style="bold red"),
+            title="[bold red]Final Status: FAILED[/bold red]",
+            border_style="red"
+        ))
+        return {
+            'answer': last['answer'],
+            'attempts': started,
+            'evaluation': last['evaluation'] or {'fully_answered': False, 'reason': 'No valid response'},
+            'success': False,
+            'usage': {**usage.as_dict(), 'cancelled_attempts': 0}
         }
\ No newline at end of file
@@ -0,0 +1,188 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from loguru import logger
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.retrieval.embeddings import STOPWORDS, load_embedder
+
+_WORD_RE = re.compile(r"[a-z0-9_]+|[^\sa-z0-9_]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Words that frame a question rather than name a facet of it
+FRAMING_WORDS = frozenset("""
+difference differences between compare comparison versus vs relationship
+relate related mean meaning work works used use purpose information details whats
+""".split())
+
+# Phrases the researcher uses when retrieval came back empty for a facet
+MISSING_INFO_RE = re.compile(
+    r"not (?:found|available|mentioned|provided)|no (?:specific )?information|could not find|unable to find",
+    re.IGNORECASE
+)
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def noun_phrases(text: str) -> list:
+    """
+    Approximate noun phrases as runs of content words between stopwords
+    and punctuation, e.g. "difference between the nations and regions
+    table" -> ["nations", "regions table"].
+    """
+    phrases, current = [], []
+    for token in _WORD_RE.findall(text.lower()):
+        if token.isalnum() or "_" in token:
+            if token not in STOPWORDS and token not in FRAMING_WORDS:
+                current.append(_stem(token))
+                continue
+        if current:
+            phrases.append(" ".join(current))
+            current = []
+    if current:
+        phrases.append(" ".join(current))
+    return list(dict.fromkeys(phrases))
+
+
+class PreEvaluator:
+    """
+    Cheap local scorer that runs ahead of the LLM evaluator.
+
+    Combines facet coverage (share of the query's noun phrases whose words
+    all appear in the synthesis) with grounding (mean best cosine similarity
+    of synthesis sentences to the retrieved evidence). Scores at or above
+    `pass_threshold` pass and at or below `fail_threshold` fail without an
+    LLM call; everything in between is left to the LLM evaluator.
+    """
+
+    def __init__(
+        self,
+        pass_threshold: float = 0.8,
+        fail_threshold: float = 0.35,
+        coverage_weight: float = 0.7,
+        embedder=None,
+        log_path: str = None,
+        audit_rate: float = 0.0
+    ):
+        """
+        Args:
+            pass_threshold: Score at or above which the answer passes locally
+            fail_threshold: Score at or below which the answer fails locally
+            coverage_weight: Weight of facet coverage vs. evidence grounding
+            embedder: Object with embed(list[str]) -> normalised np.ndarray
+            log_path: JSONL file of scored cases and LLM verdicts, used by calibrate()
+            audit_rate: Share of locally decided cases still sent to the LLM so
+                the log has verdicts across the whole score range
+        """
+        self.pass_threshold = pass_threshold
+        self.fail_threshold = fail_threshold
+        self.coverage_weight = coverage_weight
+        self.embedder = embedder or load_embedder()
+        self.log_path = log_path
+        self.audit_rate = audit_rate
+        self._log_lock = threading.Lock()
+
+    def coverage(self, query: str, synthesis: str) -> tuple:
+        """Return (share of covered facets, facets missing from the synthesis)"""
+        facets = noun_phrases(query)
+        if not facets:
+            return 1.0, []
+        answer_words = {_stem(w) for w in _WORD_RE.findall(synthesis.lower())}
+        missing = [f for f in facets if not all(word in answer_words for word in f.split())]
+        return 1 - len(missing) / len(facets), missing
+
+    def grounding(self, synthesis: str, evidence: list) -> float:
+        """Mean over synthesis sentences of the best cosine similarity to any evidence chunk"""
+        sentences = [s for s in _SENTENCE_RE.split(synthesis) if len(s.split()) > 3]
+        if not sentences or not evidence:
+            return 0.0
+        similarities = self.embedder.embed(sentences) @ self.embedder.embed(evidence).T
+        return float(similarities.max(axis=1).clip(min=0).mean())
+
+    def score(self, query: str, synthesis: str, evidence: list) -> dict:
+        coverage, missing = self.coverage(query, synthesis)
+        grounding = self.grounding(synthesis, evidence)
+        score = self.coverage_weight * coverage + (1 - self.coverage_weight) * grounding
+        return {
+            "score": score,
+            "coverage": coverage,
+            "grounding": grounding,
+            "missing_facets": missing,
+            "missing_info": bool(MISSING_INFO_RE.search(synthesis))
+        }
+
+    def decide(self, query: str, synthesis: str, evidence: list) -> dict:
+        """
+        Score the answer and return the scores plus a 'verdict' of
+        'pass', 'fail' or 'uncertain' (defer to the LLM).
+        """
+        scores = self.score(query, synthesis, evidence)
+        if scores["score"] <= self.fail_threshold:
+            verdict = "fail"
+        elif scores["score"] >= self.pass_threshold and not scores["missing_info"]:
+            # An answer admitting a facet was not found is never passed locally
+            verdict = "pass"
+        else:
+            verdict = "uncertain"
+        if verdict != "uncertain" and random.random() < self.audit_rate:
+            scores["audit"] = True
+        scores["verdict"] = verdict
+        return scores
+
+    def log(self, query: str, decision: dict, llm_verdict: bool = None):
+        """Append a scored case (and the LLM verdict when one was obtained) for calibration"""
+        if not self.log_path:
+            return
+        record = {"time": time.time(), "query": query, **decision, "llm_fully_answered": llm_verdict}
+        with self._log_lock, open(self.log_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def calibrate(log_path: str, target_precision: float = 0.95, min_support: int = 20) -> dict:
+    """
+    Pick thresholds from logged cases that have an LLM verdict.
+
+    The pass threshold is the lowest score above which at least
+    `target_precision` of LLM verdicts were YES; the fail threshold is the
+    highest score below which at least `target_precision` were NO. Each
+    needs `min_support` cases, otherwise it is returned as None (keep
+    deferring that side to the LLM).
+    """
+    with open(log_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    labelled = sorted(
+        (r["score"], r["llm_fully_answered"]) for r in records if r.get("llm_fully_answered") is not None
+    )
+
+    pass_threshold = None
+    for i in range(len(labelled)):
+        above = labelled[i:]
+        if len(above) < min_support:
+            break
+        if sum(verdict for _, verdict in above) / len(above) >= target_precision:
+            pass_threshold = labelled[i][0]
+            break
+
+    fail_threshold = None
+    for i in range(len(labelled), 0, -1):
+        below = labelled[:i]
+        if len(below) < min_support:
+            break
+        if sum(not verdict for _, verdict in below) / len(below) >= target_precision:
+            fail_threshold = labelled[i - 1][0]
+            break
+
+    return {"pass_threshold": pass_threshold, "fail_threshold": fail_threshold, "labelled_cases": len(labelled)}
+
+
+if __name__ == "__main__":
+    # python -m src.agents.pre_evaluator logs/pre_eval.jsonl [target_precision]
+    result = calibrate(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 0.95)
+    logger.info(f"Calibrated thresholds: {result}")
+    print(json.dumps(result, indent=2))
@@ -1,9 +1,11 @@
-import requests
 import json
 from dotenv import load_dotenv
 import os
+import sys
 from loguru import logger
 from rich.console import Console
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.retrieval import search, search_many
 
 load_dotenv()
 console = Console()
@@ -17,61 +19,32 @@ def rag_search(query: str):
     # Display the query being run in grey
     console.print(f"[bright_black]Running subquery: {query}[/bright_black]")
     
-    url = "https://api.vectara.io/v2/chats"
-
-    headers = {
-        "customer-id": "322088514",
-        "Content-Type": "application/json",
-        "x-api-key": os.getenv("VECTARA_API_KEY")
-    }
-
-    data = {
-    "query": query,
-    "search": {
-        "corpora": [
-        {
-            "corpus_key": "TPCH_dataset",
-            "metadata_filter": "",
-            "lexical_interpolation": 0.005,
-            "custom_dimensions": {}
-        }
-        ],
-        "offset": 0,
-        "limit": 25,
-        "context_configuration": {
-        "sentences_before": 2,
-        "sentences_after": 2,
-        "start_tag": "%START_SNIPPET%",
-        "end_tag": "%END_SNIPPET%"
-        },
-        "reranker": {
-        "type": "customer_reranker",
-        "reranker_id": "rnk_272725719"
-        }
-    },
-    "stream_response": False,
-    "generation": {
-        "generation_preset_name": "vectara-summary-table-md-query-ext-jan-2025-gpt-4o",
-        "max_used_search_results": 5,
-        "response_language": "eng",
-        "enable_factual_consistency_score": True
-    },
-    "chat": {
-        "store": True
-    }
-    }
-
-    # Just parse the response body as JSON
-    response = requests.post(url, headers=headers, json=data)
-    obj = response.json()
+    # Served from the exact/semantic result cache, else the pooled Vectara client
+    search_results = search(query)
     chunks = []
 
-    for _ in obj["search_results"]:
+    for _ in search_results:
         if _['score'] > 0.3:
             chunks.append(_["text"])
     
     return chunks
 
+# Subqueries one rag_search_batch call searches at once. This is a setting, not a
+# tool argument: the model only chooses the queries. ResearcherAgent fans out with
+# its own max_concurrency and evidence ledger instead.
+BATCH_MAX_CONCURRENCY = int(os.getenv("RAG_BATCH_CONCURRENCY", 5))
+
+
+def rag_search_batch(queries: list):
+    """
+    Run several RAG searches in one tool call.
+
+    Queries are deduplicated and fanned out with bounded concurrency.
+    Returns a mapping of query -> chunks.
+    """
+    logger.info(f"RAG SEARCH BATCH TOOL CALLED FOR QUERIES: {queries}")
+    return search_many(queries, rag_search, max_concurrency=BATCH_MAX_CONCURRENCY)
+
 # OpenAI function schema for the rag_search tool
 rag_search_tool_schema = {
     "type": "function",
@@ -91,9 +64,30 @@ rag_search_tool_schema = {
     }
 }
 
+# OpenAI function schema for the rag_search_batch tool
+rag_search_batch_tool_schema = {
+    "type": "function",
+    "function": {
+        "name": "rag_search_batch",
+        "description": "Run several RAG searches over the knowledge base in a single call. Use this to search all subqueries at once. Returns an object mapping each query to its list of relevant text chunks.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The search queries to run, one per facet of the user's question"
+                }
+            },
+            "required": ["queries"]
+        }
+    }
+}
+
 # Tool registry for easy access
 AVAILABLE_TOOLS = {
-    "rag_search": rag_search
+    "rag_search": rag_search,
+    "rag_search_batch": rag_search_batch
 }
 
 
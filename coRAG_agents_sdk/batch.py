@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import os
+import sys
+from src.agents import orchestrator as orchestrator_module
+from src.agents.orchestrator import CoRAGOrchestratorSDK
+from src.config.init_logging import init_logging, log_startup
+from src.tools import tools as tools_module
+from dotenv import load_dotenv
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.batch_runner import run_batch, print_report
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of queries with the Agents SDK orchestrator")
+    parser.add_argument("input", help="JSONL file of {\"id\": ..., \"query\": ...} records")
+    parser.add_argument("output", help="JSONL results file (appended to; rerun to resume)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--rate", type=float, default=None, help="Maximum query starts per second")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--no-resume", action="store_true", help="Re-run queries already in the output")
+    args = parser.parse_args()
+
+    init_logging()
+    log_startup()
+
+    # Per-query panels are noise when thousands of queries run at once
+    orchestrator_module.console.quiet = True
+    tools_module.console.quiet = True
+
+    orchestrator = CoRAGOrchestratorSDK(max_retries=args.max_retries)
+
+    report = run_batch(
+        args.input,
+        args.output,
+        orchestrator.run,
+        concurrency=args.concurrency,
+        rate_limit=args.rate,
+        resume=not args.no_resume,
+        # Runner.run_sync needs an event loop in every worker thread
+        thread_initializer=lambda: asyncio.set_event_loop(asyncio.new_event_loop())
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import dotenv
 import os
 dotenv.load_dotenv()
 from agents import Agent
-from ..tools.tools import rag_search
+from ..tools.tools import rag_search, rag_search_batch
 from loguru import logger
 from ..models.models import EvaluationResult
 
@@ -14,7 +14,7 @@ def create_researcher_agent(system_prompt: str) -> Agent:
         system_prompt: The system prompt/instructions for the agent
         
     Returns:
-        An Agent configured with the researcher prompt and RAG search tool
+        An Agent configured with the researcher prompt and RAG search tools
     """
     logger.info("Creating researcher agent with OpenAI Agents SDK")
     
@@ -23,7 +23,7 @@ def create_researcher_agent(system_prompt: str) -> Agent:
         name="Researcher",
         model="gpt-4o-mini",
         instructions=system_prompt,
-        tools=[rag_search]
+        tools=[rag_search, rag_search_batch]
     )
     
     return agent
@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from agents import Runner
 from .agent import create_researcher_agent, create_evaluator_agent
 from ..prompts.system_prompts import RESEARCHER_PROMPT, EVALUATOR_PROMPT
@@ -11,31 +13,91 @@ console = Console()
 
 
 class CoRAGOrchestratorSDK:
-    def __init__(self, max_retries: int = 3):
+    def __init__(self, max_retries: int = 3, timeout: float = None):
         """
         Initialize the CoRAG Orchestrator for OpenAI Agents SDK
         
         Args:
             max_retries: Maximum number of retries if evaluation fails
+            timeout: Default seconds allowed per query, across all attempts (None = no limit)
         """
         self.max_retries = max_retries
+        self.timeout = timeout
+        # Event loop run() owns on each calling thread
+        self._local = threading.local()
     
-    def run(self, query: str) -> dict:
+    def run(self, query: str, timeout: float = None) -> dict:
+        """
+        Blocking wrapper around arun(), for callers without an event loop.
+        Each calling thread keeps one event loop across calls, so the SDK's
+        HTTP connections stay pooled; a loop closed in between is replaced.
+        """
+        loop = getattr(self._local, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = self._local.loop = asyncio.new_event_loop()
+        return loop.run_until_complete(self.arun(query, timeout=timeout))
+
+    async def arun(self, query: str, timeout: float = None) -> dict:
         """
         Run the research-evaluate loop with the given query using OpenAI Agents SDK.
+        Many queries can run concurrently on one event loop. Cancelling the
+        awaiting task cancels the in-flight agent run.
         
         Args:
             query: The user's initial query
+            timeout: Seconds allowed for this query (defaults to the orchestrator's timeout)
             
         Returns:
-            Dict with 'answer', 'attempts', and 'evaluation' keys
+            Dict with 'answer', 'attempts', 'evaluation' and 'success' keys
+            ('timed_out' is added when the query ran out of time)
         """
+        timeout = timeout if timeout is not None else self.timeout
+        # Progress of the current query, so a timeout can still report the last answer
+        state = {'answer': None, 'attempts': 0, 'evaluation': None}
+        try:
+            return await asyncio.wait_for(self._arun(query, state), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Query timed out after {timeout}s on attempt {state['attempts']}: {query}")
+            console.print(f"[red]Timed out after {timeout}s[/red]")
+            return {
+                'answer': state['answer'],
+                'attempts': state['attempts'],
+                'evaluation': {'fully_answered': False, 'reason': f'Timed out after {timeout}s'},
+                'success': False,
+                'timed_out': True
+            }
+        except asyncio.CancelledError:
+            logger.info(f"Query cancelled on attempt {state['attempts']}: {query}")
+            raise
+
+    async def arun_many(self, queries: list, max_concurrency: int = 8, timeout: float = None) -> list:
+        """
+        Answer independent queries concurrently on the current event loop.
+
+        Args:
+            queries: The queries to answer
+            max_concurrency: Maximum number of queries in flight at once
+            timeout: Seconds allowed per query
+
+        Returns:
+            Results in the same order as the queries
+        """
+        slots = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def bounded(query):
+            async with slots:
+                return await self.arun(query, timeout=timeout)
+
+        return await asyncio.gather(*(bounded(query) for query in queries))
+
+    async def _arun(self, query: str, state: dict) -> dict:
         attempts = 0
         synthesized_response = None
         evaluation = None
         
         while attempts < self.max_retries:
             attempts += 1
+            state['attempts'] = attempts
             
             # Create a fresh researcher agent for each attempt (empty context)
             console.print(f"\n[bold cyan]Attempt {attempts}/{self.max_retries}[/bold cyan]")
@@ -46,10 +108,11 @@ class CoRAGOrchestratorSDK:
             
             try:
                 # Run the researcher agent
-                result = Runner.run_sync(researcher, query)
+                result = await Runner.run(researcher, query)
                 logger.info(f"input to list (for context manager): {result.to_input_list()}")
 
                 synthesized_response = result.final_output
+                state['answer'] = synthesized_response or state['answer']
                 logger.info(f"SYNTHESIZED RESPONSE: {synthesized_response}")
                 
                 if synthesized_response:
@@ -72,7 +135,7 @@ Synthesized Response: {synthesized_response}
 """
                     
                     # Run the evaluator - it returns RunResult with EvaluationResult in final_output
-                    eval_result = Runner.run_sync(evaluator, evaluation_message)
+                    eval_result = await Runner.run(evaluator, evaluation_message)
                     logger.info(f"EVALUATION RESULT: {eval_result}")
                     # Access the final_output from RunResult which contains the EvaluationResult (Pydantic model)
                     # Convert to dict for compatibility with rest of code
@@ -1,3 +1,3 @@
-from .tools import rag_search
+from .tools import rag_search, rag_search_batch
 
-__all__ = ['rag_search']
\ No newline at end of file
+__all__ = ['rag_search', 'rag_search_batch']
\ No newline at end of file
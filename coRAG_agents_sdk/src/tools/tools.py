@@ -1,17 +1,42 @@
-import requests
+import asyncio
 import json
 from dotenv import load_dotenv
 import os
+import sys
 from agents import function_tool
 from rich.console import Console
 from loguru import logger
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.retrieval import search, search_many
 
 load_dotenv()
 console = Console()
 
 
+def search_chunks(query: str) -> list:
+    """Run a single RAG search and return the matching text chunks"""
+    # Log the tool call with the query being searched
+    logger.info(f"RAG_SEARCH TOOL CALLED - Query: '{query}'")
+    
+    # Display the query being run
+    console.print(f"[bright_black]Running query: {query}[/bright_black]")
+    
+    # Served from the exact/semantic result cache, else the pooled Vectara client
+    search_results = search(query)
+    chunks = []
+
+    for result in search_results:
+        chunks.append(result["text"])
+    
+    logger.info(f"RAG_SEARCH TOOL COMPLETED - Found {len(chunks)} chunks for query: '{query}'")
+    
+    return chunks
+
+
+# The tools are async so a search does not block the event loop other queries
+# run on; the blocking lookup (cache + HTTP) runs on the loop's thread pool.
 @function_tool
-def rag_search(query: str) -> list:
+async def rag_search(query: str) -> list:
     """
     Search through a knowledge base using RAG (Retrieval Augmented Generation) 
     to find relevant information about topics like order calculations, status criteria, and business logic.
@@ -22,64 +47,20 @@ def rag_search(query: str) -> list:
     Returns:
         A list of relevant text chunks from the knowledge base
     """
-    # Log the tool call with the query being searched
-    logger.info(f"RAG_SEARCH TOOL CALLED - Query: '{query}'")
-    
-    # Display the query being run
-    console.print(f"[bright_black]Running query: {query}[/bright_black]")
-    
-    url = "https://api.vectara.io/v2/chats"
+    return await asyncio.to_thread(search_chunks, query)
 
-    headers = {
-        "customer-id": "322088514",
-        "Content-Type": "application/json",
-        "x-api-key": os.getenv("VECTARA_API_KEY")
-    }
 
-    data = {
-        "query": query,
-        "search": {
-            "corpora": [
-                {
-                    "corpus_key": "TPCH_dataset",
-                    "metadata_filter": "",
-                    "lexical_interpolation": 0.005,
-                    "custom_dimensions": {}
-                }
-            ],
-            "offset": 0,
-            "limit": 25,
-            "context_configuration": {
-                "sentences_before": 2,
-                "sentences_after": 2,
-                "start_tag": "%START_SNIPPET%",
-                "end_tag": "%END_SNIPPET%"
-            },
-            "reranker": {
-                "type": "customer_reranker",
-                "reranker_id": "rnk_272725719"
-            }
-        },
-        "stream_response": False,
-        "generation": {
-            "generation_preset_name": "vectara-summary-table-md-query-ext-jan-2025-gpt-4o",
-            "max_used_search_results": 5,
-            "response_language": "eng",
-            "enable_factual_consistency_score": True
-        },
-        "chat": {
-            "store": True
-        }
-    }
-
-    # Just parse the response body as JSON
-    response = requests.post(url, headers=headers, json=data)
-    obj = response.json()
-    chunks = []
-
-    for result in obj["search_results"]:
-        chunks.append(result["text"])
-    
-    logger.info(f"RAG_SEARCH TOOL COMPLETED - Found {len(chunks)} chunks for query: '{query}'")
+@function_tool
+async def rag_search_batch(queries: list[str]) -> dict:
+    """
+    Run several RAG searches over the knowledge base in a single call.
+    Use this to search all subqueries at once.
     
-    return chunks
\ No newline at end of file
+    Args:
+        queries: The search queries to run, one per facet of the user's question
+        
+    Returns:
+        An object mapping each query to its list of relevant text chunks
+    """
+    logger.info(f"RAG_SEARCH_BATCH TOOL CALLED - Queries: {queries}")
+    return await asyncio.to_thread(search_many, queries, search_chunks)
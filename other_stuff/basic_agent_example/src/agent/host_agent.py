@@ -6,13 +6,18 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from models.schema import ThoughtResponse
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+from shared.telemetry import phase, tool_span, traced_completion
+from shared.memory import MemoryManager
 
 class HostAgent:
-    def __init__(self, client : LLM, system_prompt : str):
+    def __init__(self, client : LLM, system_prompt : str, memory_token_budget: int = 8000, keep_turns: int = 3):
         self.client = client
         self.system_prompt = system_prompt
         self.memory = []  # Full memory for debugging
         self.agent_memory = []  # Clean memory for agent
+        # Compacts older THOUGHT/ACTION entries once agent_memory exceeds the budget (None disables)
+        self.memory_manager = MemoryManager(memory_token_budget, keep_turns=keep_turns) if memory_token_budget else None
         self.tools = available_tools
         self.tool_schemas = tools
         self.goal = None
@@ -25,20 +30,27 @@ class HostAgent:
         self.memory.append(message)
         self.agent_memory.append(message)
     
+    def fit_memory(self):
+        """Keep agent_memory within its token budget; the debug memory stays complete"""
+        if self.memory_manager is not None:
+            self.agent_memory = self.memory_manager.fit(self.agent_memory)
+
     def trace(self, tool_call_id, function_name, function_args, content):
         """Convert tool call and result to plaintext description"""
         logger.info(f"Converted tool call {tool_call_id} to plaintext")
         return f"Called tool {function_name} with args {function_args} and got {content} as the output"
     
     def __call__(self, message=None):
-        if message:
-            logger.info(f"User message: {message}")
-            self.append_to_both_memories("user", message)
-            # Extract and set goal from user's query (only on first message)
-            logger.info(f"Extracting goal from user's query")
-            self.goal = self.extract_goal(message)
-            print(f"Goal: {self.goal}")
-        result = self.execute()
+        with phase("turn", agent="basic_host") as span:
+            if message:
+                logger.info(f"User message: {message}")
+                self.append_to_both_memories("user", message)
+                # Extract and set goal from user's query (only on first message)
+                logger.info(f"Extracting goal from user's query")
+                self.goal = self.extract_goal(message)
+                print(f"Goal: {self.goal}")
+            result = self.execute()
+            span.set(answered=bool(result))
         return result
 
     def _planner_messages(self):
@@ -60,7 +72,8 @@ class HostAgent:
     
     def extract_goal(self, user_query):
         """Extract a clear, actionable goal from the user's query"""
-        goal_completion = self.client.chat.completions.create(
+        goal_completion = traced_completion(
+            self.client,
             model=self.client.model,
             messages=[
                 {"role": "system", "content": "Convert the user's query into a clear, specific goal statement. Be concise and action-oriented."},
@@ -72,6 +85,11 @@ class HostAgent:
 
     def think(self):
         """Plan next step with structured output; no tool calls allowed."""
+        with phase("think"):
+            self.fit_memory()
+            return self._think()
+
+    def _think(self):
         planner_guard = (
             "You are the planning module. Do NOT call tools. "
             "Reply ONLY with JSON that matches the ThoughtResponse schema. "
@@ -99,7 +117,8 @@ class HostAgent:
         json_schema["properties"]["goal"]["const"] = self.goal
 
         # IMPORTANT: do NOT pass tool_choice or tools here
-        completion = self.client.chat.completions.create(
+        completion = traced_completion(
+            self.client,
             model=self.client.model,
             messages=messages,
             response_format={
@@ -135,7 +154,13 @@ class HostAgent:
     
     def act(self):
         """Decide on and execute an action using tools"""
-        completion = self.client.chat.completions.create(
+        with phase("act"):
+            self.fit_memory()
+            return self._act()
+
+    def _act(self):
+        completion = traced_completion(
+            self.client,
             model=self.client.model,
             messages=self.agent_memory,
             tools=self.tool_schemas,
@@ -159,20 +184,23 @@ class HostAgent:
                 print(f"Action: {function_name}({function_args})")
                 
                 # Execute the tool
-                if function_name in self.tools:
-                    try:
-                        result = self.tools[function_name](**function_args)
-                        # Convert dict result to string for display
-                        if isinstance(result, dict):
-                            result_str = str(result)
-                        else:
-                            result_str = str(result)
-                    except Exception as e:
-                        result = f"Error: {str(e)}"
+                with tool_span(function_name, tool_call_id=tool_call.id) as span:
+                    if function_name in self.tools:
+                        try:
+                            result = self.tools[function_name](**function_args)
+                            # Convert dict result to string for display
+                            if isinstance(result, dict):
+                                result_str = str(result)
+                            else:
+                                result_str = str(result)
+                        except Exception as e:
+                            span.record_error(e)
+                            result = f"Error: {str(e)}"
+                            result_str = result
+                    else:
+                        span.record_error("Tool not found")
+                        result = "Tool not found"
                         result_str = result
-                else:
-                    result = "Tool not found"
-                    result_str = result
                 
                 print(f"Observation: {result_str}")
                 
@@ -1,11 +1,16 @@
 from loguru import logger
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.log_writer import init_file_logging
 
-def init_logging():
-    log_file_path = "/Users/natelevinson/Desktop/practice/logs/workflow_react.log"
-    logger.add(log_file_path, rotation="1 day", 
-  retention="7 days", level="DEBUG", mode="w")
+LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
+
+def init_logging(log_name: str = "workflow_react.log"):
+    """One log file per run under flight_manager/logs; LOG_* env vars override path, level and rotation"""
+    init_file_logging(os.path.join(LOG_DIR, log_name))
 
 def log_startup():
     logger.info("=" * 80)
     logger.info(f"⏰ Start time: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("=" * 80)
\ No newline at end of file
+    logger.info("=" * 80)
@@ -5,18 +5,16 @@ import dotenv
 import datetime
 from models.models import Client, FlightDetails
 from tool_calls.tools import parse_booking_request
+from config.logging import init_logging, log_startup
 
 # Load environment variables
 dotenv.load_dotenv()
 
 # Configure logger to write to file (overwrite on each run)
-log_file_path = "/Users/natelevinson/Desktop/practice/logs/workflow.log"
-logger.add(log_file_path, rotation="1 day", retention="7 days", level="DEBUG", mode="w")
+init_logging("workflow.log")
 
 # Log script startup
-logger.info("=" * 80)
-logger.info(f"⏰ Start time: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-logger.info("=" * 80)
+log_startup()
 
 def run_workflow():
     client = Client()
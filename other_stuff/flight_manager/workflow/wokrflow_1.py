@@ -12,18 +12,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.models import Client
 from tool_calls.tools import tools, available_functions
 from prompts.system_prompts import SYSTEM_PROMPT
+from config.logging import init_logging, log_startup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.telemetry import phase, tool_span, traced_completion
 
 # Load environment variables
 dotenv.load_dotenv()
 
 # Configure logger to write to file (overwrite on each run)
-log_file_path = "/Users/natelevinson/Desktop/practice/logs/workflow.log"
-logger.add(log_file_path, rotation="1 day", retention="7 days", level="DEBUG", mode="w")
+init_logging("workflow.log")
 
 # Log script startup
-logger.info("=" * 80)
-logger.info(f"⏰ Start time: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-logger.info("=" * 80)
+log_startup()
 
 def process_message(openai_client: Client, user_input: str, conversation_history: list = None) -> tuple[dict, str]:
     """
@@ -41,12 +41,14 @@ def process_message(openai_client: Client, user_input: str, conversation_history
     # Add current user input
     messages.append({"role": "user", "content": user_input})
     
-    response = openai_client.client.chat.completions.create(
-        model=openai_client.model,
-        messages=messages,
-        tools=tools,
-        tool_choice="auto"
-    )
+    with phase("act"):
+        response = traced_completion(
+            openai_client.client,
+            model=openai_client.model,
+            messages=messages,
+            tools=tools,
+            tool_choice="auto"
+        )
     
     response_message = response.choices[0].message
     tool_calls = response_message.tool_calls
@@ -62,7 +64,8 @@ def process_message(openai_client: Client, user_input: str, conversation_history
             
             logger.info(f"Calling tool: {function_name} with args: {function_args}")
             
-            function_response = function_to_call(**function_args)
+            with tool_span(function_name, tool_call_id=tool_call.id):
+                function_response = function_to_call(**function_args)
             
             messages.append({
                 "tool_call_id": tool_call.id,
@@ -72,10 +75,12 @@ def process_message(openai_client: Client, user_input: str, conversation_history
             })
         
         # Get final response after tool execution
-        second_response = openai_client.client.chat.completions.create(
-            model=openai_client.model,
-            messages=messages
-        )
+        with phase("respond"):
+            second_response = traced_completion(
+                openai_client.client,
+                model=openai_client.model,
+                messages=messages
+            )
         
         final_message = second_response.choices[0].message.content
         logger.info(f"DONE PROCESSING")
@@ -114,7 +119,8 @@ def run_workflow():
             
             # Process the message with conversation history
             print("\n🤖 Assistant: ", end="", flush=True)
-            tool_call_result, response = process_message(openai_client, user_input, conversation_history)
+            with phase("turn", workflow="tool_calling", session_id=openai_client.session_id):
+                tool_call_result, response = process_message(openai_client, user_input, conversation_history)
             
             # Display the response
             print(response)
@@ -10,6 +10,8 @@ from models.models import Client
 from tool_calls.tools import tools, available_functions
 from prompts.system_prompts import SYSTEM_PROMPT
 from config.logging import init_logging, log_startup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from shared.telemetry import phase, tool_span, traced_completion
 
 # Load environment variables
 dotenv.load_dotenv()
@@ -71,78 +73,82 @@ ALWAYS include [STATUS: X] at the end of your message!
     while iterations < max_iterations:
         iterations += 1
         
-        # Get LLM response with potential tool calls
-        response = openai_client.client.chat.completions.create(
-            model=openai_client.model,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto"
-        )
+        with phase("act", iteration=iterations):
+            # Get LLM response with potential tool calls
+            response = traced_completion(
+                openai_client.client,
+                model=openai_client.model,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto"
+            )
         
-        response_message = response.choices[0].message
-        tool_calls = response_message.tool_calls
+            response_message = response.choices[0].message
+            tool_calls = response_message.tool_calls
         
-        if tool_calls:
-            # Agent decided to use tools - add to message history
-            messages.append(response_message)
+            if tool_calls:
+                # Agent decided to use tools - add to message history
+                messages.append(response_message)
             
-            # Execute all tool calls
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)                
-                logger.info(f"Executing tool: {function_name} with args: {function_args}")
+                # Execute all tool calls
+                for tool_call in tool_calls:
+                    function_name = tool_call.function.name
+                    function_args = json.loads(tool_call.function.arguments)                
+                    logger.info(f"Executing tool: {function_name} with args: {function_args}")
                 
-                # Execute the tool
-                try:
-                    function_to_call = available_functions[function_name]
-                    function_response = function_to_call(**function_args)
-                    logger.info(f"Tool {function_name} completed successfully")
-                except Exception as e:
-                    logger.error(f"Tool {function_name} failed: {str(e)}")
-                    function_response = {"error": str(e)}
+                    # Execute the tool
+                    with tool_span(function_name, tool_call_id=tool_call.id) as span:
+                        try:
+                            function_to_call = available_functions[function_name]
+                            function_response = function_to_call(**function_args)
+                            logger.info(f"Tool {function_name} completed successfully")
+                        except Exception as e:
+                            logger.error(f"Tool {function_name} failed: {str(e)}")
+                            span.record_error(e)
+                            function_response = {"error": str(e)}
                 
-                # Add tool result to messages
-                messages.append({
-                    "tool_call_id": tool_call.id,
-                    "role": "tool",
-                    "name": function_name,
-                    "content": json.dumps(function_response)
-                })
+                    # Add tool result to messages
+                    messages.append({
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": function_name,
+                        "content": json.dumps(function_response)
+                    })
             
-            # Continue the loop - let the agent decide if more work is needed
-            continue
+                # Continue the loop - let the agent decide if more work is needed
+                continue
             
-        else:
-            # No tool calls - agent is providing a response
-            final_response = response_message.content
-            logger.info(f"Agent response: {final_response[:100]}...")
+            else:
+                # No tool calls - agent is providing a response
+                final_response = response_message.content
+                logger.info(f"Agent response: {final_response[:100]}...")
             
-            # Extract status from response
-            status = extract_status(final_response)
-            logger.info(f"Agent self-assessment: {status}")
+                # Extract status from response
+                status = extract_status(final_response)
+                logger.info(f"Agent self-assessment: {status}")
             
-            if status == "COMPLETE":
-                logger.info(f"Task completed after {iterations} iterations")
-                # Remove the status indicator from the final response for cleaner output
-                final_response = re.sub(r'\[STATUS:\s*(CONTINUE|COMPLETE)\]', '', final_response).strip()
-                return final_response
+                if status == "COMPLETE":
+                    logger.info(f"Task completed after {iterations} iterations")
+                    # Remove the status indicator from the final response for cleaner output
+                    final_response = re.sub(r'\[STATUS:\s*(CONTINUE|COMPLETE)\]', '', final_response).strip()
+                    return final_response
             
-            elif status == "CONTINUE" or iterations < max_iterations - 1:
-                # Agent wants to continue - add response and let it continue
-                messages.append(response_message)
-                logger.info("Agent indicated more work needed, continuing...")
+                elif status == "CONTINUE" or iterations < max_iterations - 1:
+                    # Agent wants to continue - add response and let it continue
+                    messages.append(response_message)
+                    logger.info("Agent indicated more work needed, continuing...")
                 
-                # Add a gentle reminder if status was missing
-                if status == "CONTINUE" and "[STATUS:" not in final_response:
-                    messages.append({
-                        "role": "system",
-                        "content": "Please continue with the task. Remember to end your response with [STATUS: CONTINUE] or [STATUS: COMPLETE]."
-                    })
-            else:
-                # Max iterations reached
-                logger.info(f"Max iterations reached ({max_iterations})")
-                final_response = re.sub(r'\[STATUS:\s*(CONTINUE|COMPLETE)\]', '', final_response).strip()
-                return final_response
+                    # Add a gentle reminder if status was missing
+                    if status == "CONTINUE" and "[STATUS:" not in final_response:
+                        messages.append({
+                            "role": "system",
+                            "content": "Please continue with the task. Remember to end your response with [STATUS: CONTINUE] or [STATUS: COMPLETE]."
+                        })
+                else:
+                    # Max iterations reached
+                    logger.info(f"Max iterations reached ({max_iterations})")
+                    final_response = re.sub(r'\[STATUS:\s*(CONTINUE|COMPLETE)\]', '', final_response).strip()
+                    return final_response
     
     logger.warning(f"Exited loop unexpectedly after {iterations} iterations")
     return final_response or "I've completed the available steps for your request."
@@ -184,11 +190,12 @@ def run_react_workflow():
             logger.info(f"User input: {user_input}\n")
             print("\n🤖 Assistant: Working on your request...\n")
             
-            final_response = process_message_with_react(
-                openai_client, 
-                user_input, 
-                conversation_history
-            )
+            with phase("turn", workflow="react", session_id=openai_client.session_id):
+                final_response = process_message_with_react(
+                    openai_client, 
+                    user_input, 
+                    conversation_history
+                )
             
             # Display the final response
             print(f"🤖 Assistant: {final_response}")
@@ -1,3 +1,5 @@
+import os
+
 from src.agent.host_agent import HostAgent
 from src.agent.llm import LLM
 from src.config.logging_init import init_logging, log_startup
@@ -11,7 +13,8 @@ def loop():
 
     # Initialize agent
     client = LLM(model="gpt-5-mini")
-    host_agent = HostAgent(client, system_prompt=SYSTEM_PROMPT)
+    # "fused" plans and calls tools in one completion per step instead of two
+    host_agent = HostAgent(client, system_prompt=SYSTEM_PROMPT, step_mode=os.getenv("RESTAURANT_STEP_MODE", "split"))
 
     # Continuous loop
     while True:
@@ -21,6 +24,8 @@ def loop():
         
         result = host_agent(query)
         print(f"\nAnswer: {result}")
+        turn = host_agent.last_turn
+        print(f"\033[90m{turn['llm_calls']} LLM calls, {turn['steps']} steps, {turn['latency_ms']:.0f} ms\033[0m")
 
 if __name__ == "__main__":
     loop()
\ No newline at end of file
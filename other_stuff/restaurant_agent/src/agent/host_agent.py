@@ -5,18 +5,61 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from models.schemas import ThoughtResponse
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+from shared.telemetry import phase, tool_span, traced_completion
+from shared.memory import MemoryManager
 from ..tools.tools import available_tools, tools
+from ..tools.result_store import ResultStore, fetch_result_tool_schema, summarize
 import time
 
+STEP_MODES = ("split", "fused")
+
+FUSED_GUARD = (
+    "Reply with JSON that matches the ThoughtResponse schema and keep your 'thought' short. "
+    "Fields: user_query (string), thought (string), next_action (string), answer (optional string), confidence (number 0-1).\n"
+    "If you can answer WITHOUT tools, set next_action='provide_answer' and include the answer field.\n"
+    "If you need tools, set next_action to the tool name and call the tool(s) in this same reply.\n"
+    "IMPORTANT: Check if information is already available in the conversation history "
+    "before deciding to call tools."
+)
+
 class HostAgent:
-    def __init__(self, client: LLM, system_prompt: str):
+    def __init__(
+        self,
+        client: LLM,
+        system_prompt: str,
+        memory_token_budget: int = 8000,
+        keep_turns: int = 3,
+        offload_threshold: int = 2000,
+        step_mode: str = "split"
+    ):
+        """
+        step_mode "split" runs each step as a planning call (think) and a
+        tool-enabled call (act); "fused" asks one tool-enabled completion
+        for the thought and the tool calls, or the answer, together.
+        """
+        if step_mode not in STEP_MODES:
+            raise ValueError(f"step_mode must be one of {STEP_MODES}, got {step_mode!r}")
         self.client = client
+        self.step_mode = step_mode
         self.system_prompt = system_prompt
         self.memory = []  # Full memory for debugging
         self.agent_memory = []  # Clean memory for agent
+        # Compacts older THOUGHT/ACTION entries once agent_memory exceeds the budget (None disables)
+        self.memory_manager = MemoryManager(memory_token_budget, keep_turns=keep_turns) if memory_token_budget else None
         self.tools = available_tools
         self.tool_schemas = tools
+        # Tool results longer than offload_threshold chars go to the result store (None disables)
+        self.offload_threshold = offload_threshold
+        self.result_store = ResultStore() if offload_threshold else None
+        if self.result_store is not None:
+            self.tools = {**available_tools, "fetch_result": self.result_store.fetch}
+            self.tool_schemas = tools + [fetch_result_tool_schema]
         self.user_query = None
+        # Counters for the last turn and all turns so far: LLM calls, loop steps, wall time
+        self.last_turn = None
+        self.stats = {"turns": 0, "llm_calls": 0, "steps": 0, "latency_ms": 0.0}
+        self._llm_calls = self._steps = 0
         if self.system_prompt is not None:
             self.append_to_both_memories("system", self.system_prompt)
     
@@ -26,6 +69,25 @@ class HostAgent:
         self.memory.append(message)
         self.agent_memory.append(message)
     
+    def fit_memory(self):
+        """Keep agent_memory within its token budget; the debug memory stays complete"""
+        if self.memory_manager is not None:
+            self.agent_memory = self.memory_manager.fit(self.agent_memory)
+
+    def offload(self, function_name, result, content):
+        """Swap a large tool result for its handle and a bounded summary; the full result lives in the store"""
+        if self.result_store is None or function_name == "fetch_result" or len(content) <= self.offload_threshold:
+            return content
+        value = result if isinstance(result, (dict, list)) else content
+        handle = self.result_store.put(value)
+        logger.info(f"Offloaded {len(content)} chars from {function_name} to {handle}")
+        return json.dumps({
+            "handle": handle,
+            "size_chars": len(content),
+            "summary": summarize(value),
+            "note": "Full result stored. Call fetch_result(handle, path) to read the parts you need."
+        })
+
     def trace(self, tool_call_id, function_name, function_args, content):
         """Convert tool call and result to plaintext description"""
         description = f"Called {function_name} with args {function_args} and got {content} as the output"
@@ -37,10 +99,34 @@ class HostAgent:
             logger.info(f"User message: {message}")
             self.append_to_both_memories("user", message)
             self.user_query = message
-        result = self.execute()
+        self._llm_calls = 0
+        self._steps = 0
+        start_time = time.perf_counter()
+        with phase("turn", agent="restaurant_host", step_mode=self.step_mode) as span:
+            result = self.execute()
+            self.last_turn = {
+                "step_mode": self.step_mode,
+                "llm_calls": self._llm_calls,
+                "steps": self._steps,
+                "latency_ms": (time.perf_counter() - start_time) * 1000
+            }
+            span.set(answered=bool(result), llm_calls=self._llm_calls, steps=self._steps)
+        self.stats["turns"] += 1
+        for key in ("llm_calls", "steps", "latency_ms"):
+            self.stats[key] += self.last_turn[key]
         return result
+
+    def complete(self, **kwargs):
+        """traced_completion() on this agent's client, counted toward the turn"""
+        self._llm_calls += 1
+        return traced_completion(self.client, model=self.client.model, **kwargs)
     
     def think(self):
+        with phase("think"):
+            self.fit_memory()
+            return self._think()
+
+    def _think(self):
         start_time = time.time()
         logger.info("=== THINKING ===")
         """Plan next step with structured output; no tool calls allowed."""
@@ -66,33 +152,12 @@ class HostAgent:
             {"role": "assistant", "content": think_prompt},
         ]
 
-        # Build JSON schema from ThoughtResponse (Pydantic v2 or v1)
-        try:
-            schema_fn = getattr(ThoughtResponse, "model_json_schema", None) or ThoughtResponse
-            json_schema = schema_fn()
-        except Exception:
-            json_schema = ThoughtResponse
-        
-        # Hardcode the user_query to always be self.user_query
-        json_schema["properties"]["user_query"]["const"] = self.user_query
-
         # IMPORTANT: do NOT pass tool_choice or tools here
-        completion = self.client.chat.completions.create(
-            model=self.client.model,
-            messages=messages,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "ThoughtResponse",
-                    "schema": json_schema,
-                },
-            },
-        )
+        completion = self.complete(messages=messages, response_format=self.thought_format())
 
         raw = completion.choices[0].message.content
         try:
-            data = json.loads(raw)
-            reasoning_obj = ThoughtResponse.model_validate(data)
+            reasoning_obj = ThoughtResponse.model_validate(json.loads(raw))
         except Exception as e:
             reasoning_obj = ThoughtResponse(
                 user_query=self.user_query or "No user_query set",
@@ -101,8 +166,30 @@ class HostAgent:
                 answer=None,
                 confidence=0.3,
             )
+        self.record_thought(reasoning_obj, start_time)
+        return reasoning_obj
+
+    def thought_format(self) -> dict:
+        """response_format asking for a ThoughtResponse about the current user query"""
+        # Build JSON schema from ThoughtResponse (Pydantic v2 or v1)
+        try:
+            schema_fn = getattr(ThoughtResponse, "model_json_schema", None) or ThoughtResponse
+            json_schema = schema_fn()
+        except Exception:
+            json_schema = ThoughtResponse
 
-        # Save a plain-text summary (no tool_calls)
+        # Hardcode the user_query to always be self.user_query
+        json_schema["properties"]["user_query"]["const"] = self.user_query
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "ThoughtResponse",
+                "schema": json_schema,
+            },
+        }
+
+    def record_thought(self, reasoning_obj: ThoughtResponse, start_time: float):
+        """Log a thought and add its plain-text summary (no tool_calls) to both memories"""
         thought_content = (
             f"User's query: {self.user_query}\n"
             f"Thought: {reasoning_obj.thought}\n"
@@ -116,14 +203,17 @@ class HostAgent:
             thought_content += f"\nAnswer: {reasoning_obj.answer}"
         logger.info(f"Thought for {time.time() - start_time} seconds: \n User's query: {self.user_query} \n Thought: {reasoning_obj.thought} \n Next Action: {reasoning_obj.next_action} \n Answer: {reasoning_obj.answer} \n Confidence: {reasoning_obj.confidence}")
         self.append_to_both_memories("assistant", "THOUGHT: " + thought_content)
-        return reasoning_obj
     
     def act(self):
+        with phase("act"):
+            self.fit_memory()
+            return self._act()
+
+    def _act(self):
         start_time = time.time()
         logger.info("=== ACTING ===")
         """Decide on and execute an action using tools"""
-        completion = self.client.chat.completions.create(
-            model=self.client.model,
+        completion = self.complete(
             messages=self.agent_memory,
             tools=self.tool_schemas,
             tool_choice="auto",
@@ -134,18 +224,31 @@ class HostAgent:
         
         # Handle tool calls
         if response_message.tool_calls:
-            # Add raw tool call message to debug memory only
-            self.memory.append(response_message.model_dump())
-            # Build plaintext description of all tool calls and results
-            tool_descriptions = []
-            for tool_call in response_message.tool_calls:
-                logger.info(f"Tool call: {tool_call}")
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                print(f"\n \033[90mCalling {function_name}...\033[0m")
-                
-                # Execute the tool
+            return self.run_tool_calls(response_message, start_time)
+        
+        # Final answer (no tool calls)
+        self.memory.append(response_message.model_dump())  # Full message to debug memory
+        if response_message.content:
+            logger.info(f"Action for {time.time() - start_time} seconds: {response_message.content}")
+            self.agent_memory.append({"role": "assistant", "content": response_message.content})
+        
+        return response_message.content  # Final answer
+
+    def run_tool_calls(self, response_message, start_time: float):
+        """Execute a completion's tool calls and record them in both memories; returns True"""
+        # Add raw tool call message to debug memory only
+        self.memory.append(response_message.model_dump())
+        # Build plaintext description of all tool calls and results
+        tool_descriptions = []
+        for tool_call in response_message.tool_calls:
+            logger.info(f"Tool call: {tool_call}")
+            function_name = tool_call.function.name
+            function_args = json.loads(tool_call.function.arguments)
+            
+            print(f"\n \033[90mCalling {function_name}...\033[0m")
+            
+            # Execute the tool
+            with tool_span(function_name, tool_call_id=tool_call.id) as span:
                 if function_name in self.tools:
                     try:
                         result = self.tools[function_name](**function_args)
@@ -155,70 +258,117 @@ class HostAgent:
                         else:
                             result_str = str(result)
                     except Exception as e:
+                        span.record_error(e)
                         result = f"Error: {str(e)}"
                         result_str = result
                 else:
+                    span.record_error("Tool not found")
                     result = "Tool not found"
                     result_str = result
-                
-                # Add tool response to debug memory
-                if isinstance(result, dict):
-                    content = json.dumps(result)
-                else:
-                    content = str(result)
-                
-                self.memory.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": content
-                })
-                
-                # Create plaintext description for agent memory using trace method
-                tool_desc = self.trace(tool_call.id, function_name, function_args, content)
-                tool_descriptions.append(tool_desc)
             
-            # Add combined tool descriptions to agent memory as assistant message
-            if tool_descriptions:
-                combined_desc = "\n".join(tool_descriptions)
-                self.agent_memory.append({"role": "assistant", "content": "ACTION: I used the following tools- " + combined_desc})
-            logger.info(f"Action for {time.time() - start_time} seconds: {combined_desc}")
-            return True  # Tool was used
+            # Add tool response to debug memory
+            if isinstance(result, dict):
+                content = json.dumps(result)
+            else:
+                content = str(result)
+            content = self.offload(function_name, result, content)
+            
+            self.memory.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": content
+            })
+            
+            # Create plaintext description for agent memory using trace method
+            tool_desc = self.trace(tool_call.id, function_name, function_args, content)
+            tool_descriptions.append(tool_desc)
         
-        # Final answer (no tool calls)
+        # Add combined tool descriptions to agent memory as assistant message
+        if tool_descriptions:
+            combined_desc = "\n".join(tool_descriptions)
+            self.agent_memory.append({"role": "assistant", "content": "ACTION: I used the following tools- " + combined_desc})
+        logger.info(f"Action for {time.time() - start_time} seconds: {combined_desc}")
+        return True  # Tool was used
+
+    def step(self):
+        with phase("step"):
+            self.fit_memory()
+            return self._step()
+
+    def _step(self):
+        """
+        Fused think and act: one tool-enabled completion returns the
+        ThoughtResponse as its content together with any tool calls.
+
+        Returns:
+            True when tools were used, else the ThoughtResponse
+        """
+        start_time = time.time()
+        logger.info("=== STEP ===")
+        messages = self.agent_memory + [{"role": "system", "content": FUSED_GUARD}]
+        completion = self.complete(
+            messages=messages,
+            tools=self.tool_schemas,
+            tool_choice="auto",
+            response_format=self.thought_format(),
+        )
+        response_message = completion.choices[0].message
+        logger.info(f"Response message: {response_message}")
+
+        raw = response_message.content
+        try:
+            reasoning_obj = ThoughtResponse.model_validate(json.loads(raw))
+        except Exception:
+            # Tool calls often come without content; free text is the answer itself
+            reasoning_obj = ThoughtResponse(
+                user_query=self.user_query or "No user_query set",
+                thought="Calling tools" if response_message.tool_calls else "Answering directly",
+                next_action=response_message.tool_calls[0].function.name if response_message.tool_calls else "provide_answer",
+                answer=None if response_message.tool_calls else raw,
+                confidence=0.5,
+            )
+        self.record_thought(reasoning_obj, start_time)
+        if response_message.tool_calls:
+            return self.run_tool_calls(response_message, start_time)
         self.memory.append(response_message.model_dump())  # Full message to debug memory
-        if response_message.content:
-            logger.info(f"Action for {time.time() - start_time} seconds: {response_message.content}")
-            self.agent_memory.append({"role": "assistant", "content": response_message.content})
-        
-        return response_message.content  # Final answer
+        return reasoning_obj
 
     def observe(self):
         """Observe the previous thought and action and the result of the action ti """
         pass
     
+    def log_memories(self):
+        """Log both memories for debugging"""
+        logger.info("=== DEBUG MEMORY ===")
+        for msg in self.memory:
+            logger.info(f"Debug memory: {msg}")
+
+        logger.info("=== AGENT MEMORY ===")
+        for msg in self.agent_memory:
+            logger.info(f"Agent memory: {msg}")
+
     def execute(self):
         """Execute the ReAct loop: Thought -> Action -> Observation"""
         while True:
-            # Generate reasoning
-            reasoning = self.think()
+            self._steps += 1
+            if self.step_mode == "fused":
+                # Thought and tool calls (or the answer) from one completion
+                reasoning = self.step()
+                if reasoning == True:
+                    continue  # Tools were used, keep looping
+            else:
+                # Generate reasoning
+                reasoning = self.think()
             
             # If thinking provided a direct answer, return it without calling act()
             if reasoning.next_action == "provide_answer" and reasoning.answer:
                 logger.info(f"Direct answer provided: {reasoning.answer}")
                 self.append_to_both_memories("assistant", reasoning.answer)
-                
-                # Log both memories for debugging
-                logger.info("=== DEBUG MEMORY ===")
-                for msg in self.memory:
-                    logger.info(f"Debug memory: {msg}")
-                
-                logger.info("=== AGENT MEMORY ===")
-                for msg in self.agent_memory:
-                    logger.info(f"Agent memory: {msg}")
-                
+                self.log_memories()
                 return reasoning.answer
             
-            # Take action (may involve tools)
+            # Take action (may involve tools); in fused mode only when the
+            # step named a tool without calling it
             result = self.act()
             
             # If tools were used, continue the loop
@@ -226,15 +376,5 @@ class HostAgent:
                 continue  # Keep looping
             
             # Otherwise we have the final answer
-            # Log both memories for debugging
-            logger.info("=== DEBUG MEMORY ===")
-            for msg in self.memory:
-                logger.info(f"Debug memory: {msg}")
-            
-            logger.info("=== AGENT MEMORY ===")
-            for msg in self.agent_memory:
-                logger.info(f"Agent memory: {msg}")
-
+            self.log_memories()
             return result  # Return final answer and exit loop
-
-        
\ No newline at end of file
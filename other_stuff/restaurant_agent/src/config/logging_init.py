@@ -1,27 +1,15 @@
 from loguru import logger
 from datetime import datetime
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+from shared.log_writer import init_file_logging
+
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'logs', 'run.log')
 
 def init_logging():
-    """Simple logging setup - one file, fresh start each run"""
-    log_file_path = "/Users/natelevinson/Desktop/practice/restaurant_agent/logs/run.log"
-    
-    # Remove default handler and add file handler with mode="w" for fresh start
-    logger.remove()
-    
-    # Add file handler with immediate flushing
-    def write_and_flush(message):
-        """Custom sink that writes and immediately flushes"""
-        with open(log_file_path, 'a') as f:
-            f.write(message)
-            f.flush()  # Force immediate write to disk
-    
-    # Clear the file first
-    open(log_file_path, 'w').close()
-    
-    # Add handler with custom sink
-    logger.add(write_and_flush,
-               format="{time:HH:mm:ss.SSS} | {level:<8} | {message}\n",
-               level="DEBUG")
+    """One log file per run, written off-thread; LOG_* env vars override path, level and rotation"""
+    init_file_logging(DEFAULT_LOG_PATH)
 
 def log_startup():
     """Log session start"""
@@ -0,0 +1,350 @@
+"""
+Table availability engine.
+
+Every table keeps its reservations as a sorted-slot index: parallel lists
+of start minutes, end minutes and row ids, ordered by start, one set per
+duration class (durations within a factor of two). Whether a table is
+free for [start, end) is one bisect per class plus a look at the few
+reservations of that class that can still reach into the window, so a
+query costs O(log m) per candidate table instead of a scan over all
+reservations.
+Tables are kept sorted by capacity, so the candidates for a party are a
+suffix of that list.
+
+The engine follows the store: before answering it asks the store which
+reservation and table rows changed since the snapshot it was built from
+and re-indexes only those.
+"""
+import bisect
+import heapq
+import json
+import threading
+from datetime import date as Date, datetime
+
+from .database_tool import get_store
+
+# Minutes a reservation holds its table when the record has no duration_minutes
+DEFAULT_DURATION = 90
+# Grid that suggested start times are aligned to
+SLOT_MINUTES = 15
+# Reservations in these states hold their table
+HOLDING_STATUSES = ("confirmed", "pending")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def to_minute(date: str, time: str) -> int:
+    """Absolute minute for a YYYY-MM-DD date and HH:MM time"""
+    moment = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+    return moment.toordinal() * 1440 + moment.hour * 60 + moment.minute
+
+
+def from_minute(minute: int) -> tuple:
+    """(YYYY-MM-DD, HH:MM) for an absolute minute"""
+    day, offset = divmod(minute, 1440)
+    return Date.fromordinal(day).isoformat(), f"{offset // 60:02d}:{offset % 60:02d}"
+
+
+def _parse_hours(opening_hours: dict) -> dict:
+    """weekday index -> (open, close) minutes from midnight; close may pass midnight"""
+    hours = {}
+    for index, weekday in enumerate(WEEKDAYS):
+        value = (opening_hours or {}).get(weekday)
+        if not value or "-" not in value:
+            continue
+        opens, closes = (int(part[:2]) * 60 + int(part[3:5]) for part in value.split("-"))
+        hours[index] = (opens, closes if closes > opens else closes + 1440)
+    return hours
+
+
+class _SlotRun:
+    """Reservations shorter than reach minutes, sorted by start"""
+
+    __slots__ = ("starts", "ends", "rowids", "reach")
+
+    def __init__(self, reach: int):
+        self.starts, self.ends, self.rowids = [], [], []
+        # Nothing here lasts reach minutes or more, so an overlap starts less than reach before the window
+        self.reach = reach
+
+    def add(self, start: int, end: int, rowid: int):
+        at = bisect.bisect_right(self.starts, start)
+        self.starts.insert(at, start)
+        self.ends.insert(at, end)
+        self.rowids.insert(at, rowid)
+
+    def remove(self, start: int, rowid: int):
+        at = bisect.bisect_left(self.starts, start)
+        while at < len(self.starts) and self.starts[at] == start:
+            if self.rowids[at] == rowid:
+                del self.starts[at], self.ends[at], self.rowids[at]
+                return
+            at += 1
+
+    def busy_until(self, start: int, end: int):
+        at = bisect.bisect_left(self.starts, end) - 1
+        latest = None
+        while at >= 0 and self.starts[at] > start - self.reach:
+            if self.ends[at] > start:
+                latest = max(latest or 0, self.ends[at])
+            at -= 1
+        return latest
+
+
+class _TableSlots:
+    """
+    Reservations of one table, split into runs by duration class: run k
+    holds the reservations lasting [2**(k-1), 2**k) minutes. Each run is
+    only scanned back by its own reach, so one very long reservation does
+    not make every lookup on the table walk all of its reservations.
+    """
+
+    __slots__ = ("runs", )
+
+    def __init__(self):
+        self.runs = {}
+
+    @staticmethod
+    def _class(start: int, end: int) -> int:
+        return max(end - start, 1).bit_length()
+
+    def add(self, start: int, end: int, rowid: int):
+        k = self._class(start, end)
+        if k not in self.runs:
+            self.runs[k] = _SlotRun(1 << k)
+        self.runs[k].add(start, end, rowid)
+
+    def remove(self, start: int, end: int, rowid: int):
+        run = self.runs.get(self._class(start, end))
+        if run is not None:
+            run.remove(start, rowid)
+
+    def busy_until(self, start: int, end: int):
+        """End of the latest reservation overlapping [start, end), or None when the table is free"""
+        latest = None
+        for run in self.runs.values():
+            busy = run.busy_until(start, end)
+            if busy is not None and (latest is None or busy > latest):
+                latest = busy
+        return latest
+
+
+class AvailabilityEngine:
+    """Answers table and slot availability from the store's reservations and opening hours"""
+
+    def __init__(self, store, default_duration: int = DEFAULT_DURATION, slot_minutes: int = SLOT_MINUTES):
+        """
+        Args:
+            store: RestaurantStore to index and follow
+            default_duration: Minutes a reservation without duration_minutes lasts
+            slot_minutes: Grid that next_slots() aligns start times to
+        """
+        self.store = store
+        self.default_duration = default_duration
+        self.slot_minutes = slot_minutes
+        self._lock = threading.RLock()
+        self.version = None
+        self.rebuilds = 0
+
+    # Indexing
+
+    def _interval(self, reservation: dict):
+        """(table_id, start, end) for a reservation that holds a table, else None"""
+        if not isinstance(reservation, dict) or reservation.get("table_id") is None:
+            return None
+        if reservation.get("status") not in HOLDING_STATUSES:
+            return None
+        try:
+            start = to_minute(reservation["date"], reservation["time"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return reservation["table_id"], start, start + int(reservation.get("duration_minutes") or self.default_duration)
+
+    def _index_reservation(self, rowid: int, reservation: dict):
+        interval = self._interval(reservation)
+        if interval is not None:
+            table_id, start, end = interval
+            self._slots.setdefault(table_id, _TableSlots()).add(start, end, rowid)
+            self._by_rowid[rowid] = interval
+
+    def _unindex_reservation(self, rowid: int):
+        interval = self._by_rowid.pop(rowid, None)
+        if interval is not None:
+            table_id, start, end = interval
+            self._slots[table_id].remove(start, end, rowid)
+
+    def _index_tables(self, snapshot):
+        self._tables = {}
+        if "tables" in snapshot:
+            for table in snapshot["tables"].values():
+                if isinstance(table, dict) and "id" in table:
+                    self._tables[table["id"]] = table
+        self._by_capacity = sorted((table.get("capacity", 0), table_id) for table_id, table in self._tables.items())
+        info = snapshot["restaurant_info"].values() if "restaurant_info" in snapshot else {}
+        self._hours = _parse_hours(info.get("opening_hours") if isinstance(info, dict) else None)
+
+    def _rebuild(self, snapshot):
+        self._slots, self._by_rowid = {}, {}
+        if "reservations" in snapshot:
+            reservations = snapshot["reservations"]
+            for rowid, reservation in zip(reservations.order(), reservations.values()):
+                self._index_reservation(rowid, reservation)
+        self._index_tables(snapshot)
+        self.version = snapshot.version
+        self.rebuilds += 1
+
+    def sync(self):
+        """Bring the index up to the store's latest snapshot, re-indexing only changed rows"""
+        snapshot = self.store.snapshot()
+        with self._lock:
+            if snapshot.version == self.version:
+                return
+            changes = self.store.changes_since(self.version, snapshot) if self.version is not None else None
+            if changes is None or "reservations" not in snapshot:
+                self._rebuild(snapshot)
+                return
+            if "reservations" in changes:
+                deleted, written = changes["reservations"]
+                reservations = snapshot["reservations"]
+                for rowid in deleted | written:
+                    self._unindex_reservation(rowid)
+                for rowid in written:
+                    if rowid in reservations.rows:
+                        # Decode just this row: record() would decode the whole collection
+                        self._index_reservation(rowid, json.loads(reservations.rows[rowid][1]))
+            if "tables" in changes or "restaurant_info" in changes:
+                self._index_tables(snapshot)
+            self.version = snapshot.version
+
+    # Queries
+
+    def _open_window(self, start: int, end: int):
+        """(open, close) absolute minutes of the opening window containing [start, end), or None"""
+        day = start // 1440
+        # A window that opened yesterday can run past midnight
+        for window_day in (day, day - 1):
+            hours = self._hours.get(Date.fromordinal(window_day).weekday())
+            if hours is None:
+                continue
+            opens, closes = window_day * 1440 + hours[0], window_day * 1440 + hours[1]
+            if opens <= start and end <= closes:
+                return opens, closes
+        return None
+
+    def is_open(self, start: int, end: int) -> bool:
+        return not self._hours or self._open_window(start, end) is not None
+
+    def table_busy_until(self, table_id, start: int, end: int):
+        slots = self._slots.get(table_id)
+        return slots.busy_until(start, end) if slots is not None else None
+
+    def check_hold(self, table_id, start: int, end: int) -> tuple:
+        """
+        Whether table_id can be held for [start, end), as of a version no
+        older than any snapshot taken before the call.
+
+        Returns:
+            (restaurant open for the whole visit, end of the latest clashing reservation or None)
+        """
+        self.sync()
+        with self._lock:
+            return self.is_open(start, end), self.table_busy_until(table_id, start, end)
+
+    def _candidates(self, party_size: int):
+        at = bisect.bisect_left(self._by_capacity, (party_size, ))
+        return [table_id for _, table_id in self._by_capacity[at:]]
+
+    def free_tables(self, party_size: int, start: int, duration: int = None, limit: int = None) -> list:
+        """Tables seating party_size with no reservation in [start, start + duration), smallest first"""
+        self.sync()
+        end = start + (duration or self.default_duration)
+        with self._lock:
+            if not self.is_open(start, end):
+                return []
+            free = []
+            for table_id in self._candidates(party_size):
+                if self.table_busy_until(table_id, start, end) is None:
+                    free.append(self._tables[table_id])
+                    if limit and len(free) >= limit:
+                        break
+            return free
+
+    def _next_free(self, table_id, start: int, duration: int, horizon: int):
+        """Earliest grid-aligned start >= start when table_id is free and the restaurant open, or None"""
+        step = self.slot_minutes
+        while True:
+            start = -(-start // step) * step
+            if start > horizon:
+                return None
+            end = start + duration
+            if self._hours and self._open_window(start, end) is None:
+                start = self._next_opening(start, duration, horizon)
+                if start is None:
+                    return None
+                continue
+            busy = self.table_busy_until(table_id, start, end)
+            if busy is None:
+                return start
+            start = busy
+
+    def _next_opening(self, start: int, duration: int, horizon: int):
+        """First minute after start at which a duration-long visit fits in an opening window"""
+        day = start // 1440
+        while day * 1440 <= horizon:
+            for window_day in (day - 1, day):
+                hours = self._hours.get(Date.fromordinal(window_day).weekday())
+                if hours is None:
+                    continue
+                opens, closes = window_day * 1440 + hours[0], window_day * 1440 + hours[1]
+                candidate = max(opens, start + 1)
+                candidate = -(-candidate // self.slot_minutes) * self.slot_minutes
+                if candidate + duration <= closes:
+                    return candidate
+            day += 1
+        return None
+
+    def next_slots(self, party_size: int, start: int, duration: int = None, count: int = 5, horizon_days: int = 14) -> list:
+        """
+        The next count distinct start times from start at which some table
+        seats party_size for duration while the restaurant is open.
+
+        Returns:
+            [(start minute, [table ids free then, smallest first])]
+        """
+        self.sync()
+        duration = duration or self.default_duration
+        horizon = start + horizon_days * 1440
+        with self._lock:
+            heap = []
+            for rank, table_id in enumerate(self._candidates(party_size)):
+                free_at = self._next_free(table_id, start, duration, horizon)
+                if free_at is not None:
+                    heap.append((free_at, rank, table_id))
+            heapq.heapify(heap)
+            slots = []
+            while heap and len(slots) < count:
+                slot_start = heap[0][0]
+                tables = []
+                while heap and heap[0][0] == slot_start:
+                    _, rank, table_id = heapq.heappop(heap)
+                    tables.append((rank, table_id))
+                    later = self._next_free(table_id, slot_start + self.slot_minutes, duration, horizon)
+                    if later is not None:
+                        heapq.heappush(heap, (later, rank, table_id))
+                slots.append((slot_start, [table_id for _, table_id in sorted(tables)]))
+            return slots
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AvailabilityEngine:
+    """Engine for the process-wide store, built on first use (and again if the store is replaced)"""
+    global _engine
+    store = get_store()
+    with _engine_lock:
+        if _engine is None or _engine.store is not store:
+            _engine = AvailabilityEngine(store)
+        return _engine
+
@@ -1,17 +1,98 @@
+import atexit
 import json
-import copy
+import threading
 from typing import Dict, Any
 import os
 
+from .sandbox import WorkerPool, run_code
+from .storage import RestaurantStore, WriteConflict, conflict_backoff, json_patch
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+SEED_PATH = os.path.join(DATA_DIR, 'restaurant_database.json')
+
+# Times a write is re-run on a fresh snapshot when a concurrent session committed first
+COMMIT_ATTEMPTS = int(os.getenv('RESTAURANT_COMMIT_ATTEMPTS', 5))
+
+# Largest serialized patch returned in full (RESTAURANT_PATCH_MAX_CHARS, unset or 0 for no cap)
+PATCH_MAX_CHARS = int(os.getenv('RESTAURANT_PATCH_MAX_CHARS', 0))
+
+_store = None
+_pool = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RestaurantStore:
+    """
+    Process-wide store, opened on first use. The SQLite file (RESTAURANT_DB_PATH,
+    default restaurant_database.sqlite) is seeded from restaurant_database.json
+    the first time it is created; after that the JSON file is only the seed.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = os.getenv('RESTAURANT_DB_PATH', os.path.join(DATA_DIR, 'restaurant_database.sqlite'))
+            _store = RestaurantStore(path, seed_path=SEED_PATH)
+        return _store
+
+
+def get_pool():
+    """
+    Sandbox workers for the exec tools, started on first use. Configured by
+    RESTAURANT_SANDBOX_WORKERS (0 runs code in-process, as before),
+    RESTAURANT_SANDBOX_TIMEOUT, RESTAURANT_SANDBOX_CPU_SECONDS and
+    RESTAURANT_SANDBOX_MEMORY_MB. Returns None when sandboxing is off or the
+    platform can't fork.
+    """
+    global _pool
+    store = get_store()
+    with _store_lock:
+        workers = int(os.getenv('RESTAURANT_SANDBOX_WORKERS', 2))
+        if _pool is None and workers > 0 and hasattr(os, 'fork'):
+            _pool = WorkerPool(
+                store.path,
+                size=workers,
+                timeout=float(os.getenv('RESTAURANT_SANDBOX_TIMEOUT', 10)),
+                cpu_seconds=int(os.getenv('RESTAURANT_SANDBOX_CPU_SECONDS', 5)),
+                memory_mb=int(os.getenv('RESTAURANT_SANDBOX_MEMORY_MB', 512))
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+
+def _run(code: str, write: bool) -> dict:
+    """run_code() reply from a sandbox worker, or from this process when sandboxing is off"""
+    store = get_store()
+    pool = get_pool()
+    if pool is None:
+        return run_code(store, code, write)
+    return pool.run("write" if write else "read", code)
+
+
+def _patch_response(patch: list, changes: dict) -> dict:
+    """{"patch": ops}, or the leading ops plus per-entry change counts when the patch is over PATCH_MAX_CHARS"""
+    if not PATCH_MAX_CHARS or len(json.dumps(patch, default=str)) <= PATCH_MAX_CHARS:
+        return {"patch": patch}
+    kept, size = [], 2
+    for op in patch:
+        size += len(json.dumps(op, default=str)) + 2
+        if size > PATCH_MAX_CHARS:
+            break
+        kept.append(op)
+    return {"patch": kept, "patch_truncated": True, "patch_ops": len(patch), "changes": changes}
+
+
 def execute_database_operation(operation_code: str) -> Dict[str, Any]:
     """
     Execute Python code to modify the restaurant database.
     
     The code has access to:
-    - 'db': The full database dictionary
+    - 'db': The full database dictionary (top-level entries are copied when first accessed)
     - Standard Python functions and libraries (json, datetime, etc.)
     
+    The code runs in a sandbox worker (see get_pool) under time and memory limits.
     The code should modify 'db' in place and can return a custom result.
+    On success the response carries 'patch', a JSON patch (RFC 6902) of what
+    the code changed, instead of the whole database.
     
     Examples:
     - Book a table: db['tables'][2]['status'] = 'reserved'
@@ -19,71 +100,52 @@ def execute_database_operation(operation_code: str) -> Dict[str, Any]:
     - Check availability: return [t for t in db['tables'] if t['status'] == 'available']
     """
     
-    # Load the current database
-    db_path = os.path.join(os.path.dirname(__file__), '..', '..', 'restaurant_database.json')
-    
     try:
-        with open(db_path, 'r') as f:
-            db = json.load(f)
-    except FileNotFoundError:
-        return {"error": "Database file not found", "success": False}
-    except json.JSONDecodeError:
-        return {"error": "Invalid JSON in database file", "success": False}
-    
-    # Create a backup for safety
-    original_db = copy.deepcopy(db)
-    
-    # Create execution context with useful imports
-    exec_context = {
-        'db': db,
-        'json': json,
-        'copy': copy,
-        'result': None,  # Variable for the code to store return values
-    }
-    
-    # Import datetime for reservation management
-    exec_code = """
-import datetime
-from datetime import datetime, timedelta
-import random
-import string
-
-# Helper function to generate IDs
-def generate_id(prefix=''):
-    return prefix + ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-
-# Your code starts here
-""" + operation_code
-    
-    try:
-        # Execute the provided code
-        exec(exec_code, exec_context)
-        
-        # Get the modified database
-        modified_db = exec_context['db']
-        
-        # Save the modified database back to file
-        with open(db_path, 'w') as f:
-            json.dump(modified_db, f, indent=2)
-        
-        # Prepare the response
+        store = get_store()
+        for attempt in range(COMMIT_ATTEMPTS):
+            reply = _run(operation_code, write=True)
+            if not reply["ok"]:
+                # Nothing was written, so there is nothing to roll back
+                return {
+                    "success": False,
+                    "error": reply["error"],
+                    "error_type": reply["error_type"],
+                    "message": "Database operation failed, changes rolled back"
+                }
+            # Write only the rows the code changed; rerun it on the newer data if it raced another session
+            try:
+                before, after, changes = store.apply_plan(reply["plan"])
+                break
+            except WriteConflict:
+                if attempt == COMMIT_ATTEMPTS - 1:
+                    raise
+                conflict_backoff(attempt)
+
+        # Prepare the response: only what changed, as a JSON patch
         response = {
             "success": True,
             "message": "Database operation completed successfully",
-            "modified_db": modified_db,
+            **_patch_response(json_patch(before, after, reply["plan"]), changes),
         }
         
         # If the code set a custom result, include it
-        if exec_context.get('result') is not None:
-            response['result'] = exec_context['result']
+        if reply["result"] is not None:
+            response['result'] = reply["result"]
             
         return response
         
+    except FileNotFoundError:
+        return {"error": "Database file not found", "success": False}
+    except json.JSONDecodeError:
+        return {"error": "Invalid JSON in database file", "success": False}
+    except WriteConflict as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "message": "Database changed while the operation ran, nothing was written; run it again"
+        }
     except Exception as e:
-        # Restore original database on error
-        with open(db_path, 'w') as f:
-            json.dump(original_db, f, indent=2)
-            
         return {
             "success": False,
             "error": str(e),
@@ -100,46 +162,29 @@ def read_only_database_query(query_code: str) -> Dict[str, Any]:
     Useful for complex queries and data analysis.
     """
     
-    # Load the current database
-    db_path = os.path.join(os.path.dirname(__file__), '..', '..', 'restaurant_database.json')
-    
+    # Any changes the query makes stay in its private view
     try:
-        with open(db_path, 'r') as f:
-            db = json.load(f)
+        reply = _run(query_code, write=False)
     except FileNotFoundError:
         return {"error": "Database file not found", "success": False}
     except json.JSONDecodeError:
         return {"error": "Invalid JSON in database file", "success": False}
-    
-    # Create execution context
-    exec_context = {
-        'db': db,
-        'json': json,
-        'result': None,
-    }
-    
-    # Import datetime for queries
-    exec_code = """
-import datetime
-from datetime import datetime, timedelta
-
-# Your query starts here
-""" + query_code
-    
-    try:
-        # Execute the provided code
-        exec(exec_code, exec_context)
-        
-        # Return the result
-        return {
-            "success": True,
-            "result": exec_context.get('result', "Query executed but no result was set. Use 'result = ...' to return data.")
-        }
-        
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
             "error_type": type(e).__name__,
             "message": "Query failed"
-        }
\ No newline at end of file
+        }
+    
+    if not reply["ok"]:
+        return {
+            "success": False,
+            "error": reply["error"],
+            "error_type": reply["error_type"],
+            "message": "Query failed"
+        }
+    return {
+        "success": True,
+        "result": reply["result"] if reply["result_set"] else "Query executed but no result was set. Use 'result = ...' to return data."
+    }
@@ -0,0 +1,377 @@
+"""
+Typed restaurant operations. Each one looks rows up through the store's
+indexes and commits a record-level Batch, so a booking never compiles code,
+copies a collection or serializes the database.
+"""
+import copy
+import random
+import string
+from datetime import datetime
+from typing import Dict, Any, List
+
+from .availability import DEFAULT_DURATION, from_minute, get_engine, to_minute
+from .database_tool import COMMIT_ATTEMPTS, get_store
+from .storage import WriteConflict, conflict_backoff
+
+
+def generate_id(prefix: str = '') -> str:
+    return prefix + ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+
+
+def _unique_id(batch, collection: str, prefix: str) -> str:
+    while True:
+        new_id = generate_id(prefix)
+        if not batch.find(collection, id=new_id):
+            return new_id
+
+
+def _error(message: str) -> Dict[str, Any]:
+    return {"success": False, "error": message}
+
+
+def _whole_number(value, name: str, minimum: int = None):
+    """
+    A tool argument as an int. Models sometimes send numbers as strings, so
+    "4" is accepted; anything that isn't a whole number is not.
+
+    Returns:
+        (int, None), or (None, error response)
+    """
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None, _error(f"{name} must be a whole number")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None, _error(f"{name} must be a whole number")
+    if minimum is not None and number < minimum:
+        return None, _error(f"{name} must be at least {minimum}")
+    return number, None
+
+
+def _commit(build) -> Dict[str, Any]:
+    """
+    Run build(batch) against the latest snapshot and commit what it staged.
+    build returns the response; a response with success False is not committed.
+    """
+    store = get_store()
+    for attempt in range(COMMIT_ATTEMPTS):
+        batch = store.batch()
+        response = build(batch)
+        if not response.get("success"):
+            return response
+        try:
+            store.commit(batch)
+            return response
+        except WriteConflict:
+            if attempt == COMMIT_ATTEMPTS - 1:
+                return _error("The database is busy, please try again")
+            conflict_backoff(attempt)
+
+
+def find_available_tables(party_size: int, location: str = None) -> Dict[str, Any]:
+    """
+    Tables that are free now and seat party_size, smallest fitting first.
+
+    Args:
+        party_size: Number of guests
+        location: Only tables in this location (e.g. 'window'), any when None
+    """
+    party_size, error = _whole_number(party_size, "party_size", minimum=1)
+    if error:
+        return error
+    tables = get_store().snapshot()["tables"]
+    fitting = [
+        record for capacity in tables.index("capacity")
+        if isinstance(capacity, (int, float)) and capacity >= party_size
+        for _, record in tables.find(capacity=capacity, status="available")
+        if location is None or record.get("location") == location
+    ]
+    fitting.sort(key=lambda table: (table["capacity"], table["id"]))
+    return {"success": True, "tables": fitting}
+
+
+def check_availability(party_size: int, date: str, time: str, duration_minutes: int = None) -> Dict[str, Any]:
+    """
+    Tables free for a party at a date and time for the length of the visit.
+
+    Args:
+        party_size: Number of guests
+        date: YYYY-MM-DD
+        time: HH:MM (24h)
+        duration_minutes: Length of the visit (default DEFAULT_DURATION)
+    """
+    try:
+        start = to_minute(date, time)
+    except (TypeError, ValueError):
+        return _error("date must be YYYY-MM-DD and time HH:MM")
+    party_size, error = _whole_number(party_size, "party_size", minimum=1)
+    if error:
+        return error
+    if duration_minutes is not None:
+        duration_minutes, error = _whole_number(duration_minutes, "duration_minutes", minimum=1)
+        if error:
+            return error
+    engine = get_engine()
+    duration = duration_minutes or engine.default_duration
+    tables = engine.free_tables(party_size, start, duration)
+    response = {"success": True, "date": date, "time": time, "duration_minutes": duration, "tables": tables}
+    if not engine.is_open(start, start + duration):
+        response["message"] = "The restaurant is not open for that whole visit"
+    return response
+
+
+def find_open_slots(
+    party_size: int,
+    date: str,
+    time: str = "00:00",
+    duration_minutes: int = None,
+    count: int = 5
+) -> Dict[str, Any]:
+    """
+    The next open start times for a party, from a date and time onwards.
+
+    Args:
+        party_size: Number of guests
+        date: YYYY-MM-DD to start searching from
+        time: HH:MM to start searching from
+        duration_minutes: Length of the visit (default DEFAULT_DURATION)
+        count: Start times to return (at most 50)
+    """
+    try:
+        start = to_minute(date, time)
+    except (TypeError, ValueError):
+        return _error("date must be YYYY-MM-DD and time HH:MM")
+    party_size, error = _whole_number(party_size, "party_size", minimum=1)
+    if error:
+        return error
+    if duration_minutes is not None:
+        duration_minutes, error = _whole_number(duration_minutes, "duration_minutes", minimum=1)
+        if error:
+            return error
+    count, error = _whole_number(count, "count", minimum=1)
+    if error:
+        return error
+    slots = get_engine().next_slots(party_size, start, duration_minutes, count=min(count, 50))
+    return {
+        "success": True,
+        "slots": [
+            {"date": slot_date, "time": slot_time, "table_ids": table_ids}
+            for slot_start, table_ids in slots
+            for slot_date, slot_time in [from_minute(slot_start)]
+        ]
+    }
+
+
+def create_reservation(
+    customer_name: str,
+    phone: str,
+    party_size: int,
+    date: str,
+    time: str,
+    table_id: int = None,
+    special_requests: str = "",
+    duration_minutes: int = None
+) -> Dict[str, Any]:
+    """
+    Book a reservation. With a table_id it is confirmed once the table is big
+    enough and no other reservation holds it during the visit; without one it
+    is pending until a table is assigned.
+    """
+    try:
+        start = to_minute(date, time)
+    except (TypeError, ValueError):
+        return _error("date must be YYYY-MM-DD and time HH:MM")
+    party_size, error = _whole_number(party_size, "party_size", minimum=1)
+    if error:
+        return error
+    if table_id is not None:
+        table_id, error = _whole_number(table_id, "table_id")
+        if error:
+            return error
+    if duration_minutes is not None:
+        duration_minutes, error = _whole_number(duration_minutes, "duration_minutes", minimum=1)
+        if error:
+            return error
+    end = start + (duration_minutes or DEFAULT_DURATION)
+    engine = get_engine()
+
+    def build(batch):
+        # The engine answers from a version at least as new as the batch's; reading
+        # these makes the commit conflict if either changed in between
+        batch.reads.update(("reservations", "restaurant_info"))
+        is_open, busy_until = engine.check_hold(table_id, start, end)
+        if not is_open:
+            return _error(f"The restaurant is not open for the whole visit on {date} at {time}")
+        if table_id is not None:
+            tables = batch.find("tables", id=table_id)
+            if not tables:
+                return _error(f"Table {table_id} does not exist")
+            if tables[0][1]["capacity"] < party_size:
+                return _error(f"Table {table_id} seats {tables[0][1]['capacity']}, the party is {party_size}")
+            if busy_until is not None:
+                busy_date, busy_time = from_minute(busy_until)
+                return _error(f"Table {table_id} is already reserved until {busy_date} {busy_time}")
+        reservation = {
+            "id": _unique_id(batch, "reservations", "RES"),
+            "customer_name": customer_name,
+            "phone": phone,
+            "table_id": table_id,
+            "party_size": party_size,
+            "date": date,
+            "time": time,
+            "status": "confirmed" if table_id is not None else "pending",
+            "special_requests": special_requests
+        }
+        if duration_minutes:
+            reservation["duration_minutes"] = duration_minutes
+        batch.append("reservations", reservation)
+        return {"success": True, "reservation": reservation}
+
+    return _commit(build)
+
+
+def cancel_reservation(reservation_id: str) -> Dict[str, Any]:
+    """Mark a reservation cancelled"""
+    def build(batch):
+        found = batch.find("reservations", id=reservation_id)
+        if not found:
+            return _error(f"Reservation {reservation_id} does not exist")
+        rowid, reservation = found[0]
+        if reservation.get("status") == "cancelled":
+            return _error(f"Reservation {reservation_id} is already cancelled")
+        reservation = {**reservation, "status": "cancelled"}
+        batch.update("reservations", rowid, reservation)
+        return {"success": True, "reservation": reservation}
+
+    return _commit(build)
+
+
+def seat_from_waitlist(waitlist_id: str = None, table_id: int = None) -> Dict[str, Any]:
+    """
+    Seat a waiting party: the given entry or the longest-waiting one, at the
+    given table or the smallest available table that fits.
+    """
+    if table_id is not None:
+        table_id, error = _whole_number(table_id, "table_id")
+        if error:
+            return error
+
+    def build(batch):
+        if waitlist_id is not None:
+            entries = batch.find("waitlist", id=waitlist_id)
+            if not entries:
+                return _error(f"Waitlist entry {waitlist_id} does not exist")
+            if entries[0][1].get("status") != "waiting":
+                return _error(f"Waitlist entry {waitlist_id} is {entries[0][1].get('status')}, not waiting")
+        else:
+            entries = sorted(batch.find("waitlist", status="waiting"), key=lambda entry: entry[1].get("timestamp", ""))
+            if not entries:
+                return _error("Nobody is waiting")
+        entry_rowid, entry = entries[0]
+
+        if table_id is not None:
+            tables = batch.find("tables", id=table_id)
+            if not tables:
+                return _error(f"Table {table_id} does not exist")
+            if tables[0][1]["status"] != "available":
+                return _error(f"Table {table_id} is {tables[0][1]['status']}")
+            if tables[0][1]["capacity"] < entry["party_size"]:
+                return _error(f"Table {table_id} seats {tables[0][1]['capacity']}, the party is {entry['party_size']}")
+        else:
+            tables = sorted(
+                (pair for pair in batch.find("tables", status="available") if pair[1]["capacity"] >= entry["party_size"]),
+                key=lambda pair: (pair[1]["capacity"], pair[1]["id"])
+            )
+            if not tables:
+                return _error(f"No available table seats {entry['party_size']}")
+        table_rowid, table = tables[0]
+
+        entry = {**entry, "status": "seated"}
+        table = {**table, "status": "occupied"}
+        batch.update("waitlist", entry_rowid, entry)
+        batch.update("tables", table_rowid, table)
+        return {"success": True, "waitlist_entry": entry, "table": table}
+
+    return _commit(build)
+
+
+def _menu_items(menu: dict) -> dict:
+    return {item["id"]: item for items in menu.values() for item in items}
+
+
+def add_order_items(table_id: int, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Add items to the table's open order, opening one if there is none.
+
+    Args:
+        table_id: Table the order belongs to
+        items: [{"item_id": menu item id, "quantity": n}]
+    """
+    if not items:
+        return _error("items must not be empty")
+    table_id, error = _whole_number(table_id, "table_id")
+    if error:
+        return error
+
+    def build(batch):
+        tables = batch.find("tables", id=table_id)
+        if not tables:
+            return _error(f"Table {table_id} does not exist")
+        menu = _menu_items(batch.get("menu"))
+        added = []
+        total = 0.0
+        for item in items:
+            menu_item = menu.get(item.get("item_id"))
+            if menu_item is None:
+                return _error(f"Unknown menu item {item.get('item_id')}")
+            if not menu_item.get("available", True):
+                return _error(f"{menu_item['name']} is not available")
+            quantity, error = _whole_number(item.get("quantity", 1), "quantity", minimum=1)
+            if error:
+                return error
+            added.append({"item_id": menu_item["id"], "quantity": quantity, "status": "pending"})
+            total += menu_item["price"] * quantity
+
+        open_orders = batch.find("active_orders", table_id=table_id, status="in_progress")
+        if open_orders:
+            rowid, order = open_orders[0]
+            order = copy.deepcopy(order)
+            order["items"].extend(added)
+            order["total"] = round(order["total"] + total, 2)
+            batch.update("active_orders", rowid, order)
+        else:
+            order = {
+                "id": _unique_id(batch, "active_orders", "ORD"),
+                "table_id": table_id,
+                "items": added,
+                "status": "in_progress",
+                "total": round(total, 2),
+                "timestamp": datetime.now().isoformat(timespec="seconds")
+            }
+            batch.append("active_orders", order)
+            table_rowid, table = tables[0]
+            batch.update("tables", table_rowid, {**table, "order_id": order["id"]})
+        return {"success": True, "order": order}
+
+    return _commit(build)
+
+
+def get_menu(category: str = None, available_only: bool = True) -> Dict[str, Any]:
+    """
+    Menu items by category.
+
+    Args:
+        category: One of the menu's categories (e.g. 'desserts'), all when None
+        available_only: Leave out items that are not available
+    """
+    menu = get_store().snapshot()["menu"].values()
+    if category is not None and category not in menu:
+        return _error(f"Unknown category {category}; categories are {', '.join(menu)}")
+    categories = [category] if category is not None else list(menu)
+    return {
+        "success": True,
+        "menu": {
+            name: [item for item in menu[name] if item.get("available", True) or not available_only]
+            for name in categories
+        }
+    }
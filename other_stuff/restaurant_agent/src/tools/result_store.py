@@ -0,0 +1,146 @@
+import hashlib
+import json
+import re
+from collections import OrderedDict
+
+# One path step: .key / key, [index], [start:end] or [*]
+_PATH_STEP_RE = re.compile(r"\.?([A-Za-z_][\w\-]*)|\[(\*|-?\d+|-?\d*:-?\d*)\]")
+
+fetch_result_tool_schema = {
+    "type": "function",
+    "function": {
+        "name": "fetch_result",
+        "description": "Read part of a large tool result that was stored under a handle (e.g. 'res_3f2a9c1b'). Use the summary you were given to pick a path. Paths follow the summary's keys, e.g. 'result.tables' | 'result.tables[0]' | 'result.tables[2:5]' | 'result.tables[*].status' | 'result.menu.desserts' | 'result.restaurant_info.opening_hours.friday'. Empty path returns the top-level summary.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Handle of the stored result"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Dotted path with [index], [start:end] and [*] steps; empty for the top level"
+                }
+            },
+            "required": ["handle"]
+        }
+    }
+}
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _shape(value, depth: int = 1) -> str:
+    """One-line description of a value without its contents, nested objects expanded depth levels"""
+    if isinstance(value, dict):
+        if depth > 0:
+            inner = [f"{key}: {_shape(item, depth - 1)}" for key, item in list(value.items())[:12]]
+        else:
+            inner = list(value)[:8]
+        return "{" + ", ".join(inner) + (", ..." if len(value) > len(inner) else "") + "}"
+    if isinstance(value, list):
+        return f"list[{len(value)}]"
+    return _clip(json.dumps(value, default=str), 40)
+
+
+def summarize(value, max_chars: int = 600) -> str:
+    """Bounded outline of a JSON value: keys with their shapes, list lengths and a sample item"""
+    if isinstance(value, dict):
+        lines = [f"{key}: {_shape(item)}" for key, item in value.items()]
+    elif isinstance(value, list):
+        lines = [f"list of {len(value)} items"]
+        if value:
+            lines.append(f"first item: {_clip(json.dumps(value[0], default=str), 200)}")
+    else:
+        return _clip(str(value), max_chars)
+    return _clip("; ".join(lines), max_chars)
+
+
+def resolve_path(value, path: str):
+    """Follow a dotted/indexed path into value; raises KeyError/IndexError/ValueError on a bad path"""
+    path = (path or "").strip()
+    position = 0
+    while position < len(path):
+        match = _PATH_STEP_RE.match(path, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Cannot parse path at '{path[position:]}'")
+        position = match.end()
+        key, index = match.groups()
+        if key is not None:
+            if isinstance(value, list):
+                # tables[*].status style projection over a list
+                value = [item[key] for item in value if isinstance(item, dict) and key in item]
+            elif isinstance(value, dict):
+                value = value[key]
+            else:
+                raise KeyError(key)
+        elif index == "*":
+            if not isinstance(value, (list, dict)):
+                raise ValueError("[*] needs a list or object")
+            value = list(value.values()) if isinstance(value, dict) else value
+        elif ":" in index:
+            start, end = (int(part) if part else None for part in index.split(":"))
+            value = value[start:end]
+        else:
+            value = value[int(index)]
+    return value
+
+
+class ResultStore:
+    """
+    Side store for large tool results. Each result is kept once under a
+    stable content-derived handle; the agent context only carries the
+    handle and a bounded summary, and fetch() serves slices on demand.
+    """
+
+    def __init__(self, max_entries: int = 64, max_fetch_chars: int = 4000):
+        """
+        Args:
+            max_entries: Results kept before the least recently used one is evicted
+            max_fetch_chars: Largest slice fetch() returns in full; larger ones come back summarized
+        """
+        self.max_entries = max_entries
+        self.max_fetch_chars = max_fetch_chars
+        self._results = OrderedDict()
+
+    def put(self, value) -> str:
+        """Store value and return its handle (the same content always gets the same handle)"""
+        serialized = json.dumps(value, sort_keys=True, default=str)
+        handle = "res_" + hashlib.sha1(serialized.encode("utf-8")).hexdigest()[:10]
+        self._results[handle] = value
+        self._results.move_to_end(handle)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return handle
+
+    def get(self, handle: str):
+        return self._results[handle]
+
+    def __contains__(self, handle: str) -> bool:
+        return handle in self._results
+
+    def fetch(self, handle: str, path: str = "") -> dict:
+        """Tool entry point: the value at path inside a stored result, or a summary if it is still too large"""
+        if handle not in self._results:
+            return {"success": False, "error": f"Unknown handle {handle}; it may have expired, run the original tool again"}
+        self._results.move_to_end(handle)
+        try:
+            value = resolve_path(self._results[handle], path)
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            return {"success": False, "error": f"Bad path '{path}': {type(e).__name__}: {e}", "summary": summarize(self._results[handle])}
+
+        serialized = json.dumps(value, default=str)
+        if not path or len(serialized) > self.max_fetch_chars:
+            return {
+                "success": True,
+                "handle": handle,
+                "path": path,
+                "truncated": True,
+                "size_chars": len(serialized),
+                "summary": summarize(value),
+                "hint": "Narrow the path to read the values"
+            }
+        return {"success": True, "handle": handle, "path": path, "result": value}
@@ -0,0 +1,242 @@
+"""
+Sandboxed execution of model-written database code.
+
+A WorkerPool keeps pre-forked worker processes that each hold their own
+RestaurantStore snapshot, the prelude already executed and a cache of
+compiled code. A call sends (mode, code) and gets back the result and, for
+writes, a row-level plan that the parent commits. Calls run under a CPU
+time limit and an address-space limit; a worker that exceeds either, or
+the wall-clock timeout, is killed and replaced.
+
+Messages are marshal-encoded: plans and most results are plain
+dicts/lists/strings/numbers, and anything else is passed through JSON with
+default=str.
+"""
+import copy
+import json
+import marshal
+import multiprocessing
+import os
+import queue
+import signal
+from functools import lru_cache
+
+from loguru import logger
+
+from .storage import RestaurantStore, DatabaseView
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, workers run unlimited
+    resource = None
+
+PRELUDE = """
+import datetime
+from datetime import datetime, timedelta
+import random
+import string
+
+# Helper function to generate IDs
+def generate_id(prefix=''):
+    return prefix + ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+"""
+
+_prelude_code = compile(PRELUDE, "<prelude>", "exec")
+
+
+@lru_cache(maxsize=256)
+def compile_operation(code: str):
+    """Compiled model code; the agent often retries the same string"""
+    return compile(code, "<operation>", "exec")
+
+
+def prelude_namespace() -> dict:
+    """Globals with the prelude already executed, copied for every call"""
+    namespace = {}
+    exec(_prelude_code, namespace)
+    return namespace
+
+
+def run_code(store: RestaurantStore, code: str, write: bool, base: dict = None) -> dict:
+    """
+    Run code against a private view of the store's latest snapshot.
+
+    Returns:
+        {"ok": True, "result": ..., "result_set": bool, "plan": row-level plan or None}
+        or {"ok": False, "error": ..., "error_type": ...}
+    """
+    db = store.view()
+    exec_context = dict(base or prelude_namespace())
+    exec_context.update({'db': db, 'json': json, 'copy': copy, 'result': None})
+    try:
+        exec(compile_operation(code), exec_context)
+        plan = None
+        if write:
+            if exec_context['db'] is not db:
+                # The code rebound 'db' to a new dict: treat it as the new content
+                replacement = exec_context['db']
+                for name in [name for name in db if name not in replacement]:
+                    del db[name]
+                db.update(replacement)
+            plan = store.plan(db)
+        return {"ok": True, "result": exec_context.get('result'), "result_set": 'result' in exec_context, "plan": plan}
+    except MemoryError:
+        raise
+    except Exception as e:
+        return {"ok": False, "error": str(e), "error_type": type(e).__name__}
+
+
+def _plain(value):
+    """value as marshal-able builtins (views and other objects go through JSON)"""
+    try:
+        if not isinstance(value, DatabaseView):
+            marshal.dumps(value)
+            return value
+    except ValueError:
+        pass
+    return json.loads(json.dumps(value, default=str))
+
+
+def _limit_memory(memory_bytes: int):
+    """Cap the address space at what the worker already maps plus memory_bytes"""
+    mapped = 0
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    mapped = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    limit = mapped + memory_bytes
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(conn, db_path: str, cpu_seconds: int, memory_bytes: int):
+    # Inherited sinks belong to the parent's writer threads, which don't exist here
+    logger.remove()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    store = RestaurantStore(db_path)
+    base = prelude_namespace()
+    if resource is not None and memory_bytes:
+        _limit_memory(memory_bytes)
+
+    while True:
+        try:
+            mode, code = marshal.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+        if resource is not None and cpu_seconds:
+            used = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(used.ru_utime + used.ru_stime) + cpu_seconds
+            # SIGXCPU at the soft limit terminates the worker; the parent respawns it
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+        try:
+            reply = run_code(store, code, mode == "write", base)
+            if reply["ok"]:
+                reply["result"] = _plain(reply["result"])
+        except MemoryError:
+            reply = {"ok": False, "error": "Memory limit exceeded", "error_type": "MemoryError", "recycle": True}
+        conn.send_bytes(marshal.dumps(reply))
+        if reply.get("recycle"):
+            return
+
+
+class _Worker:
+    def __init__(self, context, db_path: str, cpu_seconds: int, memory_bytes: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, db_path, cpu_seconds, memory_bytes),
+            daemon=True,
+            name="restaurant-sandbox"
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pre-forked sandbox workers for the exec tools. Workers are started once
+    and reused; one that times out, exceeds its limits or dies is replaced.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = 2,
+        timeout: float = 10.0,
+        cpu_seconds: int = 5,
+        memory_mb: int = 512
+    ):
+        """
+        Args:
+            db_path: SQLite file the workers open (already created and seeded by the parent)
+            size: Worker processes, i.e. tool calls that can run at once
+            timeout: Wall-clock seconds per call before the worker is killed
+            cpu_seconds: CPU seconds per call (whole seconds, enforced with RLIMIT_CPU)
+            memory_mb: Extra address space a worker may map while running a call
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self._context = multiprocessing.get_context("fork")
+        self._idle = queue.Queue()
+        self._closed = False
+        self.respawns = 0
+        for _ in range(size):
+            self._idle.put(self._spawn())
+        logger.info(f"Started {size} sandbox workers for {db_path}")
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.db_path, self.cpu_seconds, self.memory_bytes)
+
+    def _replace(self, worker: _Worker, reason: str):
+        worker.kill()
+        self.respawns += 1
+        logger.warning(f"Sandbox worker {worker.process.pid} replaced: {reason}")
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def run(self, mode: str, code: str) -> dict:
+        """
+        Run code in a worker. mode is "write" (the reply carries a plan) or "read".
+
+        Returns:
+            The run_code() reply, or {"ok": False, ...} when the worker had to be killed
+        """
+        worker = self._idle.get()
+        try:
+            worker.conn.send_bytes(marshal.dumps((mode, code)))
+            if not worker.conn.poll(self.timeout):
+                self._replace(worker, f"timed out after {self.timeout}s")
+                return {"ok": False, "error": f"Timed out after {self.timeout}s", "error_type": "TimeoutError"}
+            reply = marshal.loads(worker.conn.recv_bytes())
+        except (EOFError, OSError):
+            worker.process.join(timeout=5)
+            exitcode = worker.process.exitcode
+            if exitcode == -signal.SIGXCPU:
+                error, error_type = f"CPU time limit of {self.cpu_seconds}s exceeded", "TimeoutError"
+            else:
+                error, error_type = f"Sandbox worker died (exit code {exitcode})", "WorkerError"
+            self._replace(worker, error)
+            return {"ok": False, "error": error, "error_type": error_type}
+        if reply.pop("recycle", False):
+            self._replace(worker, reply["error"])
+        else:
+            self._idle.put(worker)
+        return reply
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
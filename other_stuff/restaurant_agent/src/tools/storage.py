@@ -0,0 +1,901 @@
+"""
+Embedded storage engine for the restaurant database.
+
+The database is persisted in SQLite (WAL mode), one row per list record or
+per top-level document, and held in memory as an immutable Snapshot. Tools
+get a DatabaseView: a dict that behaves like the old json.load() result but
+copies a top-level entry only when the code touches it. After the code has
+run, commit() diffs the touched entries against the snapshot and writes just
+the changed rows, so a booking costs a few row writes instead of a rewrite
+of the whole file.
+
+A commit can also be split in two: plan() turns a view into plain-data row
+operations (so a sandbox process can do the diffing) and commit_plan()
+writes them. Rows carry the version that wrote them and deletions leave
+tombstones, so a store in another process catches up by reading only what
+changed since its snapshot.
+
+Secondary indexes exist at both levels: SQLite expression indexes for the
+on-disk rows and lazily built in-memory indexes (field value -> row ids)
+that are carried forward incrementally from one snapshot to the next.
+"""
+import collections
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from difflib import SequenceMatcher
+
+import jsonpatch
+from filelock import FileLock
+from loguru import logger
+
+LIST, DOC = "list", "doc"
+
+# In-memory secondary indexes: collection -> indexed fields
+INDEXED_FIELDS = {
+    "tables": ("id", "status", "capacity"),
+    "reservations": ("id", "date", "time", "table_id", "status"),
+    "waitlist": ("id", "status"),
+    "active_orders": ("id", "table_id", "status"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    rowid INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    pos REAL NOT NULL,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS records_order ON records(collection, pos);
+CREATE INDEX IF NOT EXISTS tables_status_capacity
+    ON records(json_extract(data, '$.status'), json_extract(data, '$.capacity')) WHERE collection = 'tables';
+CREATE INDEX IF NOT EXISTS reservations_date_time
+    ON records(json_extract(data, '$.date'), json_extract(data, '$.time')) WHERE collection = 'reservations';
+CREATE INDEX IF NOT EXISTS orders_table
+    ON records(json_extract(data, '$.table_id')) WHERE collection = 'active_orders';
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ord INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tombstones (
+    rowid INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tombstones_version ON tombstones(version);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Commits remembered for changes_since(); readers further behind rebuild from a snapshot
+CHANGE_LOG_SIZE = 4096
+
+# Smallest gap between neighbouring positions before a collection is renumbered
+_MIN_GAP = 1e-9
+
+
+def encode(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class WriteConflict(Exception):
+    """Something a write read or changed was committed by someone else after the write's snapshot"""
+
+
+def conflict_backoff(attempt: int, base_delay: float = 0.005):
+    """Jittered exponential pause before retrying a conflicting write"""
+    time.sleep(random.uniform(0, base_delay * 2 ** attempt))
+
+
+class Collection:
+    """
+    One immutable version of a top-level database entry: a list of records
+    (kind LIST) or a single document (kind DOC, stored as one row).
+    """
+
+    def __init__(self, name: str, kind: str, rows: dict, indexes: dict = None, max_pos: float = None):
+        """
+        Args:
+            name: Top-level key in the database
+            kind: LIST or DOC
+            rows: rowid -> (pos, encoded record); never mutated after construction
+            indexes: Already built field indexes, field -> {value: frozenset(rowids)}
+            max_pos: Known upper bound on the row positions
+        """
+        self.name = name
+        self.kind = kind
+        self.rows = rows
+        self._indexes = indexes or {}
+        # Upper bound on positions, so appends don't need to scan the rows
+        self.max_pos = max((pos for pos, _ in rows.values()), default=-1.0) if max_pos is None else max_pos
+        self._order = None
+        self._values = None
+        self._by_rowid = None
+        self._lock = threading.Lock()
+
+    def order(self) -> list:
+        """Row ids in list order"""
+        if self._order is None:
+            self._order = sorted(self.rows, key=lambda rowid: (self.rows[rowid][0], rowid))
+        return self._order
+
+    def blobs(self) -> list:
+        return [self.rows[rowid][1] for rowid in self.order()]
+
+    def values(self):
+        """Decoded value shared by every reader of this version; must not be mutated"""
+        if self._values is None:
+            if self.kind == DOC:
+                self._values = json.loads(next(iter(self.rows.values()))[1])
+            else:
+                self._values = [json.loads(blob) for blob in self.blobs()]
+        return self._values
+
+    def copy(self):
+        """A private, mutable copy of the value"""
+        if self.kind == DOC:
+            return json.loads(next(iter(self.rows.values()))[1])
+        return [json.loads(blob) for blob in self.blobs()]
+
+    def record(self, rowid: int):
+        """Shared decoded record for a row id"""
+        if self._by_rowid is None:
+            self._by_rowid = dict(zip(self.order(), self.values()))
+        return self._by_rowid[rowid]
+
+    def index(self, field: str) -> dict:
+        """{value: frozenset(rowids)} for field, built on first use"""
+        with self._lock:
+            if field not in self._indexes:
+                buckets = {}
+                for rowid, record in zip(self.order(), self.values()):
+                    value = record.get(field) if isinstance(record, dict) else None
+                    if isinstance(value, (str, int, float, bool)) or value is None:
+                        buckets.setdefault(value, set()).add(rowid)
+                self._indexes[field] = {value: frozenset(rowids) for value, rowids in buckets.items()}
+            return self._indexes[field]
+
+    def find(self, **criteria) -> list:
+        """(rowid, record) pairs whose fields equal all criteria, in list order, using the field indexes"""
+        rowids = None
+        for field, value in criteria.items():
+            matches = self.index(field).get(value, frozenset())
+            rowids = matches if rowids is None else rowids & matches
+            if not rowids:
+                return []
+        rowids = rowids if rowids is not None else self.rows
+        return [(rowid, self.record(rowid)) for rowid in sorted(rowids, key=lambda rowid: self.rows[rowid][0])]
+
+    def lookup(self, **criteria) -> list:
+        """Records whose fields equal all criteria, in list order"""
+        return [record for _, record in self.find(**criteria)]
+
+    def apply(self, deleted: list, written: dict) -> "Collection":
+        """
+        New version with rows deleted and written (rowid -> (pos, blob)).
+        Indexes already built are carried over by patching only the
+        buckets of the rows that changed.
+        """
+        rows = dict(self.rows)
+        for rowid in deleted:
+            rows.pop(rowid, None)
+        rows.update(written)
+
+        indexes = {}
+        with self._lock:
+            built = dict(self._indexes)
+        changed = set(deleted) | set(written)
+        for field, old_index in built.items():
+            index = dict(old_index)
+            for rowid in changed:
+                if rowid in self.rows:
+                    old_value = _field(self.rows[rowid][1], field)
+                    if old_value in index:
+                        remaining = index[old_value] - {rowid}
+                        if remaining:
+                            index[old_value] = remaining
+                        else:
+                            del index[old_value]
+                if rowid in rows:
+                    new_value = _field(rows[rowid][1], field)
+                    index[new_value] = index.get(new_value, frozenset()) | {rowid}
+            indexes[field] = index
+        max_pos = max([self.max_pos] + [pos for pos, _ in written.values()])
+        collection = Collection(self.name, self.kind, rows, indexes, max_pos)
+        collection._order = self._carry_order(rows, set(deleted), written)
+        return collection
+
+    def _carry_order(self, rows: dict, deleted: set, written: dict):
+        """The new version's row order, derived from ours when it's already known and few rows are new"""
+        if self._order is None:
+            return None
+        added = [rowid for rowid in written if rowid in deleted or rowid not in self.rows]
+        if len(added) > 1000:
+            return None
+        order = [rowid for rowid in self._order if rowid not in deleted] if deleted else list(self._order)
+        for rowid in sorted(added, key=lambda rowid: (rows[rowid][0], rowid)):
+            # Binary search on (pos, rowid) without materializing every key
+            key, low, high = (rows[rowid][0], rowid), 0, len(order)
+            while low < high:
+                middle = (low + high) // 2
+                if key < (rows[order[middle]][0], order[middle]):
+                    high = middle
+                else:
+                    low = middle + 1
+            order.insert(low, rowid)
+        return order
+
+
+def _field(blob: str, field: str):
+    value = json.loads(blob)
+    value = value.get(field) if isinstance(value, dict) else None
+    return value if isinstance(value, (str, int, float, bool)) or value is None else None
+
+
+class Snapshot:
+    """Immutable committed state of the database at one version"""
+
+    def __init__(self, version: int, collections: dict, layout: int = 0):
+        self.version = version
+        self.collections = collections  # name -> Collection, in top-level key order
+        self.layout = layout
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.collections
+
+    def __getitem__(self, name: str) -> Collection:
+        return self.collections[name]
+
+    def values(self) -> dict:
+        """The whole database as shared, read-only values"""
+        return {name: collection.values() for name, collection in self.collections.items()}
+
+    def to_dict(self) -> dict:
+        """The whole database as plain, private objects (the old json.load() shape)"""
+        return {name: collection.copy() for name, collection in self.collections.items()}
+
+
+class DatabaseView(dict):
+    """
+    The `db` handed to tool code. Every top-level entry starts out as the
+    snapshot's shared value (so `result = db` serializes without copying)
+    and is swapped for a private copy the first time code reaches it
+    through db[...], get(), values() or items(). Only those copies are
+    diffed at commit.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        super().__init__((name, collection.values()) for name, collection in snapshot.collections.items())
+        self.snapshot = snapshot
+        self.touched = set()
+
+    def _materialize(self, name):
+        if name not in self.touched and name in self.snapshot:
+            dict.__setitem__(self, name, self.snapshot[name].copy())
+            self.touched.add(name)
+
+    def __getitem__(self, name):
+        self._materialize(name)
+        return dict.__getitem__(self, name)
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def __iter__(self):
+        # A Python-level __iter__ also keeps dict(db) / {**db} off the C fast path
+        return iter(list(dict.keys(self)))
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+    def __setitem__(self, name, value):
+        self.touched.add(name)
+        dict.__setitem__(self, name, value)
+
+    def __delitem__(self, name):
+        self.touched.add(name)
+        dict.__delitem__(self, name)
+
+    def pop(self, name, *default):
+        if name in self:
+            self._materialize(name)
+            self.touched.add(name)
+        return dict.pop(self, name, *default)
+
+    def setdefault(self, name, default=None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, value in dict(*args, **kwargs).items():
+            self[name] = value
+
+    def copy(self):
+        return {name: self[name] for name in self}
+
+    def changed(self) -> list:
+        """Top-level names whose content differs from the snapshot"""
+        names = []
+        for name in sorted(self.touched):
+            if name not in self:
+                if name in self.snapshot:
+                    names.append(name)
+            elif name not in self.snapshot or encode(dict.__getitem__(self, name)) != encode(self.snapshot[name].values()):
+                names.append(name)
+        return names
+
+
+class Batch:
+    """
+    Record-level changes against one snapshot, for code that already knows
+    which rows it touches (the typed operations). Nothing is decoded or
+    copied beyond the records passed in.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.ops = {}  # name -> {"update": {rowid: record}, "delete": set, "append": [record]}
+        self.reads = set()
+
+    def _ops(self, collection: str) -> dict:
+        if collection not in self.snapshot or self.snapshot[collection].kind != LIST:
+            raise KeyError(f"'{collection}' is not a list in the database")
+        return self.ops.setdefault(collection, {"update": {}, "delete": set(), "append": []})
+
+    def find(self, collection: str, **criteria) -> list:
+        """(rowid, record) pairs from the snapshot; records are shared, pass a copy to update()"""
+        self.reads.add(collection)
+        return self.snapshot[collection].find(**criteria) if collection in self.snapshot else []
+
+    def get(self, collection: str, default=None):
+        """Shared decoded value of a whole entry from the snapshot (do not mutate)"""
+        self.reads.add(collection)
+        return self.snapshot[collection].values() if collection in self.snapshot else default
+
+    def update(self, collection: str, rowid: int, record: dict):
+        self._ops(collection)["update"][rowid] = record
+
+    def delete(self, collection: str, rowid: int):
+        self._ops(collection)["delete"].add(rowid)
+
+    def append(self, collection: str, record: dict):
+        self._ops(collection)["append"].append(record)
+
+    def changed(self) -> list:
+        return sorted(name for name, ops in self.ops.items() if any(ops.values()))
+
+
+def _diff(old: list, new: list) -> list:
+    """SequenceMatcher opcodes, with the common prefix and suffix trimmed first so small edits stay cheap"""
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+
+    opcodes = []
+    if start:
+        opcodes.append(("equal", 0, start, 0, start))
+    if start < end_old or start < end_new:
+        matcher = SequenceMatcher(None, old[start:end_old], new[start:end_new], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            opcodes.append((tag, i1 + start, i2 + start, j1 + start, j2 + start))
+    if end_old < len(old):
+        opcodes.append(("equal", end_old, len(old), end_new, len(new)))
+    return opcodes
+
+
+def _record_key(blob: str) -> str:
+    """Identity used to pair edited records: their id, or the whole record when there is none"""
+    record = json.loads(blob)
+    if isinstance(record, dict) and "id" in record:
+        return "id:" + encode(record["id"])
+    return blob
+
+
+def _refine(opcodes: list, old: list, new: list) -> list:
+    """
+    Split replace chunks of different sizes by record identity, so a record
+    edited next to an insert or delete is still updated in place. Records
+    matched by id come back as equal-sized replace chunks.
+    """
+    refined = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag != "replace" or i2 - i1 == j2 - j1:
+            refined.append((tag, i1, i2, j1, j2))
+            continue
+        old_keys = [_record_key(blob) for blob in old[i1:i2]]
+        new_keys = [_record_key(blob) for blob in new[j1:j2]]
+        for sub_tag, a1, a2, b1, b2 in SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes():
+            refined.append(("replace" if sub_tag == "equal" else sub_tag, i1 + a1, i1 + a2, j1 + b1, j1 + b2))
+    return refined
+
+
+class RestaurantStore:
+    """
+    SQLite-backed store with an in-memory snapshot. Reads never touch the
+    file unless another process has committed since the last snapshot.
+    """
+
+    def __init__(self, path: str, seed_path: str = None):
+        """
+        Args:
+            path: SQLite database file, created on first use
+            seed_path: JSON database imported when the SQLite file is empty
+        """
+        self.path = path
+        self._local = threading.local()
+        self._commit_lock = threading.RLock()
+        self._file_lock = FileLock(path + ".lock", timeout=60)
+        # commits: written by this store; rebased: committed on top of others' newer commits; conflicts: rejected
+        self.stats = {"commits": 0, "rebased": 0, "conflicts": 0}
+        # (from version, to version, {name: (deleted rowids, written rowids)} or None when rows were reloaded)
+        self._changes = collections.deque(maxlen=CHANGE_LOG_SIZE)
+        with self._file_lock, self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(records)")]
+            if "version" not in columns:
+                conn.execute("ALTER TABLE records ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS records_version ON records(version)")
+            conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('version', 0)")
+            conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('layout', 0)")
+        with self._file_lock:
+            # Under the lock so two processes opening a new file don't both seed it
+            if seed_path and not self._has_data():
+                with open(seed_path, "r") as f:
+                    self.import_dict(json.load(f))
+                logger.info(f"Imported {seed_path} into {path}")
+        self._snapshot = self._load()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return _Transaction(conn)
+
+    def _has_data(self) -> bool:
+        return self._connection().conn.execute("SELECT 1 FROM collections LIMIT 1").fetchone() is not None
+
+    def _db_version(self, conn) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _layout(self, conn) -> int:
+        """Bumped whenever collections are added, dropped or rewritten"""
+        return conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()[0]
+
+    def _load(self, conn: sqlite3.Connection = None) -> Snapshot:
+        own = conn is None
+        conn = conn or self._connection().conn
+        if own:
+            conn.execute("BEGIN")
+        try:
+            version, layout = self._db_version(conn), self._layout(conn)
+            rows = {}
+            for rowid, name, pos, data in conn.execute("SELECT rowid, collection, pos, data FROM records"):
+                rows.setdefault(name, {})[rowid] = (pos, data)
+            kinds = conn.execute("SELECT name, kind FROM collections ORDER BY ord").fetchall()
+        finally:
+            if own:
+                conn.execute("COMMIT")
+        snapshot = Snapshot(version, {name: Collection(name, kind, rows.get(name, {})) for name, kind in kinds}, layout)
+        # Build the declared indexes up front; commits then keep them current
+        for name, fields in INDEXED_FIELDS.items():
+            if name in snapshot and snapshot[name].kind == LIST:
+                for field in fields:
+                    snapshot[name].index(field)
+        return snapshot
+
+    def snapshot(self) -> Snapshot:
+        """Latest committed snapshot; catches up on rows other processes have committed since"""
+        snapshot = self._snapshot
+        if self._db_version(self._connection().conn) != snapshot.version:
+            with self._commit_lock:
+                if self._db_version(self._connection().conn) != self._snapshot.version:
+                    self._snapshot = self._catch_up(self._snapshot)
+                snapshot = self._snapshot
+        return snapshot
+
+    def _catch_up(self, snapshot: Snapshot, conn: sqlite3.Connection = None) -> Snapshot:
+        """
+        Apply only the rows written and deleted since snapshot, or reload if
+        collections were added or dropped. Runs in its own read transaction
+        unless conn is already inside one.
+        """
+        own = conn is None
+        conn = conn or self._connection().conn
+        if own:
+            conn.execute("BEGIN")
+        try:
+            version, layout = self._db_version(conn), self._layout(conn)
+            if layout != snapshot.layout:
+                written, deleted = None, None
+            else:
+                written, deleted = {}, {}
+                for rowid, name, pos, data in conn.execute(
+                    "SELECT rowid, collection, pos, data FROM records WHERE version > ?", (snapshot.version,)
+                ):
+                    written.setdefault(name, {})[rowid] = (pos, data)
+                for rowid, name in conn.execute(
+                    "SELECT rowid, collection FROM tombstones WHERE version > ?", (snapshot.version,)
+                ):
+                    deleted.setdefault(name, []).append(rowid)
+        finally:
+            if own:
+                conn.execute("COMMIT")
+        if written is None:
+            logger.info(f"Reloading restaurant database at version {version}")
+            self._changes.append((snapshot.version, version, None))
+            return self._load(conn if not own else None)
+        entries = dict(snapshot.collections)
+        for name in set(written) | set(deleted):
+            if name in entries:
+                entries[name] = entries[name].apply(deleted.get(name, []), written.get(name, {}))
+        self._changes.append((snapshot.version, version, {
+            name: (tuple(deleted.get(name, ())), tuple(written.get(name, ()))) for name in set(written) | set(deleted)
+        }))
+        return Snapshot(version, entries, layout)
+
+    def changes_since(self, version: int, snapshot: Snapshot = None):
+        """
+        Row ids touched between version and snapshot (default: the latest),
+        as {name: (deleted rowids, written rowids)}; a row id can be in both.
+        None when the log no longer reaches back that far or rows were
+        reloaded wholesale, in which case the caller should rebuild.
+        """
+        snapshot = snapshot or self.snapshot()
+        with self._commit_lock:
+            log = list(self._changes)
+        merged, at = {}, version
+        for start, end, changes in log:
+            if end is None or end <= at:
+                if end is None and start >= at:
+                    return None
+                continue
+            if start > at or changes is None:
+                return None
+            for name, (deleted, written) in changes.items():
+                entry = merged.setdefault(name, (set(), set()))
+                entry[0].update(deleted)
+                entry[1].update(written)
+            at = end
+            if at >= snapshot.version:
+                break
+        return merged if at == snapshot.version else None
+
+    def view(self, snapshot: Snapshot = None) -> DatabaseView:
+        return DatabaseView(snapshot or self.snapshot())
+
+    def lookup(self, collection: str, **criteria) -> list:
+        """Indexed equality lookup on the latest snapshot (shared records, do not mutate)"""
+        snapshot = self.snapshot()
+        return snapshot[collection].lookup(**criteria) if collection in snapshot else []
+
+    def batch(self, snapshot: Snapshot = None) -> Batch:
+        return Batch(snapshot or self.snapshot())
+
+    def plan(self, change) -> dict:
+        """
+        Row-level plan for the entries a DatabaseView or Batch changed. Plans
+        are plain data (marshal/JSON safe), so one process can diff and
+        another commit.
+
+        Returns:
+            {"base": snapshot version, "layout": snapshot layout, "reads": names the change read,
+             "entries": {name: {"kind", "reset", "delete", "update", "insert"}}}
+        """
+        base = change.snapshot
+        entries = {}
+        for name in change.changed():
+            if isinstance(change, Batch):
+                entries[name] = _plan_ops(base[name], change.ops[name])
+            else:
+                entries[name] = _plan_entry(base.collections.get(name), dict.get(change, name, _MISSING))
+        reads = change.reads if isinstance(change, Batch) else change.touched
+        return {"base": base.version, "layout": base.layout, "reads": sorted(reads | set(entries)), "entries": entries}
+
+    def commit(self, change) -> dict:
+        """
+        Write the entries a DatabaseView or Batch changed, row by row, in one transaction.
+
+        Returns:
+            {name: {"inserted": n, "updated": n, "deleted": n}} for each changed entry
+
+        Raises:
+            WriteConflict: the database moved past the snapshot the change was based on
+        """
+        return self.commit_plan(self.plan(change))
+
+    def commit_plan(self, plan: dict) -> dict:
+        """Commit a plan from plan(); same result and errors as commit()"""
+        return self.apply_plan(plan)[2]
+
+    def apply_plan(self, plan: dict):
+        """
+        Commit a plan and return (snapshot before, snapshot after, change
+        counts); the two snapshots are what json_patch() compares.
+
+        Optimistic concurrency: if others committed since the plan's snapshot,
+        the plan still applies as long as none of the entries it read or
+        wrote changed in between (it is rebased onto the newer snapshot);
+        otherwise WriteConflict. The file lock serializes commits across
+        processes, the thread lock within this one.
+        """
+        if not plan["entries"]:
+            snapshot = self.snapshot()
+            return snapshot, snapshot, {}
+        with self._commit_lock, self._file_lock:
+            with self._connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                current = self._db_version(conn)
+                if current != plan["base"]:
+                    changed = self._changed_since(conn, plan)
+                    if changed:
+                        self.stats["conflicts"] += 1
+                        raise WriteConflict(
+                            f"{', '.join(changed)} changed after version {plan['base']} (database is at {current})"
+                        )
+                    self.stats["rebased"] += 1
+                base = self._snapshot
+                if base.version != current:
+                    base = self._snapshot = self._catch_up(base, conn)
+                version = current + 1
+                collections = dict(base.collections)
+                layout = base.layout
+                summary = {}
+                changes = {}
+                for name, entry in plan["entries"].items():
+                    if entry["reset"]:
+                        layout += 1
+                        changes = None
+                    collection, summary[name], written = self._apply_entry(conn, base.collections.get(name), name, entry, version)
+                    if changes is not None:
+                        changes[name] = (tuple(entry["delete"]), tuple(written))
+                    if collection is None:
+                        collections.pop(name, None)
+                    else:
+                        collections[name] = collection
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (version,))
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'layout'", (layout,))
+                # Keep top-level key order: existing entries first, new ones appended
+                ordered = {name: collections[name] for name in base.collections if name in collections}
+                ordered.update((name, c) for name, c in collections.items() if name not in ordered)
+                self._snapshot = Snapshot(version, ordered, layout)
+                self._changes.append((current, version, changes))
+                self.stats["commits"] += 1
+        return base, self._snapshot, summary
+
+    def _changed_since(self, conn, plan: dict) -> list:
+        """Entries the plan read or wrote that someone else changed after its snapshot"""
+        if self._layout(conn) != plan.get("layout"):
+            return ["the set of collections"]
+        changed = []
+        for name in plan["reads"]:
+            if conn.execute(
+                "SELECT 1 FROM records WHERE version > ? AND collection = ? LIMIT 1", (plan["base"], name)
+            ).fetchone() or conn.execute(
+                "SELECT 1 FROM tombstones WHERE version > ? AND collection = ? LIMIT 1", (plan["base"], name)
+            ).fetchone():
+                changed.append(name)
+        return changed
+
+    def _apply_entry(self, conn, old: Collection, name: str, entry: dict, version: int):
+        """Write one entry's plan; returns (new Collection or None, change counts)"""
+        counts = {"inserted": len(entry["insert"]), "updated": len(entry["update"]), "deleted": len(entry["delete"])}
+        if entry["reset"]:
+            ord_ = None
+            if old is not None:
+                counts["deleted"] += len(old.rows)
+                self._tombstone(conn, name, list(old.rows), version)
+                ord_ = conn.execute("SELECT ord FROM collections WHERE name = ?", (name,)).fetchone()[0]
+                conn.execute("DELETE FROM records WHERE collection = ?", (name,))
+                conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+            if entry["kind"] is None:
+                return None, counts, []
+            if ord_ is None:
+                ord_ = conn.execute("SELECT COALESCE(MAX(ord), -1) + 1 FROM collections").fetchone()[0]
+            conn.execute("INSERT INTO collections(name, kind, ord) VALUES (?, ?, ?)", (name, entry["kind"], ord_))
+            old = Collection(name, entry["kind"], {})
+
+        if entry["delete"]:
+            self._tombstone(conn, name, entry["delete"], version)
+            conn.executemany("DELETE FROM records WHERE rowid = ?", [(rowid,) for rowid in entry["delete"]])
+        written = {}
+        for rowid, blob in entry["update"]:
+            conn.execute("UPDATE records SET data = ?, version = ? WHERE rowid = ?", (blob, version, rowid))
+            written[rowid] = (old.rows[rowid][0], blob)
+        for pos, blob in entry["insert"]:
+            rowid = conn.execute(
+                "INSERT INTO records(collection, pos, data, version) VALUES (?, ?, ?, ?)", (name, pos, blob, version)
+            ).lastrowid
+            written[rowid] = (pos, blob)
+        return old.apply(entry["delete"], written), counts, list(written)
+
+    def _tombstone(self, conn, name: str, rowids: list, version: int):
+        conn.executemany(
+            "INSERT OR REPLACE INTO tombstones(rowid, collection, version) VALUES (?, ?, ?)",
+            [(rowid, name, version) for rowid in rowids]
+        )
+
+    def import_dict(self, data: dict):
+        """Replace the whole database with a json.load()-shaped dict"""
+        with self._commit_lock, self._file_lock, self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM records")
+            conn.execute("DELETE FROM collections")
+            conn.execute("DELETE FROM tombstones")
+            version = self._db_version(conn) + 1
+            for ord_, (name, value) in enumerate(data.items()):
+                kind = LIST if isinstance(value, list) else DOC
+                conn.execute("INSERT INTO collections(name, kind, ord) VALUES (?, ?, ?)", (name, kind, ord_))
+                records = value if kind == LIST else [value]
+                conn.executemany(
+                    "INSERT INTO records(collection, pos, data, version) VALUES (?, ?, ?, ?)",
+                    [(name, float(pos), encode(record), version) for pos, record in enumerate(records)]
+                )
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (version,))
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'layout'")
+        if hasattr(self, "_snapshot"):
+            self._changes.append((self._snapshot.version, None, None))
+            self._snapshot = self._load()
+
+    def export_dict(self) -> dict:
+        return self.snapshot().to_dict()
+
+
+def _plan_entry(old: Collection, value) -> dict:
+    """Diff a top-level value against its snapshot version; value is _MISSING when the entry was deleted"""
+    kind = None if value is _MISSING else (LIST if isinstance(value, list) else DOC)
+    entry = {"kind": kind, "reset": False, "delete": [], "update": [], "insert": []}
+    if old is None or kind != old.kind:
+        # New entry, removed entry or changed shape: replace all its rows
+        entry["reset"] = True
+        if kind == DOC:
+            entry["insert"] = [[0.0, encode(value)]]
+        elif kind == LIST:
+            entry["insert"] = [[float(pos), encode(record)] for pos, record in enumerate(value)]
+        return entry
+
+    if kind == DOC:
+        entry["update"] = [[next(iter(old.rows)), encode(value)]]
+        return entry
+
+    old_order = old.order()
+    old_blobs = old.blobs()
+    new_blobs = [encode(record) for record in value]
+    for tag, i1, i2, j1, j2 in _refine(_diff(old_blobs, new_blobs), old_blobs, new_blobs):
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            # Same records edited: update in place, keeping row ids and positions
+            entry["update"].extend([old_order[old_i], new_blobs[new_j]] for old_i, new_j in zip(range(i1, i2), range(j1, j2)))
+            continue
+        entry["delete"].extend(old_order[i1:i2])
+        if j2 > j1:
+            low = old.rows[old_order[i1 - 1]][0] if i1 > 0 else None
+            high = old.rows[old_order[i2]][0] if i2 < len(old_order) else None
+            positions = _positions(low, high, j2 - j1)
+            if positions is None:
+                # No room between the neighbours: renumber the whole list
+                return {"kind": LIST, "reset": True, "delete": [], "update": [],
+                        "insert": [[float(pos), blob] for pos, blob in enumerate(new_blobs)]}
+            entry["insert"].extend([pos, new_blobs[new_j]] for pos, new_j in zip(positions, range(j1, j2)))
+    return entry
+
+
+def _plan_ops(old: Collection, ops: dict) -> dict:
+    """Plan for a Batch's updates, deletes and appends to one list"""
+    return {
+        "kind": LIST,
+        "reset": False,
+        "delete": [rowid for rowid in ops["delete"] if rowid in old.rows],
+        "update": [
+            [rowid, encode(record)] for rowid, record in ops["update"].items()
+            if rowid in old.rows and rowid not in ops["delete"]
+        ],
+        "insert": [[old.max_pos + offset, encode(record)] for offset, record in enumerate(ops["append"], start=1)]
+    }
+
+
+def _pointer(*parts) -> str:
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts)
+
+
+def json_patch(before: Snapshot, after: Snapshot, plan: dict) -> list:
+    """
+    RFC 6902 patch taking before to after for the entries plan changed.
+    Removals come first (highest index first), then insertions at their
+    final index in ascending order, then field-level edits of updated
+    records, so the ops apply in sequence and their size follows the change.
+    """
+    ops = []
+    for name, entry in plan["entries"].items():
+        old, new = before.collections.get(name), after.collections.get(name)
+        if new is None:
+            ops.append({"op": "remove", "path": _pointer(name)})
+            continue
+        if entry["reset"] or old is None:
+            ops.append({"op": "replace" if old is not None else "add", "path": _pointer(name), "value": new.values()})
+            continue
+        if new.kind == DOC:
+            edits = jsonpatch.make_patch(old.values(), new.values()).patch
+            ops.extend({**op, "path": _pointer(name) + op["path"]} for op in edits)
+            continue
+
+        old_index = {rowid: i for i, rowid in enumerate(old.order())}
+        for i in sorted((old_index[rowid] for rowid in entry["delete"] if rowid in old_index), reverse=True):
+            ops.append({"op": "remove", "path": _pointer(name, i)})
+        new_order = new.order()
+        if entry["insert"]:
+            # A deleted row id can be handed out again to an inserted row
+            deleted = set(entry["delete"])
+            for i, rowid in enumerate(new_order):
+                if rowid not in old.rows or rowid in deleted:
+                    ops.append({"op": "add", "path": _pointer(name, i), "value": new.record(rowid)})
+        if entry["update"]:
+            new_index = {rowid: i for i, rowid in enumerate(new_order)}
+            for rowid, _ in entry["update"]:
+                edits = jsonpatch.make_patch(old.record(rowid), new.record(rowid)).patch
+                ops.extend({**op, "path": _pointer(name, new_index[rowid]) + op["path"]} for op in edits)
+    return ops
+
+
+def _positions(low: float, high: float, count: int) -> list:
+    """count positions strictly between low and high (either may be open), or None if there's no room"""
+    if low is None and high is None:
+        return [float(i) for i in range(count)]
+    if high is None:
+        return [low + i + 1 for i in range(count)]
+    if low is None:
+        return [high - count + i for i in range(count)]
+    step = (high - low) / (count + 1)
+    if step < _MIN_GAP:
+        return None
+    return [low + step * (i + 1) for i in range(count)]
+
+
+class _Missing:
+    pass
+
+
+_MISSING = _Missing()
+
+
+class _Transaction:
+    """`with` wrapper that commits on success and rolls back on error (connections run in autocommit mode)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def executemany(self, *args):
+        return self.conn.executemany(*args)
+
+    def executescript(self, script):
+        return self.conn.executescript(script)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
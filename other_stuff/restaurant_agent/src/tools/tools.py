@@ -1,11 +1,15 @@
 from .database_tool import execute_database_operation, read_only_database_query
+from .operations import (
+    find_available_tables, create_reservation, cancel_reservation,
+    seat_from_waitlist, add_order_items, get_menu, check_availability, find_open_slots
+)
 
 tools = [
     {
         "type": "function",
         "function": {
             "name": "execute_database_operation",
-            "description": "Execute Python code to MODIFY the restaurant database. Use for: booking tables, making/canceling reservations, updating orders, managing waitlist. Variables available: db (database), generate_id(prefix), datetime. Set 'result' to return data.",
+            "description": "Execute Python code to MODIFY the restaurant database. Use for: booking tables, making/canceling reservations, updating orders, managing waitlist. Variables available: db (database), generate_id(prefix), datetime. Set 'result' to return data. Returns a JSON patch of the changes made.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -34,10 +38,156 @@ tools = [
                 "required": ["query_code"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "find_available_tables",
+            "description": "List tables that are free now and seat the party, smallest fitting table first.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "party_size": {"type": "integer", "description": "Number of guests"},
+                    "location": {"type": "string", "description": "Only tables in this location, e.g. 'window'"}
+                },
+                "required": ["party_size"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_reservation",
+            "description": "Book a reservation. With table_id it is confirmed if the table fits the party and is free for the whole visit; without it the reservation is pending.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "customer_name": {"type": "string"},
+                    "phone": {"type": "string"},
+                    "party_size": {"type": "integer"},
+                    "date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "time": {"type": "string", "description": "HH:MM (24h)"},
+                    "table_id": {"type": "integer", "description": "Table to hold for the party"},
+                    "special_requests": {"type": "string"},
+                    "duration_minutes": {"type": "integer", "description": "How long the table is held (default 90)"}
+                },
+                "required": ["customer_name", "phone", "party_size", "date", "time"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "cancel_reservation",
+            "description": "Cancel a reservation by its id (e.g. 'RES001').",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "reservation_id": {"type": "string"}
+                },
+                "required": ["reservation_id"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "seat_from_waitlist",
+            "description": "Seat a waiting party and mark the table occupied. Defaults to the longest-waiting party and the smallest available table that fits.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "waitlist_id": {"type": "string", "description": "Waitlist entry to seat, e.g. 'WAIT001'"},
+                    "table_id": {"type": "integer", "description": "Table to seat them at"}
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "add_order_items",
+            "description": "Add menu items to a table's open order (opening a new order if needed) and update its total.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "table_id": {"type": "integer"},
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "item_id": {"type": "string", "description": "Menu item id, e.g. 'main001'"},
+                                "quantity": {"type": "integer"}
+                            },
+                            "required": ["item_id"]
+                        }
+                    }
+                },
+                "required": ["table_id", "items"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_menu",
+            "description": "Menu items with id, name, price and prep time, optionally for one category (appetizers, main_courses, desserts, beverages).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "category": {"type": "string"},
+                    "available_only": {"type": "boolean", "description": "Defaults to true"}
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "check_availability",
+            "description": "Tables that seat the party and are free for the whole visit starting at a date and time, within opening hours, smallest first. Use before create_reservation with a table_id.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "party_size": {"type": "integer"},
+                    "date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "time": {"type": "string", "description": "HH:MM (24h)"},
+                    "duration_minutes": {"type": "integer", "description": "Length of the visit (default 90)"}
+                },
+                "required": ["party_size", "date", "time"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "find_open_slots",
+            "description": "The next start times, from a date and time onwards, at which a table seats the party for the whole visit within opening hours, each with the free table ids. Use when the requested time is taken.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "party_size": {"type": "integer"},
+                    "date": {"type": "string", "description": "YYYY-MM-DD to search from"},
+                    "time": {"type": "string", "description": "HH:MM to search from (default 00:00)"},
+                    "duration_minutes": {"type": "integer", "description": "Length of the visit (default 90)"},
+                    "count": {"type": "integer", "description": "How many start times to return (default 5)"}
+                },
+                "required": ["party_size", "date"]
+            }
+        }
     }
 ]
 
 available_tools = {
     "execute_database_operation": execute_database_operation,
-    "read_only_database_query": read_only_database_query
+    "read_only_database_query": read_only_database_query,
+    "find_available_tables": find_available_tables,
+    "create_reservation": create_reservation,
+    "cancel_reservation": cancel_reservation,
+    "seat_from_waitlist": seat_from_waitlist,
+    "add_order_items": add_order_items,
+    "get_menu": get_menu,
+    "check_availability": check_availability,
+    "find_open_slots": find_open_slots
 }
\ No newline at end of file
@@ -0,0 +1,195 @@
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from loguru import logger
+
+from .stats import percentile
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: at most `rate` starts per second, bursting to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def read_queries(path: str) -> list:
+    """Read {"id": ..., "query": ...} lines; a missing id defaults to the line number"""
+    queries = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            queries.append({"id": str(record.get("id", line_number)), "query": record["query"]})
+    return queries
+
+
+def completed_ids(path: str) -> set:
+    """Ids already answered in an earlier run's output (errored records are retried)"""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+def drop_partial_line(path: str, chunk_size: int = 64 * 1024):
+    """
+    Truncate a last line left without its newline by a crash, so appended
+    records start on a line of their own. Its query is not in completed_ids
+    and runs again.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the newline ending the last complete record
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        logger.warning(f"Dropping a partial last line ({end - position} bytes) from {path}")
+        f.truncate(position)
+
+
+def summarize(records: list, wall_seconds: float) -> dict:
+    """Throughput, attempts per query and latency percentiles for a batch"""
+    latencies = [r["latency_s"] for r in records]
+    attempts = [r["attempts"] for r in records if "attempts" in r]
+    return {
+        "queries": len(records),
+        "succeeded": sum(1 for r in records if r.get("success")),
+        "errors": sum(1 for r in records if "error" in r),
+        "wall_s": wall_seconds,
+        "throughput_qps": len(records) / wall_seconds if wall_seconds else 0.0,
+        "attempts_mean": statistics.mean(attempts) if attempts else 0.0,
+        "attempts_max": max(attempts) if attempts else 0,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p90_s": percentile(latencies, 90),
+        "latency_p99_s": percentile(latencies, 99)
+    }
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    answer_fn: Callable[[str], dict],
+    concurrency: int = 4,
+    rate_limit: Optional[float] = None,
+    resume: bool = True,
+    thread_initializer: Optional[Callable] = None
+) -> dict:
+    """
+    Answer every query in input_path concurrently, appending one JSON line per
+    finished query to output_path as soon as it completes.
+
+    Args:
+        input_path: JSONL of {"id", "query"} records
+        output_path: JSONL results file, appended to
+        answer_fn: Runs one query and returns the orchestrator result dict
+        concurrency: Global cap on queries in flight
+        rate_limit: Maximum query starts per second (None for no limit)
+        resume: Skip ids that already have a successful record in output_path
+        thread_initializer: Called once in each worker thread
+
+    Returns:
+        The summary report for the queries run in this invocation
+    """
+    queries = read_queries(input_path)
+    if resume:
+        done = completed_ids(output_path)
+        if done:
+            logger.info(f"Resuming: {len(done)} of {len(queries)} queries already answered")
+        queries = [q for q in queries if q["id"] not in done]
+
+    limiter = RateLimiter(rate_limit, burst=concurrency) if rate_limit else None
+    records = []
+
+    def answer(item: dict) -> dict:
+        if limiter is not None:
+            limiter.acquire()
+        start = time.perf_counter()
+        record = {"id": item["id"], "query": item["query"]}
+        try:
+            result = answer_fn(item["query"])
+            record.update({
+                "success": result["success"],
+                "attempts": result["attempts"],
+                "answer": result["answer"],
+                "evaluation": result["evaluation"],
+                "usage": result.get("usage")
+            })
+        except Exception as e:
+            logger.error(f"Query {item['id']} failed: {e}")
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency_s"] = time.perf_counter() - start
+        return record
+
+    drop_partial_line(output_path)
+    start = time.perf_counter()
+    with open(output_path, "a") as out, ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="batch", initializer=thread_initializer
+    ) as pool:
+        futures = [pool.submit(answer, item) for item in queries]
+        for future in as_completed(futures):
+            # Only this thread writes, so lines are never interleaved
+            record = future.result()
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            records.append(record)
+            logger.info(f"Finished {len(records)}/{len(queries)}: {record['id']} in {record['latency_s']:.2f}s")
+
+    report = summarize(records, time.perf_counter() - start)
+    logger.info(f"Batch report: {report}")
+    return report
+
+
+def print_report(report: dict):
+    print(f"Queries:        {report['queries']} ({report['succeeded']} succeeded, {report['errors']} errors)")
+    print(f"Wall time:      {report['wall_s']:.1f}s")
+    print(f"Throughput:     {report['throughput_qps']:.2f} queries/s")
+    print(f"Attempts/query: {report['attempts_mean']:.2f} mean, {report['attempts_max']} max")
+    print(
+        f"Latency:        p50 {report['latency_p50_s']:.2f}s  "
+        f"p90 {report['latency_p90_s']:.2f}s  p99 {report['latency_p99_s']:.2f}s"
+    )
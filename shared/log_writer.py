@@ -0,0 +1,187 @@
+"""
+Buffered, non-blocking loguru file sink shared by all apps.
+
+The calling thread only formats the message and puts it on a queue; a
+background thread drains the queue, writes each batch with a single
+write()/flush() and rotates the file by size. Every app's init_logging()
+goes through init_file_logging(), so these environment variables apply to
+all of them:
+
+    LOG_PATH        log file (default: <app>/logs/run.log)
+    LOG_LEVEL       minimum level (default: DEBUG)
+    LOG_MAX_BYTES   rotate once the file reaches this size (default: 10 MB, 0 disables)
+    LOG_BACKUPS     rotated files kept as run.log.1 ... run.log.N (default: 3)
+    LOG_COMPRESS    gzip rotated files (default: 0)
+"""
+import atexit
+import gzip
+import os
+import queue
+import shutil
+import threading
+
+from loguru import logger
+
+LOG_FORMAT = "{time:HH:mm:ss.SSS} | {level:<8} | {message}\n"
+
+_active_sink = None
+_active_handler = None
+_lock = threading.Lock()
+
+
+class BufferedFileSink:
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 3,
+        compress: bool = False,
+        fresh: bool = True,
+        batch_size: int = 512,
+        flush_interval: float = 0.2,
+        max_queue: int = 100_000
+    ):
+        """
+        Args:
+            path: Log file, its directory is created if missing
+            max_bytes: Rotate when the file reaches this size (0 disables rotation)
+            backups: Number of rotated files to keep
+            compress: gzip rotated files (done on the writer thread)
+            fresh: Truncate the file on start instead of appending
+            batch_size: Maximum messages written per batch
+            flush_interval: Longest a message waits on the queue before it is written
+            max_queue: Messages buffered before new ones are dropped rather than blocking
+        """
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.backups = max(0, backups)
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        # Producers count drops while the writer thread takes and resets the count
+        self._dropped_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "w" if fresh else "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message):
+        """loguru sink entry point: never blocks the logging thread"""
+        self.enqueue(str(message))
+
+    def enqueue(self, item):
+        """Queue an item for _render() on the writer thread, or count it as dropped when the queue is full"""
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _drain(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        # The writer thread owns the file: it is the only one writing, rotating and closing it
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                batch = self._drain()
+                with self._dropped_lock:
+                    dropped, self.dropped = self.dropped, 0
+                data = self._render(batch) if batch else ""
+                if dropped:
+                    data += self._dropped_notice(dropped)
+                if data:
+                    self._write(data)
+        finally:
+            self._file.close()
+
+    def _render(self, batch: list) -> str:
+        """Text written for a batch of queued items; subclasses queue other things than lines"""
+        return "".join(batch)
+
+    def _dropped_notice(self, dropped: int) -> str:
+        return f"log writer dropped {dropped} messages (queue full)\n"
+
+    def _write(self, data: str):
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data.encode("utf-8"))
+        if self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        suffix = ".gz" if self.compress else ""
+        if self.backups:
+            for i in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{i}{suffix}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{i + 1}{suffix}")
+            if self.compress:
+                with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+    def close(self, timeout: float = 5.0):
+        """
+        Write out everything still queued and close the file. If the writer
+        thread is still busy after timeout, it closes the file when it is done.
+        """
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+
+def init_file_logging(default_path: str, level: str = "DEBUG", fresh: bool = True) -> BufferedFileSink:
+    """
+    Replace all loguru handlers with a BufferedFileSink.
+
+    Args:
+        default_path: Log file used when LOG_PATH is not set
+        level: Minimum level used when LOG_LEVEL is not set
+        fresh: Truncate the file on start (one file per run)
+
+    Returns:
+        The sink; it is flushed and closed automatically at interpreter exit
+    """
+    global _active_sink, _active_handler
+    with _lock:
+        if _active_sink is not None:
+            logger.remove(_active_handler)
+            _active_sink.close()
+        logger.remove()
+        _active_sink = BufferedFileSink(
+            os.getenv("LOG_PATH", default_path),
+            max_bytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+            backups=int(os.getenv("LOG_BACKUPS", 3)),
+            compress=os.getenv("LOG_COMPRESS", "0").lower() in ("1", "true", "yes"),
+            fresh=fresh
+        )
+        _active_handler = logger.add(_active_sink, format=LOG_FORMAT, level=os.getenv("LOG_LEVEL", level))
+        return _active_sink
+
+
+def _close_active_sink():
+    if _active_sink is not None:
+        _active_sink.close()
+
+
+atexit.register(_close_active_sink)
@@ -0,0 +1,144 @@
+import re
+from functools import lru_cache
+
+from loguru import logger
+
+from .retrieval.packing import count_tokens
+
+SUMMARY_HEADER = "SUMMARY OF EARLIER CONVERSATION:"
+# Chat format overhead per message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_THOUGHT_RE = re.compile(r"^Thought:\s*(.*)$", re.MULTILINE)
+_NEXT_ACTION_RE = re.compile(r"^Next Action:\s*(.*)$", re.MULTILINE)
+_TOOL_CALL_RE = re.compile(r"Called (?:tool )?(\w+) with args (.*?) and got (.*?) as the output", re.DOTALL)
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def summarize_entry(message: dict, limit: int = 200) -> str:
+    """
+    One summary line for an agent memory entry. THOUGHT entries keep only the
+    decision, ACTION entries the tool, its arguments and a clipped result;
+    user messages and answers are clipped.
+    """
+    role = message.get("role")
+    content = message.get("content") or ""
+    if role == "user":
+        return f"User: {_shorten(content, limit)}"
+
+    next_action = _NEXT_ACTION_RE.search(content)
+    if content.startswith("THOUGHT:") or next_action:
+        thought = _THOUGHT_RE.search(content)
+        decision = next_action.group(1).strip() if next_action else "?"
+        return f"Thought: {_shorten(thought.group(1) if thought else content, limit // 2)} -> {decision}"
+
+    calls = _TOOL_CALL_RE.findall(content)
+    if calls:
+        return "; ".join(
+            f"Called {name}({_shorten(args, limit // 4)}) -> {_shorten(result, limit // 2)}"
+            for name, args, result in calls
+        )
+    return f"Answer: {_shorten(content, limit)}"
+
+
+class MemoryManager:
+    """
+    Keeps an agent's message list within a token budget.
+
+    The leading system prompt and the last `keep_turns` turns (a turn starts
+    at a user message) stay verbatim. When the list exceeds `token_budget`,
+    everything in between is folded into a single rolling summary message,
+    which is itself capped at `summary_token_budget` by dropping its oldest
+    lines.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 8000,
+        keep_turns: int = 3,
+        summary_token_budget: int = 1000,
+        model: str = "gpt-4o-mini",
+        summarize=summarize_entry
+    ):
+        """
+        Args:
+            token_budget: Tokens the message list may reach before it is compacted
+            keep_turns: Most recent turns always kept verbatim
+            summary_token_budget: Cap on the rolling summary message
+            model: Model whose tokenizer is used for counting
+            summarize: Callable turning one memory entry into a summary line
+        """
+        self.token_budget = token_budget
+        self.keep_turns = max(1, keep_turns)
+        self.summary_token_budget = summary_token_budget
+        self.model = model
+        self.summarize = summarize
+        self.compactions = 0
+        self.tokens_saved = 0
+        self._count = lru_cache(maxsize=4096)(lambda text: count_tokens(text, self.model))
+
+    def message_tokens(self, message: dict) -> int:
+        return MESSAGE_OVERHEAD_TOKENS + self._count(message.get("content") or "")
+
+    def tokens(self, messages: list) -> int:
+        return sum(self.message_tokens(message) for message in messages)
+
+    @staticmethod
+    def is_summary(message: dict) -> bool:
+        return (message.get("content") or "").startswith(SUMMARY_HEADER)
+
+    def _split(self, messages: list, keep_turns: int):
+        """(head, previous summary lines, compactable entries, recent entries)"""
+        head_end = 0
+        while head_end < len(messages) and messages[head_end].get("role") == "system" \
+                and not self.is_summary(messages[head_end]):
+            head_end += 1
+        head, body = messages[:head_end], messages[head_end:]
+
+        summary_lines = []
+        if body and self.is_summary(body[0]):
+            summary_lines = body[0]["content"][len(SUMMARY_HEADER):].strip().splitlines()
+            body = body[1:]
+
+        turn_starts = [i for i, message in enumerate(body) if message.get("role") == "user"]
+        cut = turn_starts[-keep_turns] if len(turn_starts) >= keep_turns else 0
+        return head, summary_lines, body[:cut], body[cut:]
+
+    def _summary_message(self, lines: list) -> dict:
+        # Drop the oldest lines until the summary fits its own budget
+        while len(lines) > 1 and self._count("\n".join(lines)) > self.summary_token_budget:
+            lines = lines[1:]
+        return {"role": "assistant", "content": SUMMARY_HEADER + "\n" + "\n".join(lines)}
+
+    def fit(self, messages: list) -> list:
+        """
+        Return messages unchanged when they fit the budget, otherwise a
+        compacted copy. Falls back to keeping a single turn if the last
+        `keep_turns` turns alone are over budget.
+        """
+        before = self.tokens(messages)
+        if before <= self.token_budget:
+            return messages
+
+        compacted = messages
+        for keep_turns in sorted({self.keep_turns, 1}, reverse=True):
+            head, summary_lines, old, recent = self._split(messages, keep_turns)
+            if not old:
+                continue
+            lines = summary_lines + [self.summarize(message) for message in old]
+            compacted = head + [self._summary_message(lines)] + recent
+            if self.tokens(compacted) <= self.token_budget:
+                break
+
+        after = self.tokens(compacted)
+        if compacted is messages:
+            logger.warning(f"Agent memory is {before} tokens (budget {self.token_budget}) but the current turn can't be compacted")
+            return messages
+        self.compactions += 1
+        self.tokens_saved += before - after
+        logger.info(f"Compacted agent memory from {before} to {after} tokens ({len(messages)} -> {len(compacted)} messages)")
+        return compacted
@@ -0,0 +1,28 @@
+from .client import VectaraClient, AsyncVectaraClient, get_vectara_client
+from .cache import RetrievalCache, normalize_query
+from .backends import RetrievalBackend, VectaraBackend, LocalHybridBackend
+from .search import search, get_backend, set_backend, get_rag_cache
+from .ledger import EvidenceLedger
+from .batch import search_many, dedupe_queries
+from .packing import ContextPacker, count_tokens, strip_tags
+
+__all__ = [
+    'VectaraClient',
+    'AsyncVectaraClient',
+    'get_vectara_client',
+    'RetrievalCache',
+    'normalize_query',
+    'RetrievalBackend',
+    'VectaraBackend',
+    'LocalHybridBackend',
+    'search',
+    'get_backend',
+    'set_backend',
+    'get_rag_cache',
+    'EvidenceLedger',
+    'search_many',
+    'dedupe_queries',
+    'ContextPacker',
+    'count_tokens',
+    'strip_tags'
+]
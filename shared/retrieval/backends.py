@@ -0,0 +1,170 @@
+import json
+import math
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+
+import numpy as np
+from loguru import logger
+
+from .client import CORPUS_KEY, VectaraClient, get_vectara_client
+from .embeddings import load_embedder
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class RetrievalBackend(ABC):
+    """
+    A source of search results for rag_search.
+
+    search() returns Vectara-shaped results: a list of dicts with at least
+    'text' and 'score', best first. Callers apply their own score filtering.
+    """
+
+    name = "base"
+    # Whether results are worth putting in the persistent result cache
+    cacheable = True
+
+    @property
+    def corpus_version(self) -> str:
+        """Identifies the indexed corpus; cached results are scoped to it"""
+        return self.name
+
+    @abstractmethod
+    def search(self, query: str) -> list:
+        ...
+
+
+class VectaraBackend(RetrievalBackend):
+    """The hosted Vectara TPCH_dataset corpus"""
+
+    name = "vectara"
+
+    def __init__(self, client: VectaraClient = None, version: str = "1"):
+        """
+        Args:
+            client: Client to use (defaults to the process-wide pooled client,
+                whose search/chat mode comes from VECTARA_MODE)
+            version: Corpus version used to scope cached results
+        """
+        self.client = client
+        self.version = version
+
+    @property
+    def corpus_version(self) -> str:
+        return f"{CORPUS_KEY}:{self.version}"
+
+    def search(self, query: str) -> list:
+        return (self.client or get_vectara_client()).search(query)
+
+
+def _tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LocalHybridBackend(RetrievalBackend):
+    """
+    In-process hybrid search over a local corpus.
+
+    Scores every chunk with BM25 and with cosine similarity against a dense
+    embedding matrix, then mixes them like Vectara's lexical_interpolation:
+
+        score = (1 - lexical_interpolation) * cosine + lexical_interpolation * bm25 / max(bm25)
+    """
+
+    name = "local"
+    cacheable = False
+
+    def __init__(
+        self,
+        documents: list,
+        embedder=None,
+        lexical_interpolation: float = 0.3,
+        limit: int = 25,
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            documents: Chunk texts, or dicts with a 'text' key (other keys are returned as metadata)
+            embedder: Object with embed(list[str]) -> normalised np.ndarray
+            lexical_interpolation: Weight of the BM25 score in [0, 1]
+            limit: Maximum number of results per search
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+        """
+        self.documents = [doc if isinstance(doc, dict) else {"text": doc} for doc in documents]
+        self.embedder = embedder or load_embedder()
+        self.lexical_interpolation = lexical_interpolation
+        self.limit = limit
+        self.k1 = k1
+        self.b = b
+
+        texts = [doc["text"] for doc in self.documents]
+        self._build_lexical_index(texts)
+        self.matrix = self.embedder.embed(texts) if texts else np.zeros((0, 1), dtype=np.float32)
+        logger.info(f"Local hybrid index built: {len(texts)} chunks, {len(self.postings)} terms")
+
+    def _build_lexical_index(self, texts: list):
+        """Inverted index of term -> (doc ids, term frequencies) as NumPy arrays"""
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        postings = defaultdict(lambda: ([], []))
+        for doc_id, text in enumerate(texts):
+            counts = Counter(_tokenize(text))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term][0].append(doc_id)
+                postings[term][1].append(tf)
+
+        n_docs = len(texts)
+        self.postings = {}
+        for term, (doc_ids, tfs) in postings.items():
+            idf = math.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            self.postings[term] = (np.array(doc_ids), np.array(tfs, dtype=np.float32), idf)
+        avg_length = lengths.mean() if n_docs else 1.0
+        self._length_norm = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))
+
+    def bm25(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        for term in set(_tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tfs, idf = self.postings[term]
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + self._length_norm[doc_ids])
+        return scores
+
+    def search(self, query: str) -> list:
+        if not self.documents:
+            return []
+        lexical = self.bm25(query)
+        if lexical.max() > 0:
+            lexical = lexical / lexical.max()
+        dense = self.matrix @ self.embedder.embed([query])[0]
+        scores = (1 - self.lexical_interpolation) * dense + self.lexical_interpolation * lexical
+
+        limit = min(self.limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [{**self.documents[i], "score": float(scores[i])} for i in top]
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> "LocalHybridBackend":
+        """
+        Load a corpus from a JSONL file (one {"text": ...} object per line) or
+        from a directory of .txt/.md files split into paragraph chunks.
+        """
+        documents = []
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for file_name in sorted(files):
+                    if not file_name.endswith((".txt", ".md")):
+                        continue
+                    with open(os.path.join(root, file_name)) as f:
+                        for paragraph in re.split(r"\n\s*\n", f.read()):
+                            if paragraph.strip():
+                                documents.append({"text": paragraph.strip(), "source": file_name})
+        else:
+            with open(path) as f:
+                documents = [json.loads(line) for line in f if line.strip()]
+        return cls(documents, **kwargs)
@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from loguru import logger
+
+from .cache import normalize_query
+
+
+def dedupe_queries(queries: list) -> list:
+    """Drop queries that normalise to one already seen, keeping first-seen order"""
+    unique = {}
+    for query in queries:
+        unique.setdefault(normalize_query(query), query)
+    return list(unique.values())
+
+
+def search_many(queries: list, search_fn: Callable[[str], list], max_concurrency: int = 5) -> dict:
+    """
+    Run search_fn over the deduplicated queries with bounded concurrency.
+
+    Returns a mapping of query -> chunks in first-seen order. A query whose
+    search fails maps to an {"error": ...} payload instead of failing the batch.
+    """
+    unique = dedupe_queries(queries)
+    if not unique:
+        return {}
+
+    def run(query):
+        try:
+            return search_fn(query)
+        except Exception as e:
+            logger.error(f"Batch search failed for '{query}': {e}")
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    with ThreadPoolExecutor(max_workers=min(max(1, max_concurrency), len(unique)), thread_name_prefix="rag") as pool:
+        return dict(zip(unique, pool.map(run, unique)))
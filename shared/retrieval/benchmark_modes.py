@@ -0,0 +1,62 @@
+"""
+Compare Vectara latency in "search" and "chat" mode against the live API.
+
+    python -m shared.retrieval.benchmark_modes --repeat 5
+    python -m shared.retrieval.benchmark_modes --queries "Describe the nations table." "What is the region table?"
+
+The result cache is bypassed; every request goes to the network. Modes are
+interleaved per query so drift in network conditions affects both equally.
+"""
+import argparse
+import statistics
+import time
+
+from ..stats import percentile
+from .client import MODES, VectaraClient
+
+DEFAULT_QUERIES = [
+    "Describe the nations table.",
+    "Describe the regions table.",
+    "How are order totals calculated?",
+    "What does order status F mean?",
+]
+
+
+def run(queries: list, repeat: int) -> dict:
+    clients = {mode: VectaraClient(mode=mode) for mode in MODES}
+    timings = {mode: [] for mode in MODES}
+    # Warm both connection pools so handshakes are not attributed to either mode
+    for client in clients.values():
+        client.search(queries[0])
+
+    for _ in range(repeat):
+        for query in queries:
+            for mode, client in clients.items():
+                start = time.perf_counter()
+                client.search(query)
+                timings[mode].append(time.perf_counter() - start)
+
+    for client in clients.values():
+        client.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = run(args.queries, args.repeat)
+    print(f"{'mode':<8} {'n':>4} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for mode, samples in timings.items():
+        print(
+            f"{mode:<8} {len(samples):>4} {1000 * statistics.mean(samples):>9.1f} "
+            f"{1000 * percentile(samples, 50):>9.1f} {1000 * percentile(samples, 95):>9.1f}"
+        )
+    speedup = statistics.mean(timings["chat"]) / statistics.mean(timings["search"])
+    print(f"search mode is {speedup:.2f}x the speed of chat mode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+from .embeddings import load_embedder
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "corag", "rag_cache.sqlite")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace (exact-tier key)"""
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", query.lower())).strip()
+
+
+class CacheStats:
+    """Hit/miss/latency counters used to tune the semantic threshold"""
+
+    def __init__(self, history: int = 1000):
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+        self.fetch_seconds = 0.0
+        # (best similarity, was it a semantic hit) for recent non-exact lookups
+        self.similarities = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def record(self, tier: Optional[str], lookup_seconds: float, similarity: Optional[float] = None):
+        with self._lock:
+            self.lookup_seconds += lookup_seconds
+            if tier == "exact":
+                self.exact_hits += 1
+            elif tier == "semantic":
+                self.semantic_hits += 1
+            else:
+                self.misses += 1
+            if tier != "exact" and similarity is not None:
+                self.similarities.append((similarity, tier == "semantic"))
+
+    def record_fetch(self, seconds: float):
+        with self._lock:
+            self.fetch_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "lookups": lookups,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "avg_lookup_ms": 1000 * self.lookup_seconds / lookups if lookups else 0.0,
+                "avg_fetch_ms": 1000 * self.fetch_seconds / self.misses if self.misses else 0.0,
+                "recent_similarities": list(self.similarities)
+            }
+
+
+class RetrievalCache:
+    """
+    Two-tier persistent cache for retrieval results.
+
+    Tier one matches the normalised query exactly. Tier two embeds the query
+    locally and reuses the closest cached entry whose cosine similarity clears
+    `threshold`. Entries live in SQLite, expire after `ttl_seconds`, are
+    evicted least-recently-used beyond `max_entries`, and are scoped to a
+    corpus version and embedder so re-indexing the corpus or switching
+    embedders invalidates them.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        corpus_version: str = "1",
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        threshold: Optional[float] = None,
+        embedder=None
+    ):
+        """
+        Args:
+            path: SQLite file for the store (":memory:" for a process-local cache)
+            corpus_version: Entries written under another version (or by another embedder) are never served
+            ttl_seconds: Age after which an entry is treated as missing
+            max_entries: LRU capacity across all corpus versions
+            threshold: Minimum cosine similarity for a semantic hit (defaults to the embedder's)
+            embedder: Object with embed(list[str]) -> normalised np.ndarray
+        """
+        self.corpus_version = corpus_version
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.embedder = embedder or load_embedder()
+        self.threshold = threshold if threshold is not None else self.embedder.default_threshold
+        self.stats = CacheStats()
+        # Embeddings from another embedder (or dimension) can't be compared with ours
+        self._dim = getattr(self.embedder, "dim", 0)
+        self._scope = f"{corpus_version}:{getattr(self.embedder, 'name', type(self.embedder).__name__)}:{self._dim}"
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                corpus_version TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (corpus_version, query)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(last_access)")
+
+        # In-memory embedding matrix for the current corpus version (semantic tier)
+        self._keys = []
+        self._matrix = np.zeros((0, self._dim), dtype=np.float32)
+        self._load_index()
+
+    def _load_index(self):
+        rows = self._db.execute(
+            "SELECT query, embedding FROM entries WHERE corpus_version = ? AND created_at >= ?",
+            (self._scope, time.time() - self.ttl_seconds)
+        ).fetchall()
+        if self._dim:
+            rows = [row for row in rows if len(row[1]) == self._dim * 4]
+        self._keys = [row[0] for row in rows]
+        if rows:
+            self._matrix = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+
+    def _remove_from_index(self, keys: set):
+        keep = [i for i, key in enumerate(self._keys) if key not in keys]
+        self._keys = [self._keys[i] for i in keep]
+        self._matrix = self._matrix[keep]
+
+    def _fetch_row(self, key: str):
+        row = self._db.execute(
+            "SELECT results, created_at FROM entries WHERE corpus_version = ? AND query = ?",
+            (self._scope, key)
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[1] > self.ttl_seconds:
+            self._db.execute("DELETE FROM entries WHERE corpus_version = ? AND query = ?", (self._scope, key))
+            self._remove_from_index({key})
+            return None
+        self._db.execute(
+            "UPDATE entries SET last_access = ? WHERE corpus_version = ? AND query = ?",
+            (time.time(), self._scope, key)
+        )
+        return json.loads(row[0])
+
+    def get(self, query: str):
+        """Return cached results for query, or None on a miss"""
+        start = time.perf_counter()
+        key = normalize_query(query)
+        tier, similarity, results = None, None, None
+        with self._lock:
+            results = self._fetch_row(key)
+            if results is not None:
+                tier = "exact"
+            elif self._keys:
+                scores = self._matrix @ self.embedder.embed([key])[0]
+                best = int(np.argmax(scores))
+                similarity = float(scores[best])
+                if similarity >= self.threshold:
+                    results = self._fetch_row(self._keys[best])
+                    if results is not None:
+                        tier = "semantic"
+                        logger.info(f"Semantic cache hit ({similarity:.3f}): '{query}' -> '{self._keys[best]}'")
+        self.stats.record(tier, time.perf_counter() - start, similarity)
+        return results
+
+    def put(self, query: str, results: list):
+        """Store results for query and apply LRU eviction"""
+        key = normalize_query(query)
+        embedding = self.embedder.embed([key])[0].astype(np.float32)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (self._scope, key, embedding.tobytes(), json.dumps(results), now, now)
+            )
+            if key in self._keys:
+                self._matrix[self._keys.index(key)] = embedding
+            else:
+                self._keys.append(key)
+                self._matrix = np.vstack([self._matrix.reshape(-1, embedding.shape[0]), embedding])
+            self._evict()
+
+    def _evict(self):
+        (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count <= self.max_entries:
+            return
+        evicted = self._db.execute(
+            "SELECT corpus_version, query FROM entries ORDER BY last_access ASC LIMIT ?",
+            (count - self.max_entries,)
+        ).fetchall()
+        self._db.executemany("DELETE FROM entries WHERE corpus_version = ? AND query = ?", evicted)
+        self._remove_from_index({query for version, query in evicted if version == self._scope})
+
+    def get_or_fetch(self, query: str, fetch: Callable[[str], list]) -> list:
+        """Serve query from the cache, calling fetch(query) and storing the result on a miss"""
+        results = self.get(query)
+        if results is not None:
+            return results
+        start = time.perf_counter()
+        results = fetch(query)
+        self.stats.record_fetch(time.perf_counter() - start)
+        self.put(query, results)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._remove_from_index(set(self._keys))
@@ -0,0 +1,290 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+import requests
+from dotenv import load_dotenv
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+load_dotenv()
+
+DEFAULT_BASE_URL = "https://api.vectara.io"
+CUSTOMER_ID = "322088514"
+CORPUS_KEY = "TPCH_dataset"
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# "search" hits /v2/query with no generation or chat storage; "chat" keeps the
+# original /v2/chats call that also generates a summary and stores the chat
+MODES = ("search", "chat")
+
+
+def build_search_request(query: str) -> dict:
+    """Build the /v2/query request body: retrieval only, no generation"""
+    return {
+        "query": query,
+        "search": {
+            "corpora": [
+                {
+                    "corpus_key": CORPUS_KEY,
+                    "metadata_filter": "",
+                    "lexical_interpolation": 0.005,
+                    "custom_dimensions": {}
+                }
+            ],
+            "offset": 0,
+            "limit": 25,
+            "context_configuration": {
+                "sentences_before": 2,
+                "sentences_after": 2,
+                "start_tag": "%START_SNIPPET%",
+                "end_tag": "%END_SNIPPET%"
+            },
+            "reranker": {
+                "type": "customer_reranker",
+                "reranker_id": "rnk_272725719"
+            }
+        },
+        "stream_response": False
+    }
+
+
+def build_chat_request(query: str) -> dict:
+    """Build the /v2/chats request body (search + server-side generation + stored chat)"""
+    return {
+        **build_search_request(query),
+        "generation": {
+            "generation_preset_name": "vectara-summary-table-md-query-ext-jan-2025-gpt-4o",
+            "max_used_search_results": 5,
+            "response_language": "eng",
+            "enable_factual_consistency_score": True
+        },
+        "chat": {
+            "store": True
+        }
+    }
+
+
+def _resolve_mode(mode: Optional[str]) -> str:
+    mode = mode or os.getenv("VECTARA_MODE", "search")
+    if mode not in MODES:
+        raise ValueError(f"Unknown Vectara mode {mode!r}, expected one of {MODES}")
+    return mode
+
+
+def _request_for(mode: str, query: str) -> tuple:
+    """Endpoint path and body for a search in the given mode"""
+    if mode == "chat":
+        return "/v2/chats", build_chat_request(query)
+    return "/v2/query", build_search_request(query)
+
+
+def _is_idempotent(payload: dict) -> bool:
+    """A request that stores a chat turn creates it on the server, so repeating it duplicates the turn"""
+    return not (payload.get("chat") or {}).get("store")
+
+
+def _connect_failed(error: requests.RequestException) -> bool:
+    """Whether requests failed before the request could reach the server"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class _RetryPolicy:
+    """Shared retry/backoff logic for the sync and async clients"""
+
+    def __init__(self, max_retries: int, backoff_base: float, backoff_max: float):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None, idempotent: bool = True, connect_failed: bool = False) -> bool:
+        """
+        Args:
+            attempt: Retries made so far
+            status_code: Response status, None when the request raised
+            idempotent: Whether the request is safe to send twice
+            connect_failed: The request raised before it reached the server
+        """
+        if attempt >= self.max_retries:
+            return False
+        if status_code is not None:
+            return status_code in RETRY_STATUSES
+        # A read timeout or dropped connection may come after the server acted on the request
+        return idempotent or connect_failed
+
+
+class VectaraClient:
+    """
+    Pooled, keep-alive Vectara client.
+
+    A single requests.Session is reused for every call, so the TCP+TLS
+    handshake and the auth headers are paid for once per connection rather
+    than once per subquery. The session is safe to share across the
+    researcher's tool-call threads.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        pool_maxsize: int = 10,
+        mode: Optional[str] = None
+    ):
+        """
+        Args:
+            api_key: Vectara API key (defaults to VECTARA_API_KEY)
+            base_url: API root (defaults to VECTARA_BASE_URL or the public endpoint)
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for a response
+            max_retries: Retries on connection errors, timeouts, 429 and 5xx responses
+            backoff_base: Base delay for the jittered exponential backoff
+            backoff_max: Upper bound for a single backoff delay
+            pool_maxsize: Number of keep-alive connections kept in the pool
+            mode: "search" or "chat" (defaults to VECTARA_MODE, else "search")
+        """
+        self.mode = _resolve_mode(mode)
+        self.base_url = (base_url or os.getenv("VECTARA_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = _RetryPolicy(max_retries, backoff_base, backoff_max)
+
+        self.session = requests.Session()
+        # Retries are handled here so 429/5xx get jittered backoff, not urllib3's fixed policy
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "customer-id": CUSTOMER_ID,
+            "Content-Type": "application/json",
+            "x-api-key": api_key or os.getenv("VECTARA_API_KEY") or ""
+        })
+
+    def post(self, path: str, payload: dict) -> dict:
+        """
+        POST a JSON payload, retrying transient failures. A payload that
+        stores a chat turn is only retried when it never reached the server
+        or was refused with 429/5xx, not after a read timeout.
+        """
+        url = f"{self.base_url}{path}"
+        idempotent = _is_idempotent(payload)
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self.retry.should_retry(attempt, idempotent=idempotent, connect_failed=_connect_failed(e)):
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(f"Vectara request failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if not self.retry.should_retry(attempt, response.status_code) or response.ok:
+                    response.raise_for_status()
+                    return response.json()
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"Vectara returned {response.status_code}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def search(self, query: str) -> list:
+        """Run a search and return the raw search_results list"""
+        return self.post(*_request_for(self.mode, query))["search_results"]
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncVectaraClient:
+    """Async counterpart of VectaraClient backed by a pooled httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        pool_maxsize: int = 10,
+        mode: Optional[str] = None
+    ):
+        """Arguments match VectaraClient"""
+        self.mode = _resolve_mode(mode)
+        self.base_url = (base_url or os.getenv("VECTARA_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.retry = _RetryPolicy(max_retries, backoff_base, backoff_max)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "customer-id": CUSTOMER_ID,
+                "Content-Type": "application/json",
+                "x-api-key": api_key or os.getenv("VECTARA_API_KEY") or ""
+            },
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        )
+
+    async def post(self, path: str, payload: dict) -> dict:
+        """POST a JSON payload, retrying transient failures (same policy as VectaraClient.post)"""
+        idempotent = _is_idempotent(payload)
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(path, json=payload)
+            except (httpx.ConnectError, httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+                connect_failed = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if not self.retry.should_retry(attempt, idempotent=idempotent, connect_failed=connect_failed):
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(f"Vectara request failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if not self.retry.should_retry(attempt, response.status_code) or response.is_success:
+                    response.raise_for_status()
+                    return response.json()
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"Vectara returned {response.status_code}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def search(self, query: str) -> list:
+        """Run a search and return the raw search_results list"""
+        return (await self.post(*_request_for(self.mode, query)))["search_results"]
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_vectara_client() -> VectaraClient:
+    """Return the process-wide VectaraClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = VectaraClient()
+    return _client
@@ -0,0 +1,86 @@
+import hashlib
+import re
+
+import numpy as np
+from loguru import logger
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Question framing that carries no topic; dropping it keeps "Describe the
+# nations table." close to "What is the nations table?" and far from
+# "Describe the regions table."
+STOPWORDS = frozenset("""
+a an the is are was were be been of in on at to for from by with and or
+what which who whom whose how why when where does do did can could should would
+describe explain tell me about give show list define definition please i we you
+this that these those it its there their
+""".split())
+
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedder.
+
+    Hashes word unigrams and character trigrams into a fixed-size vector.
+    It only captures surface overlap, but that is exactly what near-duplicate
+    subqueries ("Describe the nations table." / "What is the nations table?")
+    share, and it costs microseconds per query.
+    """
+
+    name = "hashing"
+    default_threshold = 0.85
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str):
+        tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+        for token in tokens:
+            yield "w:" + token, 1.0
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                yield "c:" + padded[i:i + 3], 0.5
+
+    def embed(self, texts: list) -> np.ndarray:
+        """Return an L2-normalised (len(texts), dim) float32 matrix"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                matrix[row, bucket] += sign * weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency)"""
+
+    name = "sentence-transformers"
+    default_threshold = 0.88
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list) -> np.ndarray:
+        return np.asarray(
+            self.model.encode(texts, normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32
+        )
+
+
+def load_embedder(name: str = "hashing"):
+    """
+    Return an embedder by name, falling back to HashingEmbedder when
+    sentence-transformers is not installed.
+    """
+    if name == SentenceTransformerEmbedder.name:
+        try:
+            return SentenceTransformerEmbedder()
+        except ImportError:
+            logger.warning("sentence-transformers is not installed, falling back to hashing embedder")
+    return HashingEmbedder()
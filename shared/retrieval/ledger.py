@@ -0,0 +1,44 @@
+import threading
+from typing import Callable
+
+from .cache import normalize_query
+
+
+class EvidenceLedger:
+    """
+    Evidence retrieved during a single orchestrator run, keyed by subquery.
+
+    Retry attempts start from a fresh reasoning context but share the
+    ledger, so a subquery any earlier attempt already ran is answered from
+    memory instead of going back to the network.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, query: str):
+        with self._lock:
+            return self.entries.get(normalize_query(query))
+
+    def put(self, query: str, chunks: list):
+        with self._lock:
+            self.entries[normalize_query(query)] = chunks
+
+    def get_or_fetch(self, query: str, fetch: Callable[[str], list]) -> list:
+        """Return the recorded chunks for query, fetching and recording them on first use"""
+        chunks = self.get(query)
+        if chunks is not None:
+            with self._lock:
+                self.hits += 1
+            return chunks
+        chunks = fetch(query)
+        with self._lock:
+            self.misses += 1
+        self.put(query, chunks)
+        return chunks
+
+    def __len__(self):
+        return len(self.entries)
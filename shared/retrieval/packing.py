@@ -0,0 +1,119 @@
+import re
+from functools import lru_cache
+
+from loguru import logger
+
+_TAG_RE = re.compile(r"%(?:START|END)_SNIPPET%")
+_WORD_RE = re.compile(r"\w+")
+_SPACE_RE = re.compile(r"[ \t]+")
+
+
+def strip_tags(text: str) -> str:
+    """Remove Vectara snippet markers and collapse the spaces they leave behind"""
+    return _SPACE_RE.sub(" ", _TAG_RE.sub("", text)).strip()
+
+
+def shingles(text: str, size: int = 5) -> frozenset:
+    """Hashed word n-grams used for near-duplicate detection"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return frozenset([hash(tuple(words))])
+    return frozenset(hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1))
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for model, or None (cached) if it can't be loaded"""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable ({e}), estimating token counts")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """tiktoken count for model, or a 4-chars-per-token estimate if the encoding can't be loaded"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text))
+
+
+class ContextPacker:
+    """
+    Post-retrieval packing stage run before tool results reach the LLM.
+
+    Strips snippet tags, drops chunks whose shingle Jaccard similarity with
+    an already kept chunk reaches `similarity_threshold`, and keeps the best
+    chunks that fit in `token_budget`. Chunk lists arrive best-first from
+    the retriever, so rank is the score: every subquery's first chunk is
+    considered before any subquery's second, and so on.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 6000,
+        model: str = "gpt-4o-mini",
+        similarity_threshold: float = 0.8,
+        shingle_size: int = 5
+    ):
+        """
+        Args:
+            token_budget: Maximum chunk tokens kept per turn
+            model: Model whose tokenizer is used for counting
+            similarity_threshold: Jaccard similarity at which a chunk counts as a duplicate
+            shingle_size: Words per shingle
+        """
+        self.token_budget = token_budget
+        self.model = model
+        self.similarity_threshold = similarity_threshold
+        self.shingle_size = shingle_size
+
+    def _is_duplicate(self, candidate: frozenset, kept: list) -> bool:
+        for other in kept:
+            union = len(candidate | other)
+            if union and len(candidate & other) / union >= self.similarity_threshold:
+                return True
+        return False
+
+    def pack(self, groups: list) -> list:
+        """
+        Pack ranked chunk lists (one per subquery) into the token budget.
+
+        Returns lists in the same shape with cleaned, deduplicated chunks in
+        their original order; chunks that are duplicates or don't fit are dropped.
+        """
+        # (rank, group, position) so every group's best chunk is considered first
+        order = sorted(
+            (rank, g, rank) for g, group in enumerate(groups) for rank in range(len(group))
+        )
+        kept_shingles = []
+        kept = [set() for _ in groups]
+        cleaned = [[strip_tags(chunk) for chunk in group] for group in groups]
+        used = dropped_duplicates = dropped_budget = 0
+
+        for _, g, position in order:
+            text = cleaned[g][position]
+            if not text:
+                continue
+            chunk_shingles = shingles(text, self.shingle_size)
+            if self._is_duplicate(chunk_shingles, kept_shingles):
+                dropped_duplicates += 1
+                continue
+            tokens = count_tokens(text, self.model)
+            if used + tokens > self.token_budget:
+                dropped_budget += 1
+                continue
+            used += tokens
+            kept_shingles.append(chunk_shingles)
+            kept[g].add(position)
+
+        logger.info(
+            f"Packed {sum(len(k) for k in kept)} chunks in {used}/{self.token_budget} tokens "
+            f"({dropped_duplicates} near-duplicates, {dropped_budget} over budget dropped)"
+        )
+        return [[cleaned[g][i] for i in sorted(kept[g])] for g in range(len(groups))]
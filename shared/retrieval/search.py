@@ -0,0 +1,85 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from .backends import LocalHybridBackend, RetrievalBackend, VectaraBackend
+from .cache import DEFAULT_CACHE_PATH, RetrievalCache
+from .embeddings import load_embedder
+
+load_dotenv()
+
+_backend = None
+_cache = None
+_lock = threading.Lock()
+
+
+def get_backend() -> RetrievalBackend:
+    """
+    Return the process-wide retrieval backend.
+
+    Configured from the environment:
+        RETRIEVAL_BACKEND: "vectara" (default) or "local"
+        VECTARA_MODE: "search" (default, /v2/query) or "chat" (/v2/chats with generation)
+        LOCAL_CORPUS_PATH: JSONL file or directory of text files for the local backend
+        LOCAL_LEXICAL_INTERPOLATION: BM25 weight for the local backend (default 0.3)
+        LOCAL_EMBEDDER: "hashing" (default) or "sentence-transformers"
+        VECTARA_CORPUS_VERSION: Bump after re-indexing to invalidate cached results
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                if os.getenv("RETRIEVAL_BACKEND", "vectara") == "local":
+                    _backend = LocalHybridBackend.from_path(
+                        os.environ["LOCAL_CORPUS_PATH"],
+                        embedder=load_embedder(os.getenv("LOCAL_EMBEDDER", "hashing")),
+                        lexical_interpolation=float(os.getenv("LOCAL_LEXICAL_INTERPOLATION", 0.3))
+                    )
+                else:
+                    _backend = VectaraBackend(version=os.getenv("VECTARA_CORPUS_VERSION", "1"))
+    return _backend
+
+
+def set_backend(backend: RetrievalBackend):
+    """Swap the process-wide backend (e.g. for offline benchmarks)"""
+    global _backend
+    _backend = backend
+
+
+def get_rag_cache():
+    """
+    Return the process-wide RetrievalCache, or None when RAG_CACHE_ENABLED=0.
+
+    Configured from the environment:
+        RAG_CACHE_PATH: SQLite file (default ~/.cache/corag/rag_cache.sqlite)
+        RAG_CACHE_TTL: Entry lifetime in seconds (default one week)
+        RAG_CACHE_MAX_ENTRIES: LRU capacity (default 10000)
+        RAG_CACHE_THRESHOLD: Semantic-tier similarity threshold
+        RAG_CACHE_EMBEDDER: "hashing" (default) or "sentence-transformers"
+    """
+    global _cache
+    if os.getenv("RAG_CACHE_ENABLED", "1") == "0":
+        return None
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                threshold = os.getenv("RAG_CACHE_THRESHOLD")
+                _cache = RetrievalCache(
+                    path=os.getenv("RAG_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    corpus_version=get_backend().corpus_version,
+                    ttl_seconds=float(os.getenv("RAG_CACHE_TTL", 7 * 24 * 3600)),
+                    max_entries=int(os.getenv("RAG_CACHE_MAX_ENTRIES", 10000)),
+                    threshold=float(threshold) if threshold else None,
+                    embedder=load_embedder(os.getenv("RAG_CACHE_EMBEDDER", "hashing"))
+                )
+    return _cache
+
+
+def search(query: str) -> list:
+    """Raw search results for query from the configured backend, cached when worthwhile"""
+    backend = get_backend()
+    cache = get_rag_cache() if backend.cacheable else None
+    if cache is None:
+        return backend.search(query)
+    return cache.get_or_fetch(query, backend.search)
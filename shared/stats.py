@@ -0,0 +1,7 @@
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of samples (0.0 for an empty list)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
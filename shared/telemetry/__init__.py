@@ -0,0 +1,18 @@
+from .tracer import Span, Tracer, current_span, bind_context
+from .exporters import JsonlExporter, OTLPJsonExporter, to_otlp
+from .instrument import get_tracer, set_tracer, phase, tool_span, traced_completion
+
+__all__ = [
+    'Span',
+    'Tracer',
+    'current_span',
+    'bind_context',
+    'JsonlExporter',
+    'OTLPJsonExporter',
+    'to_otlp',
+    'get_tracer',
+    'set_tracer',
+    'phase',
+    'tool_span',
+    'traced_completion'
+]
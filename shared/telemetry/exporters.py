@@ -0,0 +1,136 @@
+"""
+Span exporters. Both write one JSON document per line. Exporting only
+queues the spans: they are serialized and written in batches on a
+BufferedFileSink writer thread, so ending a span never waits on the disk.
+A crashed run still leaves every span finished more than flush_interval
+before it on disk; open writers are flushed at interpreter exit.
+
+- JsonlExporter: one flat span dict per line (see Span.to_dict)
+- OTLPJsonExporter: one OTLP/JSON ExportTraceServiceRequest per line, the
+  format read by the OpenTelemetry Collector's otlpjsonfile receiver
+"""
+import atexit
+import json
+import weakref
+
+from loguru import logger
+
+from ..log_writer import BufferedFileSink
+from .tracer import LLM
+
+# Short attribute names used by the agents, mapped to OpenTelemetry GenAI
+# semantic conventions on export
+SEMCONV = {
+    "model": "gen_ai.request.model",
+    "response_model": "gen_ai.response.model",
+    "prompt_tokens": "gen_ai.usage.input_tokens",
+    "completion_tokens": "gen_ai.usage.output_tokens",
+    "tool": "gen_ai.tool.name",
+    "tool_call_id": "gen_ai.tool.call.id",
+}
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+_open_writers = weakref.WeakSet()
+
+
+class _LineWriter(BufferedFileSink):
+    def __init__(self, path: str, flush_interval: float = 0.2, max_queue: int = 100_000):
+        """
+        Args:
+            path: Output file, appended to; its directory is created if missing
+            flush_interval: Longest finished spans wait before they are written
+            max_queue: Exports buffered before new ones are dropped rather than blocking
+        """
+        super().__init__(path, max_bytes=0, fresh=False, flush_interval=flush_interval, max_queue=max_queue)
+        _open_writers.add(self)
+
+    def export(self, spans: list, service_name: str):
+        """Called by the tracer as spans end: only queues them"""
+        self.enqueue((spans, service_name))
+
+    def _render(self, batch: list) -> str:
+        return "".join(json.dumps(document, default=str) + "\n" for document in self._documents(batch))
+
+    def _documents(self, batch: list) -> list:
+        raise NotImplementedError
+
+    def _dropped_notice(self, dropped: int) -> str:
+        # A plain line would break readers of the JSONL file
+        logger.warning(f"{type(self).__name__} dropped {dropped} span exports (queue full)")
+        return ""
+
+
+class JsonlExporter(_LineWriter):
+    def _documents(self, batch: list) -> list:
+        return [{"service": service_name, **span.to_dict()} for spans, service_name in batch for span in spans]
+
+
+class OTLPJsonExporter(_LineWriter):
+    def _documents(self, batch: list) -> list:
+        # One ExportTraceServiceRequest per service for the whole batch
+        by_service = {}
+        for spans, service_name in batch:
+            by_service.setdefault(service_name, []).extend(spans)
+        return [to_otlp(spans, service_name) for service_name, spans in by_service.items()]
+
+
+@atexit.register
+def _close_open_writers():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+def _any_value(value) -> dict:
+    # OTLP/JSON encodes 64-bit integers as strings
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_any_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span) -> dict:
+    attributes = {"phase": span.phase, "span.kind": span.kind}
+    if span.kind == LLM:
+        attributes["gen_ai.operation.name"] = "chat"
+        attributes["gen_ai.system"] = "openai"
+    for key, value in span.attributes.items():
+        attributes[SEMCONV.get(key, key)] = value
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": SPAN_KIND_CLIENT if span.kind == LLM else SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _any_value(value)}
+            for key, value in attributes.items() if value is not None
+        ],
+        "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {"code": STATUS_UNSET}
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+def to_otlp(spans: list, service_name: str) -> dict:
+    """Wrap spans in an OTLP/JSON ExportTraceServiceRequest"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "shared.telemetry"},
+                "spans": [_otlp_span(span) for span in spans]
+            }]
+        }]
+    }
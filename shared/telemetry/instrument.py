@@ -0,0 +1,83 @@
+import os
+import threading
+
+from .exporters import JsonlExporter, OTLPJsonExporter
+from .tracer import LLM, PHASE, TOOL, Tracer
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Process-wide tracer, configured from the environment on first use:
+    TELEMETRY_JSONL_PATH and TELEMETRY_OTLP_PATH enable the file exporters
+    and TELEMETRY_SERVICE_NAME sets the service name.
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                exporters = []
+                if os.getenv("TELEMETRY_JSONL_PATH"):
+                    exporters.append(JsonlExporter(os.getenv("TELEMETRY_JSONL_PATH")))
+                if os.getenv("TELEMETRY_OTLP_PATH"):
+                    exporters.append(OTLPJsonExporter(os.getenv("TELEMETRY_OTLP_PATH")))
+                _tracer = Tracer(service_name=os.getenv("TELEMETRY_SERVICE_NAME", "agents"), exporters=exporters)
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    """Replace the process-wide tracer (None restores configuration from the environment)"""
+    global _tracer
+    with _tracer_lock:
+        _tracer = tracer
+
+
+def phase(name: str, **attributes):
+    """Span for one step of an agent loop, e.g. attempt, think, act or evaluate"""
+    return get_tracer().span(name, kind=PHASE, attributes=attributes)
+
+
+def tool_span(name: str, **attributes):
+    """Span for one tool invocation"""
+    return get_tracer().span(f"tool {name}", kind=TOOL, attributes={"tool": name, **attributes})
+
+
+def traced_completion(client, **kwargs):
+    """
+    Call client.chat.completions.create(**kwargs) inside an LLM span that
+    records the model, token usage and the number of retries the OpenAI
+    client made before it succeeded.
+
+    Args:
+        client: Anything exposing chat.completions (OpenAI client or an LLM wrapper)
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        The ChatCompletion, as create() would return it
+    """
+    model = kwargs.get("model")
+    with get_tracer().span(f"chat {model}", kind=LLM, attributes={"model": model}) as span:
+        completions = client.chat.completions
+        raw_api = getattr(completions, "with_raw_response", None)
+        if raw_api is not None and not kwargs.get("stream"):
+            # The raw response carries retries_taken; parse() gives back the usual object
+            raw = raw_api.create(**kwargs)
+            completion = raw.parse()
+            retries = getattr(raw, "retries_taken", 0)
+        else:
+            completion = completions.create(**kwargs)
+            retries = 0
+
+        usage = getattr(completion, "usage", None)
+        span.set(
+            response_model=getattr(completion, "model", None),
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            retries=retries
+        )
+        choices = getattr(completion, "choices", None)
+        if choices:
+            span.set(finish_reason=choices[0].finish_reason)
+        return completion
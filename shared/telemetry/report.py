@@ -0,0 +1,95 @@
+"""
+Summarise a JSONL span file written by JsonlExporter: where each trace's
+time went, by phase and span kind.
+
+    TELEMETRY_JSONL_PATH=spans.jsonl python main.py
+    python -m shared.telemetry.report spans.jsonl
+    python -m shared.telemetry.report spans.jsonl --last 3
+"""
+import argparse
+import json
+from collections import OrderedDict, defaultdict
+
+
+def load_traces(path: str) -> "OrderedDict[str, list]":
+    """Spans grouped by trace id, in the order the traces first appear"""
+    traces = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                span = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Truncated last line of a killed run
+            traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def summarize(spans: list) -> dict:
+    """
+    Totals for one trace. Phase time is the wall time of phase spans; LLM
+    and tool time is summed per call, so concurrent calls can exceed it.
+    """
+    roots = [span for span in spans if not span["parent_id"]]
+    by_phase = defaultdict(lambda: {"count": 0, "ms": 0.0})
+    llm = {"calls": 0, "ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "retries": 0, "errors": 0}
+    tools = defaultdict(lambda: {"calls": 0, "ms": 0.0, "errors": 0})
+
+    for span in spans:
+        attributes = span.get("attributes", {})
+        if span["kind"] == "phase" and span["parent_id"]:
+            by_phase[span["name"]]["count"] += 1
+            by_phase[span["name"]]["ms"] += span["latency_ms"]
+        elif span["kind"] == "llm":
+            llm["calls"] += 1
+            llm["ms"] += span["latency_ms"]
+            llm["prompt_tokens"] += attributes.get("prompt_tokens", 0)
+            llm["completion_tokens"] += attributes.get("completion_tokens", 0)
+            llm["retries"] += attributes.get("retries", 0)
+            llm["errors"] += span["status"] == "error"
+        elif span["kind"] == "tool":
+            tool = tools[attributes.get("tool", span["name"])]
+            tool["calls"] += 1
+            tool["ms"] += span["latency_ms"]
+            tool["errors"] += span["status"] == "error"
+
+    return {
+        "name": roots[0]["name"] if roots else "?",
+        "wall_ms": sum(span["latency_ms"] for span in roots),
+        "phases": dict(by_phase),
+        "llm": llm,
+        "tools": dict(tools)
+    }
+
+
+def print_summary(trace_id: str, summary: dict):
+    print(f"trace {trace_id[:12]}  {summary['name']}  {summary['wall_ms']:.0f} ms")
+    for name, totals in summary["phases"].items():
+        print(f"  phase {name:<12} {totals['count']:>4}x {totals['ms']:>10.1f} ms")
+    llm = summary["llm"]
+    print(
+        f"  llm   {llm['calls']:>4} calls {llm['ms']:>10.1f} ms  "
+        f"{llm['prompt_tokens']} in / {llm['completion_tokens']} out tokens  "
+        f"{llm['retries']} retries  {llm['errors']} errors"
+    )
+    for name, totals in summary["tools"].items():
+        print(f"  tool  {name:<12} {totals['calls']:>4}x {totals['ms']:>10.1f} ms  {totals['errors']} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--last", type=int, default=None, help="Only the last N traces")
+    args = parser.parse_args()
+
+    traces = list(load_traces(args.path).items())
+    if args.last:
+        traces = traces[-args.last:]
+    for trace_id, spans in traces:
+        print_summary(trace_id, summarize(spans))
+
+
+if __name__ == "__main__":
+    main()
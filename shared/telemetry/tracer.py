@@ -0,0 +1,130 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from loguru import logger
+
+# Span kinds: "phase" (attempt/think/act/evaluate/turn), "llm" (one chat
+# completion) and "tool" (one tool invocation)
+PHASE, LLM, TOOL = "phase", "llm", "tool"
+
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+
+
+class Span:
+    """One timed unit of work, linked to its parent through span ids"""
+
+    def __init__(self, name: str, kind: str, parent: "Span" = None, attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        # LLM calls inherit the phase they run in; tool calls are their own phase
+        if kind == PHASE:
+            self.phase = name
+        elif kind == TOOL:
+            self.phase = TOOL
+        else:
+            self.phase = parent.phase if parent else None
+        self.attributes = dict(attributes or {})
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._start = time.perf_counter()
+        self.latency_ms = None
+
+    def set(self, **attributes):
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def record_error(self, error):
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def end(self):
+        if self.end_ns is None:
+            self.latency_ms = (time.perf_counter() - self._start) * 1000
+            self.end_ns = self.start_ns + int(self.latency_ms * 1e6)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "phase": self.phase,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "latency_ms": round(self.latency_ms, 3) if self.latency_ms is not None else None,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    def __init__(self, service_name: str = "agents", exporters: list = None, keep: int = 10000):
+        """
+        Args:
+            service_name: Reported as the OpenTelemetry service.name resource attribute
+            exporters: Objects with export(spans) and close(), called as each span ends
+            keep: Number of finished spans kept in memory for inspection
+        """
+        self.service_name = service_name
+        self.exporters = list(exporters or [])
+        self.finished = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str = PHASE, attributes: dict = None):
+        """Open a span as a child of the current one; exceptions are recorded and re-raised"""
+        span = Span(name, kind, parent=_current_span.get(), attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span):
+        span.end()
+        with self._lock:
+            self.finished.append(span)
+            for exporter in self.exporters:
+                try:
+                    exporter.export([span], self.service_name)
+                except Exception as e:
+                    logger.warning(f"Span export to {type(exporter).__name__} failed: {e}")
+
+    def add_exporter(self, exporter):
+        with self._lock:
+            self.exporters.append(exporter)
+
+    def spans(self, trace_id: str = None) -> list:
+        with self._lock:
+            return [span for span in self.finished if trace_id is None or span.trace_id == trace_id]
+
+    def close(self):
+        with self._lock:
+            for exporter in self.exporters:
+                exporter.close()
+            self.exporters = []
+
+
+def current_span() -> Span:
+    return _current_span.get()
+
+
+def bind_context(fn):
+    """
+    Wrap fn so it runs in a copy of the caller's context. Needed for work
+    handed to a thread pool, which does not inherit the current span.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
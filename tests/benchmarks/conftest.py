@@ -0,0 +1,64 @@
+import importlib
+import os
+import sys
+
+import pytest
+from loguru import logger
+
+from standins import OpenAIStandIn, VectaraStandIn
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(REPO_ROOT)
+
+# Simulated per-request latency of the stand-ins (seconds)
+LLM_LATENCY = float(os.getenv("BENCH_LLM_LATENCY", 0.02))
+VECTARA_LATENCY = float(os.getenv("BENCH_VECTARA_LATENCY", 0.01))
+
+
+def load_app_module(app_dir: str, module: str):
+    """
+    Import `module` from one of the apps whose package is called `src`.
+
+    coRAG and coRAG_agents_sdk both ship a top-level `src` package, so the
+    other app's `src` modules are dropped from sys.modules first. The
+    returned module keeps working after they are dropped again.
+    """
+    def purge():
+        for name in [n for n in sys.modules if n == "src" or n.startswith("src.")]:
+            del sys.modules[name]
+
+    purge()
+    sys.path.insert(0, os.path.join(REPO_ROOT, app_dir))
+    try:
+        return importlib.import_module(module)
+    finally:
+        sys.path.remove(os.path.join(REPO_ROOT, app_dir))
+        purge()
+
+
+@pytest.fixture(scope="session")
+def vectara_standin():
+    with VectaraStandIn(latency=VECTARA_LATENCY) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def openai_standin():
+    # First attempt fails evaluation, the retry passes: exercises the retry path
+    with OpenAIStandIn(latency=LLM_LATENCY, verdicts=[False, True]) as server:
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def standin_retrieval(vectara_standin, monkeypatch):
+    """Route rag_search to the Vectara stand-in with the persistent cache disabled"""
+    from shared.retrieval import VectaraBackend, VectaraClient, set_backend
+
+    monkeypatch.setenv("RAG_CACHE_ENABLED", "0")
+    set_backend(VectaraBackend(client=VectaraClient(base_url=vectara_standin.url, max_retries=0)))
+    logger.disable("src")
+    logger.disable("shared")
+    yield
+    logger.enable("src")
+    logger.enable("shared")
+    set_backend(None)
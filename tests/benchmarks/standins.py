@@ -0,0 +1,275 @@
+"""
+Local stand-ins for the OpenAI chat completions API and the Vectara API.
+
+Both run a ThreadingHTTPServer on a free localhost port, sleep for a
+configurable latency per request and answer from a script, so the
+orchestrators can be benchmarked end to end without network access.
+"""
+import itertools
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInServer:
+    """Base class: serve handle(path, body) -> (status, body) on a background thread"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        # Requests still being answered, possibly abandoned by a client that timed out
+        self._in_flight = 0
+        self._idle = threading.Condition(self._lock)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                    server._in_flight += 1
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, payload = server.handle(self.path, body)
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+                        server._idle.notify_all()
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def handle(self, path: str, body: dict) -> tuple:
+        raise NotImplementedError
+
+    def reset(self):
+        """Zero the counters once earlier requests are answered, so none of them lands in the next count"""
+        with self._lock:
+            self._idle.wait_for(lambda: self._in_flight == 0, timeout=10)
+            self.requests = 0
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class VectaraStandIn(StandInServer):
+    """Answers /v2/query and /v2/chats with `results_per_query` scored chunks"""
+
+    def __init__(self, latency: float = 0.0, results_per_query: int = 10):
+        super().__init__(latency)
+        self.results_per_query = results_per_query
+
+    def handle(self, path: str, body: dict) -> tuple:
+        if path not in ("/v2/query", "/v2/chats"):
+            return 404, {"error": f"unknown path {path}"}
+        query = body["query"]
+        results = [
+            {
+                "text": f"%START_SNIPPET%Chunk {i} about {query}: the table stores keys, names and comments "
+                        f"used by the TPCH benchmark (variant {i}).%END_SNIPPET%",
+                "score": round(0.95 - 0.05 * i, 3)
+            }
+            for i in range(self.results_per_query)
+        ]
+        return 200, {"search_results": results}
+
+
+class OpenAIStandIn(StandInServer):
+    """
+    Scripted /v1/chat/completions.
+
+    - Researcher turn without tool results: one rag_search_batch call with `subqueries`
+      (rag_search calls per subquery if the batch tool is not offered)
+    - Researcher turn after tool results: a markdown synthesis
+    - Evaluator (any response_format): the next verdict from `verdicts`, cycling
+    """
+
+    def __init__(self, latency: float = 0.0, subqueries: list = None, verdicts: list = None):
+        super().__init__(latency)
+        self.subqueries = subqueries or ["Describe the nations table.", "Describe the regions table."]
+        self.verdicts = verdicts or [True]
+        self._verdicts = itertools.cycle(self.verdicts)
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def reset(self):
+        super().reset()
+        with self._lock:
+            self._verdicts = itertools.cycle(self.verdicts)
+            self.llm_calls = self.tool_calls = self.prompt_tokens = self.completion_tokens = 0
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "tool_calls": self.tool_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens
+            }
+
+    def _reply(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        has_tool_results = any(m.get("role") == "tool" for m in messages[last_user + 1:])
+
+        if body.get("response_format"):
+            with self._lock:
+                verdict = next(self._verdicts)
+            if body["response_format"].get("type") == "json_object":
+                content = {"fully_answered": "YES" if verdict else "NO", "reason": "Scripted verdict"}
+            else:
+                content = {"fully_answered": verdict, "reason": "Scripted verdict"}
+            return {"role": "assistant", "content": json.dumps(content)}
+
+        tool_names = {t["function"]["name"] for t in body.get("tools", [])}
+        if tool_names and not has_tool_results:
+            if "rag_search_batch" in tool_names:
+                calls = [("rag_search_batch", {"queries": self.subqueries})]
+            else:
+                calls = [("rag_search", {"query": q}) for q in self.subqueries]
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                        "type": "function",
+                        "function": {"name": name, "arguments": json.dumps(args)}
+                    }
+                    for name, args in calls
+                ]
+            }
+
+        bullets = "\n".join(f"  - {q}" for q in self.subqueries)
+        return {
+            "role": "assistant",
+            "content": (
+                f"- **Subqueries**\n{bullets}\n"
+                "- **Final Synthesis**\n  The nations table stores countries keyed by n_nationkey and linked "
+                "to the regions table through n_regionkey. The regions table holds the five regions."
+            )
+        }
+
+    def handle(self, path: str, body: dict) -> tuple:
+        if not path.endswith("/chat/completions"):
+            return 404, {"error": {"message": f"unknown path {path}"}}
+        message = self._reply(body)
+        # Rough token accounting: ~4 characters per token
+        prompt_tokens = max(1, len(json.dumps(body.get("messages", []))) // 4)
+        completion_tokens = max(1, len(json.dumps(message)) // 4)
+        with self._lock:
+            self.llm_calls += 1
+            self.tool_calls += len(message.get("tool_calls", []))
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return 200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+
+class HostAgentStandIn(StandInServer):
+    """
+    Scripted /v1/chat/completions for the restaurant HostAgent. Until the
+    current turn has a tool result (an "ACTION:" entry after the last user
+    message) it asks for `tool` with `arguments`, afterwards it answers.
+
+    - Planning call (response_format, no tools): a ThoughtResponse naming the tool, then provide_answer
+    - Tool call (tools, no response_format): the tool call
+    - Fused step (tools and response_format): a ThoughtResponse plus the tool call, then provide_answer
+    """
+
+    def __init__(self, latency: float = 0.0, tool: str = "get_menu", arguments: dict = None, answer: str = "We have it."):
+        super().__init__(latency)
+        self.tool = tool
+        self.arguments = arguments or {"category": "desserts"}
+        self.answer = answer
+        self.llm_calls = 0
+
+    def reset(self):
+        super().reset()
+        with self._lock:
+            self.llm_calls = 0
+
+    def _reply(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        acted = any(str(m.get("content") or "").startswith("ACTION:") for m in messages[last_user + 1:])
+        query = messages[last_user]["content"] if last_user >= 0 else ""
+        thought = {
+            "user_query": query,
+            "thought": "I have what I need" if acted else f"I need {self.tool}",
+            "next_action": "provide_answer" if acted else self.tool,
+            "answer": self.answer if acted else None,
+            "confidence": 0.9
+        }
+        message = {"role": "assistant", "content": None}
+        if body.get("response_format"):
+            message["content"] = json.dumps(thought)
+        elif acted:
+            message["content"] = self.answer
+        if body.get("tools") and not acted:
+            message["tool_calls"] = [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": self.tool, "arguments": json.dumps(self.arguments)}
+            }]
+        return message
+
+    def handle(self, path: str, body: dict) -> tuple:
+        if not path.endswith("/chat/completions"):
+            return 404, {"error": {"message": f"unknown path {path}"}}
+        message = self._reply(body)
+        with self._lock:
+            self.llm_calls += 1
+        return 200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-5-mini"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }
@@ -0,0 +1,84 @@
+"""
+Availability queries against a large floor: thousands of tables and a
+hundred thousand reservations over a few months. Measures the "which
+tables for this party, then" and "next open slots" queries, and a booking
+followed by the engine catching up with it.
+
+    BENCH_AVAILABILITY_TABLES=5000 BENCH_AVAILABILITY_RESERVATIONS=200000 \
+        python -m pytest tests/benchmarks/test_availability_engine.py --benchmark-only
+"""
+import os
+import random
+import time
+
+import pytest
+
+from restaurant_tools import availability, storage
+
+TABLES = int(os.getenv("BENCH_AVAILABILITY_TABLES", 2000))
+RESERVATIONS = int(os.getenv("BENCH_AVAILABILITY_RESERVATIONS", 100_000))
+DAYS = 90
+
+HOURS = {day: "11:00-23:00" for day in availability.WEEKDAYS}
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    rng = random.Random(0)
+    store = storage.RestaurantStore(str(tmp_path_factory.mktemp("availability") / "floor.sqlite"))
+    store.import_dict({
+        "restaurant_info": {"opening_hours": HOURS},
+        "tables": [{"id": i, "capacity": rng.choice([2, 2, 4, 4, 6, 8]), "status": "available"} for i in range(TABLES)],
+        "reservations": [
+            {
+                "id": f"R{n}",
+                "table_id": rng.randrange(TABLES),
+                "date": f"2030-{1 + rng.randrange(DAYS) // 30:02d}-{1 + rng.randrange(28):02d}",
+                "time": f"{rng.randint(11, 21):02d}:{rng.choice(['00', '15', '30', '45'])}",
+                "duration_minutes": rng.choice([60, 90, 120]),
+                "status": "confirmed"
+            }
+            for n in range(RESERVATIONS)
+        ]
+    })
+    engine = availability.AvailabilityEngine(store)
+    started = time.perf_counter()
+    engine.sync()
+    engine.build_seconds = time.perf_counter() - started
+    return engine
+
+
+def test_free_tables(benchmark, engine):
+    start = availability.to_minute("2030-02-14", "19:30")
+    free = benchmark(engine.free_tables, 4, start, 90)
+    benchmark.extra_info.update(tables=TABLES, reservations=RESERVATIONS, build_seconds=engine.build_seconds, free=len(free))
+    assert all(table["capacity"] >= 4 for table in free)
+
+
+def test_next_slots(benchmark, engine):
+    start = availability.to_minute("2030-02-14", "19:30")
+    slots = benchmark(engine.next_slots, 8, start, 120, 5)
+    benchmark.extra_info.update(tables=TABLES, reservations=RESERVATIONS)
+    assert len(slots) == 5 and [slot for slot, _ in slots] == sorted(slot for slot, _ in slots)
+
+
+def test_booking_then_query(benchmark, engine):
+    """One committed booking, then a query that has to see it"""
+    store = engine.store
+    start = availability.to_minute("2030-03-01", "12:00")
+    bookings = iter(range(10 ** 9))
+
+    def book_and_query():
+        table_id = engine.free_tables(2, start, 60, limit=1)[0]["id"]
+        batch = store.batch()
+        batch.append("reservations", {
+            "id": f"B{next(bookings)}", "table_id": table_id, "date": "2030-03-01", "time": "12:00",
+            "duration_minutes": 60, "status": "confirmed"
+        })
+        store.commit(batch)
+        assert table_id not in [table["id"] for table in engine.free_tables(2, start, 60)]
+
+    rebuilds = engine.rebuilds
+    benchmark.pedantic(book_and_query, rounds=50, iterations=1)
+    # Every booking was folded in incrementally
+    assert engine.rebuilds == rebuilds
@@ -0,0 +1,58 @@
+"""
+The restaurant HostAgent's two step modes on the same scripted turn (one
+tool call, then the answer) against a local OpenAI stand-in: "split"
+makes a planning call and a tool-enabled call per step, "fused" one call.
+
+    BENCH_LLM_LATENCY=0.5 python -m pytest tests/benchmarks/test_host_agent_steps.py --benchmark-only
+
+LLM calls, steps and latency per turn come from HostAgent.last_turn and
+are attached as extra_info.
+"""
+import importlib
+import types
+
+import pytest
+from openai import OpenAI
+
+from conftest import LLM_LATENCY
+from standins import HostAgentStandIn
+
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def host_standin():
+    with HostAgentStandIn(latency=LLM_LATENCY) as server:
+        yield server
+
+
+@pytest.mark.parametrize("step_mode", ["split", "fused"])
+def test_host_agent_turn(benchmark, host_standin, step_mode, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "standin")
+    monkeypatch.setenv("RESTAURANT_DB_PATH", str(tmp_path / "restaurant.sqlite"))
+    host_agent = importlib.import_module("restaurant_src.agent.host_agent")
+    host_agent.logger.disable("restaurant_src")
+    client = types.SimpleNamespace(
+        model="gpt-5-mini",
+        chat=OpenAI(base_url=f"{host_standin.url}/v1", api_key="standin", max_retries=0).chat
+    )
+    agent = host_agent.HostAgent(client, system_prompt="You are a restaurant host.", step_mode=step_mode)
+    answers = []
+
+    def target():
+        answers.append(agent("Which desserts do you have?"))
+
+    host_standin.reset()
+    try:
+        benchmark.pedantic(target, rounds=ROUNDS, iterations=1)
+    finally:
+        host_agent.logger.enable("restaurant_src")
+
+    benchmark.extra_info.update(agent.last_turn)
+    benchmark.extra_info["mean_llm_calls_per_turn"] = agent.stats["llm_calls"] / agent.stats["turns"]
+    # With --benchmark-disable the target runs once, not ROUNDS times
+    assert answers and answers == [host_standin.answer] * len(answers)
+    assert host_standin.llm_calls == agent.stats["llm_calls"]
+    # split: think, act, think (early exit); fused: step with the tool call, step with the answer
+    assert agent.last_turn["llm_calls"] == {"split": 3, "fused": 2}[step_mode]
+    assert agent.last_turn["steps"] == 2
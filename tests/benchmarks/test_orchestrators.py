@@ -0,0 +1,200 @@
+"""
+End-to-end benchmarks of CoRAGOrchestrator and CoRAGOrchestratorSDK
+against the local OpenAI and Vectara stand-ins.
+
+    pytest tests/benchmarks --benchmark-only
+    BENCH_LLM_LATENCY=0.3 BENCH_VECTARA_LATENCY=0.8 pytest tests/benchmarks --benchmark-only
+
+Each round answers one query. Wall time comes from pytest-benchmark; LLM
+calls, tool calls, tokens and retrieval requests per query are attached
+as extra_info so both implementations can be compared side by side.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from openai import AsyncOpenAI, OpenAI
+
+from conftest import load_app_module
+
+QUERY = "What is the difference between the nations and regions table?"
+ROUNDS = 5
+
+
+def run_rounds(benchmark, run, openai_standin, vectara_standin):
+    """Benchmark run(QUERY) and attach per-query counters from the stand-ins"""
+    results = []
+
+    def setup():
+        openai_standin.reset()
+
+    def target():
+        results.append(run(QUERY))
+
+    openai_standin.reset()
+    vectara_standin.reset()
+    benchmark.pedantic(target, setup=setup, rounds=ROUNDS, iterations=1)
+
+    # Counters are reset per round, so these describe the last query
+    benchmark.extra_info.update(openai_standin.counters())
+    # With --benchmark-disable the target runs once, not ROUNDS times
+    benchmark.extra_info["retrieval_requests_per_query"] = vectara_standin.requests / len(results)
+    benchmark.extra_info["attempts"] = results[-1]["attempts"]
+    return results
+
+
+def test_corag_orchestrator(benchmark, openai_standin, vectara_standin):
+    orchestrator_module = load_app_module("coRAG", "src.agents.orchestrator")
+    tools_module = load_app_module("coRAG", "src.tools.tools")
+    orchestrator_module.console.quiet = True
+    tools_module.console.quiet = True
+
+    client = OpenAI(base_url=f"{openai_standin.url}/v1", api_key="standin", max_retries=0)
+    orchestrator = orchestrator_module.CoRAGOrchestrator(client, max_retries=3)
+
+    results = run_rounds(benchmark, orchestrator.run, openai_standin, vectara_standin)
+
+    assert all(r["success"] and r["attempts"] == 2 for r in results)
+    # 2 researcher calls + 1 evaluator call per attempt
+    assert benchmark.extra_info["llm_calls"] == 6
+    # The evidence ledger serves the retry's subqueries
+    assert benchmark.extra_info["retrieval_requests_per_query"] == 2
+
+
+def load_sdk_orchestrator(openai_standin):
+    """CoRAGOrchestratorSDK module with the Agents SDK pointed at the stand-in"""
+    agents = pytest.importorskip("agents")
+    orchestrator_module = load_app_module("coRAG_agents_sdk", "src.agents.orchestrator")
+    tools_module = load_app_module("coRAG_agents_sdk", "src.tools.tools")
+    orchestrator_module.console.quiet = True
+    tools_module.console.quiet = True
+
+    agents.set_default_openai_client(
+        AsyncOpenAI(base_url=f"{openai_standin.url}/v1", api_key="standin", max_retries=0),
+        use_for_tracing=False
+    )
+    agents.set_default_openai_api("chat_completions")
+    agents.set_tracing_disabled(True)
+    return orchestrator_module
+
+
+def test_corag_orchestrator_sdk(benchmark, openai_standin, vectara_standin):
+    orchestrator_module = load_sdk_orchestrator(openai_standin)
+    orchestrator = orchestrator_module.CoRAGOrchestratorSDK(max_retries=3)
+
+    results = run_rounds(benchmark, orchestrator.run, openai_standin, vectara_standin)
+
+    assert all(r["success"] and r["attempts"] == 2 for r in results)
+    assert benchmark.extra_info["llm_calls"] == 6
+
+
+def test_corag_orchestrator_sdk_concurrent_queries(benchmark, openai_standin, vectara_standin, monkeypatch):
+    orchestrator_module = load_sdk_orchestrator(openai_standin)
+    orchestrator = orchestrator_module.CoRAGOrchestratorSDK(max_retries=3)
+    queries = [f"{QUERY} ({i})" for i in range(8)]
+    # Every evaluation passes, so each query costs exactly one attempt
+    monkeypatch.setattr(openai_standin, "verdicts", [True])
+    results = []
+    # One long-lived loop, as in a server; the SDK's HTTP pool is bound to it
+    loop = asyncio.new_event_loop()
+
+    def target():
+        openai_standin.reset()
+        results[:] = loop.run_until_complete(orchestrator.arun_many(queries, max_concurrency=len(queries)))
+
+    try:
+        benchmark.pedantic(target, rounds=3, iterations=1)
+    finally:
+        loop.close()
+    benchmark.extra_info.update(openai_standin.counters())
+    benchmark.extra_info["queries"] = len(queries)
+
+    assert all(r["success"] and r["attempts"] == 1 for r in results)
+    assert benchmark.extra_info["llm_calls"] == 3 * len(queries)
+
+
+def test_corag_orchestrator_sdk_run_owns_its_loop(openai_standin, vectara_standin):
+    orchestrator_module = load_sdk_orchestrator(openai_standin)
+    orchestrator = orchestrator_module.CoRAGOrchestratorSDK(max_retries=3)
+
+    assert orchestrator.run(QUERY)["success"]
+    loop = orchestrator._local.loop
+    assert orchestrator.run(QUERY)["success"] and orchestrator._local.loop is loop
+    # A loop closed in between is replaced rather than reused
+    loop.close()
+    assert orchestrator.run(QUERY)["success"] and orchestrator._local.loop is not loop
+    orchestrator._local.loop.close()
+
+
+def test_corag_orchestrator_sdk_timeout(openai_standin, vectara_standin, monkeypatch):
+    orchestrator_module = load_sdk_orchestrator(openai_standin)
+    orchestrator = orchestrator_module.CoRAGOrchestratorSDK(max_retries=3, timeout=0.2)
+    monkeypatch.setattr(openai_standin, "latency", 0.5)
+
+    start = time.perf_counter()
+    result = asyncio.run(orchestrator.arun(QUERY))
+
+    assert result["timed_out"] and not result["success"]
+    assert result["attempts"] == 1
+    assert time.perf_counter() - start < 0.5
+
+
+def load_corag_orchestrator(openai_standin, **kwargs):
+    orchestrator_module = load_app_module("coRAG", "src.agents.orchestrator")
+    tools_module = load_app_module("coRAG", "src.tools.tools")
+    orchestrator_module.console.quiet = True
+    tools_module.console.quiet = True
+    client = OpenAI(base_url=f"{openai_standin.url}/v1", api_key="standin", max_retries=0)
+    return orchestrator_module.CoRAGOrchestrator(client, **kwargs)
+
+
+def test_corag_orchestrator_speculative(openai_standin, vectara_standin, monkeypatch):
+    orchestrator = load_corag_orchestrator(openai_standin, max_retries=3, speculative_attempts=3)
+    monkeypatch.setattr(openai_standin, "verdicts", [True])
+    openai_standin.reset()
+
+    result = orchestrator.run(QUERY)
+
+    assert result["success"] and result["attempts"] == 3
+    usage = result["usage"]
+    # The first attempt to pass wins; the others were cut short
+    assert usage["cancelled_attempts"] == 2
+    # Every call made, including the cancelled attempts' calls in flight, is in the totals
+    counters = openai_standin.counters()
+    assert usage["llm_calls"] == counters["llm_calls"]
+    assert usage["prompt_tokens"] == counters["prompt_tokens"]
+    assert usage["completion_tokens"] == counters["completion_tokens"]
+    # At least the winner's two researcher calls and its evaluation
+    assert usage["llm_calls"] >= 3
+
+
+def test_corag_orchestrator_speculative_refills_after_errors(openai_standin, vectara_standin, monkeypatch):
+    orchestrator = load_corag_orchestrator(openai_standin, max_retries=4, speculative_attempts=2)
+    started = []
+
+    def failing_attempt(attempt, *args):
+        started.append(attempt)
+        raise RuntimeError("researcher crashed")
+
+    monkeypatch.setattr(orchestrator, "_attempt", failing_attempt)
+
+    result = orchestrator.run(QUERY)
+
+    # A crashed attempt is replaced like a failed one, up to max_retries
+    assert not result["success"]
+    assert sorted(started) == [1, 2, 3, 4] and result["attempts"] == 4
+
+
+@pytest.mark.parametrize("speculative_attempts", [1, 2])
+def test_corag_orchestrator_stops_when_cancelled(openai_standin, vectara_standin, speculative_attempts):
+    orchestrator = load_corag_orchestrator(openai_standin, max_retries=3, speculative_attempts=speculative_attempts)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    openai_standin.reset()
+
+    result = orchestrator.run(QUERY, cancel_event=cancel_event)
+
+    # The caller went away before the first LLM call: nothing more is spent on it
+    assert result["cancelled"] and not result["success"]
+    assert result["usage"]["llm_calls"] == openai_standin.counters()["llm_calls"] == 0
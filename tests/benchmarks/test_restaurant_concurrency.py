@@ -0,0 +1,78 @@
+"""
+Throughput and error counts for N agent sessions sharing the restaurant
+database. Each session is its own process with its own store, mixing typed
+bookings, exec-tool writes and reads, so commits race through the file lock
+and the optimistic version checks.
+
+    BENCH_RESTAURANT_SESSIONS=8 python -m pytest tests/benchmarks/test_restaurant_concurrency.py --benchmark-only
+"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from restaurant_tools import database_tool, operations
+
+SESSIONS = int(os.getenv("BENCH_RESTAURANT_SESSIONS", 4))
+OPS_PER_SESSION = int(os.getenv("BENCH_RESTAURANT_OPS", 30))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="sessions are forked processes")
+
+
+def run_session(database_tool, operations, session: int, results):
+    # A fresh store per process: SQLite connections must not cross a fork
+    database_tool._store = None
+    counts = {"ok": 0, "errors": 0, "booked": 0}
+    for i in range(OPS_PER_SESSION):
+        if i % 3 == 0:
+            response = operations.create_reservation(
+                f"Guest {session}-{i}", "555-0000", 2, "2030-01-01", f"{12 + i // 60:02d}:{i % 60:02d}", table_id=session % 8 + 1,
+                duration_minutes=1
+            )
+            counts["booked"] += response["success"]
+        elif i % 3 == 1:
+            response = database_tool.execute_database_operation(
+                "db['tables'][0]['capacity'] = db['tables'][0]['capacity'] + 1"
+            )
+        else:
+            response = database_tool.read_only_database_query("result = len(db['reservations'])")
+        counts["ok" if response["success"] else "errors"] += 1
+    store = database_tool.get_store()
+    results.put({**counts, **store.stats})
+
+
+def test_restaurant_sessions(benchmark, tmp_path, monkeypatch):
+    monkeypatch.setenv("RESTAURANT_SANDBOX_WORKERS", "0")
+    context = multiprocessing.get_context("fork")
+    totals = []
+
+    def setup():
+        monkeypatch.setenv("RESTAURANT_DB_PATH", str(tmp_path / f"round{len(totals)}.sqlite"))
+        database_tool._store = None
+        database_tool.get_store()
+        return (), {}
+
+    def target():
+        results = context.Queue()
+        sessions = [context.Process(target=run_session, args=(database_tool, operations, s, results)) for s in range(SESSIONS)]
+        started = time.perf_counter()
+        for session in sessions:
+            session.start()
+        reports = [results.get(timeout=120) for _ in sessions]
+        for session in sessions:
+            session.join()
+        elapsed = time.perf_counter() - started
+        totals.append({key: sum(report[key] for report in reports) for key in reports[0]} | {"elapsed": elapsed})
+
+    benchmark.pedantic(target, setup=setup, rounds=3, iterations=1)
+
+    last = totals[-1]
+    store = database_tool.get_store()
+    benchmark.extra_info.update(sessions=SESSIONS, ops=SESSIONS * OPS_PER_SESSION, **last)
+    benchmark.extra_info["ops_per_second"] = SESSIONS * OPS_PER_SESSION / last["elapsed"]
+    assert last["errors"] == 0
+    # Every exec increment and every booking landed exactly once
+    increments = SESSIONS * sum(1 for i in range(OPS_PER_SESSION) if i % 3 == 1)
+    assert store.snapshot()["tables"].values()[0]["capacity"] == 2 + increments
+    assert len(store.lookup("reservations", date="2030-01-01")) == last["booked"]
@@ -0,0 +1,44 @@
+"""
+Shared test setup.
+
+restaurant_agent's `src` is a namespace package, which loses to coRAG's
+regular `src` package whenever both are importable, so its modules are
+mounted under their own package names when this file loads:
+
+    restaurant_src    other_stuff/restaurant_agent/src
+    restaurant_tools  other_stuff/restaurant_agent/src/tools
+
+Test modules import from those packages directly.
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESTAURANT_SRC = os.path.join(REPO_ROOT, "other_stuff", "restaurant_agent", "src")
+
+
+def mount_package(name: str, path: str):
+    """Make the directory `path` importable as the package `name`"""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_loader(name, loader=None, is_package=True)
+        package = importlib.util.module_from_spec(spec)
+        package.__path__ = [path]
+        sys.modules[name] = package
+
+
+mount_package("restaurant_src", RESTAURANT_SRC)
+mount_package("restaurant_tools", os.path.join(RESTAURANT_SRC, "tools"))
+
+
+@pytest.fixture
+def fresh_store(tmp_path, monkeypatch):
+    """An empty restaurant database per test, with exec tools run in-process"""
+    from restaurant_tools import database_tool
+
+    monkeypatch.setenv("RESTAURANT_DB_PATH", str(tmp_path / "restaurant.sqlite"))
+    monkeypatch.setenv("RESTAURANT_SANDBOX_WORKERS", "0")
+    monkeypatch.setattr(database_tool, "_store", None)
+    monkeypatch.setattr(database_tool, "_pool", None)
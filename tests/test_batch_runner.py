@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.batch_runner import drop_partial_line, run_batch
+
+
+def write_queries(path, queries):
+    path.write_text("\n".join(json.dumps({"id": i, "query": q}) for i, q in enumerate(queries)))
+
+
+def test_run_batch_streams_and_resumes(tmp_path):
+    input_path, output_path = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+    write_queries(input_path, ["nations", "regions", "boom"])
+    calls = []
+
+    def answer_fn(query):
+        calls.append(query)
+        if query == "boom":
+            raise RuntimeError("boom")
+        return {"success": True, "attempts": 2, "answer": query, "evaluation": {}}
+
+    report = run_batch(str(input_path), str(output_path), answer_fn, concurrency=2, rate_limit=100)
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+
+    assert report["queries"] == 3 and report["succeeded"] == 2 and report["errors"] == 1
+    assert report["attempts_mean"] == 2
+    assert {r["id"] for r in records} == {"0", "1", "2"}
+
+    # Only the errored query is re-run on resume
+    calls.clear()
+    report = run_batch(str(input_path), str(output_path), answer_fn)
+    assert calls == ["boom"]
+    assert report["queries"] == 1
+
+
+def test_resume_after_a_cut_off_write(tmp_path):
+    input_path, output_path = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+    write_queries(input_path, ["nations", "regions"])
+    finished = json.dumps({"id": "0", "query": "nations", "success": True, "answer": "nations", "latency_s": 1.0})
+    output_path.write_text(finished + "\n" + '{"id": "1", "query": "regions", "succ')
+    calls = []
+
+    def answer_fn(query):
+        calls.append(query)
+        return {"success": True, "attempts": 1, "answer": query, "evaluation": {}}
+
+    run_batch(str(input_path), str(output_path), answer_fn)
+
+    assert calls == ["regions"]
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["id"] for r in records] == ["0", "1"]
+
+
+def test_drop_partial_line_walks_back_across_chunks(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"id": "0"}\n' + "x" * 100)
+    drop_partial_line(str(path), chunk_size=8)
+    assert path.read_text() == '{"id": "0"}\n'
+
+    path.write_text("y" * 50)
+    drop_partial_line(str(path), chunk_size=8)
+    assert path.read_text() == ""
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sse_starlette.sse import AppStatus
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'coRAG'))
+server = pytest.importorskip("server")
+
+
+class ScriptedOrchestrator:
+    """Stands in for CoRAGOrchestrator: one failed attempt, then a pass"""
+
+    def run(self, query, progress=None, cancel_event=None):
+        for attempt, passed in ((1, False), (2, True)):
+            progress and progress({"event": "attempt", "attempt": attempt, "max_attempts": 3})
+            progress and progress({"event": "research", "attempt": attempt, "answer": f"draft {attempt}"})
+            progress and progress({"event": "evaluation", "attempt": attempt, "fully_answered": passed, "reason": "ok"})
+        return {
+            "answer": f"**Final Synthesis** - {query} answered",
+            "attempts": 2,
+            "evaluation": {"fully_answered": True, "reason": "ok"},
+            "success": True,
+            "usage": {}
+        }
+
+
+class EndlessOrchestrator:
+    """Keeps researching until it is cancelled (or gives up after ~10s)"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def run(self, query, progress=None, cancel_event=None):
+        attempt = 0
+        while not cancel_event.wait(0.01) and attempt < 1000:
+            attempt += 1
+            progress({"event": "attempt", "attempt": attempt, "max_attempts": None})
+        if cancel_event.is_set():
+            self.cancelled.set()
+        return {"answer": None, "attempts": attempt, "evaluation": {}, "success": False, "cancelled": True, "usage": {}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("RAG_CACHE_ENABLED", "0")
+    with TestClient(server.create_app(orchestrator=ScriptedOrchestrator(), max_concurrent=2)) as client:
+        yield client
+
+
+def test_query_returns_final_answer(client):
+    response = client.post("/query", json={"query": "nations"})
+    assert response.status_code == 200
+    assert response.json()["final_answer"] == "nations answered"
+    assert client.get("/stats").json()["served"] == 1
+
+
+def test_query_stream_emits_progress_then_result(client):
+    events = []
+    with client.stream("POST", "/query/stream", json={"query": "nations"}) as response:
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event = line.split(":", 1)[1].strip()
+            elif line.startswith("data:"):
+                events.append((event, json.loads(line.split(":", 1)[1])))
+
+    names = [name for name, _ in events]
+    assert names == ["attempt", "research", "evaluation"] * 2 + ["result"]
+    assert events[-1][1]["final_answer"] == "nations answered"
+
+
+def test_empty_query_is_rejected(client):
+    assert client.post("/query", json={"query": "  "}).status_code == 400
+
+
+def test_stream_disconnect_cancels_the_run(monkeypatch):
+    """Drive the ASGI app directly: the test client buffers whole responses, so it can't hang up mid-stream"""
+    monkeypatch.setenv("RAG_CACHE_ENABLED", "0")
+    # sse_starlette keeps its shutdown event at module level, bound to the first loop that used it
+    monkeypatch.setattr(AppStatus, "should_exit_event", None)
+    orchestrator = EndlessOrchestrator()
+    app = server.create_app(orchestrator=orchestrator, max_concurrent=1)
+
+    async def scenario():
+        hung_up = asyncio.Event()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": json.dumps({"query": "nations"}).encode(), "more_body": False}
+            await hung_up.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and b"event:" in message.get("body", b""):
+                hung_up.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/query/stream", "raw_path": b"/query/stream", "query_string": b"",
+            "root_path": "", "headers": [(b"content-type", b"application/json")], "server": ("test", 80),
+            "client": ("test", 1234)
+        }
+        async with app.router.lifespan_context(app):
+            await asyncio.wait_for(app(scope, receive, send), 5)
+            assert await asyncio.get_running_loop().run_in_executor(None, orchestrator.cancelled.wait, 5)
+            # The run gave its slot back
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                for _ in range(500):
+                    stats = (await client.get("/stats")).json()
+                    if stats["in_flight"] == 0:
+                        break
+                    await asyncio.sleep(0.01)
+            assert stats["in_flight"] == 0 and stats["served"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+import gzip
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.log_writer import BufferedFileSink
+
+
+def test_sink_batches_and_flushes_on_close(tmp_path):
+    path = tmp_path / "logs" / "run.log"
+    sink = BufferedFileSink(str(path), max_bytes=0)
+    for i in range(1000):
+        sink(f"line {i}\n")
+    sink.close()
+
+    lines = path.read_text().splitlines()
+    assert lines[0] == "line 0" and lines[-1] == "line 999"
+    assert len(lines) == 1000
+
+
+def test_sink_rotates_and_compresses(tmp_path):
+    path = tmp_path / "run.log"
+    sink = BufferedFileSink(str(path), max_bytes=2000, backups=2, compress=True, batch_size=10)
+    for i in range(600):
+        sink(f"message number {i:04d}\n")
+    sink.close()
+
+    assert os.path.exists(f"{path}.1.gz") and os.path.exists(f"{path}.2.gz")
+    assert not os.path.exists(f"{path}.3.gz")
+    newest = gzip.open(f"{path}.1.gz", "rt").read() + path.read_text()
+    assert newest.splitlines()[-1] == "message number 0599"
+
+
+def test_sink_drops_instead_of_blocking(tmp_path):
+    sink = BufferedFileSink(str(tmp_path / "run.log"), max_queue=1, flush_interval=5)
+    for _ in range(1000):
+        sink("x\n")
+    sink.close()
+    assert "dropped" in (tmp_path / "run.log").read_text()
+
+
+def test_slow_writer_closes_the_file_itself(tmp_path):
+    path = tmp_path / "run.log"
+    sink = BufferedFileSink(str(path), max_bytes=0)
+    write = sink._write
+
+    def slow_write(data):
+        time.sleep(0.2)
+        write(data)
+
+    sink._write = slow_write
+    for i in range(3):
+        sink(f"line {i}\n")
+    # Returns before the writer is done; the file must stay open for it
+    sink.close(timeout=0.01)
+    sink._thread.join(5)
+
+    assert path.read_text().splitlines() == ["line 0", "line 1", "line 2"]
+    assert sink._file.closed
+
+
+def test_dropped_messages_are_all_reported(tmp_path):
+    path = tmp_path / "run.log"
+    sink = BufferedFileSink(str(path), max_queue=1, flush_interval=0.01)
+
+    def produce():
+        for _ in range(2000):
+            sink("x\n")
+
+    producers = [threading.Thread(target=produce) for _ in range(4)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    sink.close()
+
+    lines = path.read_text().splitlines()
+    written = lines.count("x")
+    dropped = sum(int(line.split()[3]) for line in lines if "dropped" in line)
+    assert written + dropped == 8000
@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.memory import SUMMARY_HEADER, MemoryManager, summarize_entry
+
+
+def session(turns: int) -> list:
+    messages = [{"role": "system", "content": "You are the host of a restaurant."}]
+    for i in range(turns):
+        messages += [
+            {"role": "user", "content": f"Question {i}: is a table for {i} free tonight?"},
+            {"role": "assistant", "content": f"THOUGHT: User's query: q{i}\nThought: look up tables {i}\nNext Action: get_tables\nConfidence: 0.9"},
+            {"role": "assistant", "content": f"ACTION: I used the following tools- Called get_tables with args {{'size': {i}}} and got {'table ' * 200} as the output"},
+            {"role": "assistant", "content": f"Yes, table {i} is free."},
+        ]
+    return messages
+
+
+def test_fit_leaves_small_memory_untouched():
+    messages = session(2)
+    assert MemoryManager(token_budget=10_000).fit(messages) is messages
+
+
+def test_fit_keeps_system_prompt_and_recent_turns():
+    manager = MemoryManager(token_budget=1500, keep_turns=2)
+    messages = session(10)
+    compacted = manager.fit(messages)
+
+    assert compacted[0] == messages[0]
+    assert compacted[1]["content"].startswith(SUMMARY_HEADER)
+    assert compacted[2:] == messages[-8:]
+    assert manager.tokens(compacted) <= 1500 < manager.tokens(messages)
+    assert "Thought: look up tables 0 -> get_tables" in compacted[1]["content"]
+
+
+def test_summary_rolls_forward_without_resummarizing():
+    manager = MemoryManager(token_budget=1500, keep_turns=2)
+    messages = manager.fit(session(6))
+    messages = manager.fit(messages + session(8)[-8:])
+
+    summaries = [m for m in messages if m["content"].startswith(SUMMARY_HEADER)]
+    assert len(summaries) == 1
+    assert summaries[0]["content"].count("User: Question 0") == 1
+    assert manager.compactions == 2
+
+
+def test_summarize_entry_clips_tool_output():
+    line = summarize_entry(session(1)[3])
+    assert line.startswith("Called get_tables({'size': 0}) -> table table")
+    assert len(line) < 200
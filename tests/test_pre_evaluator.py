@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'coRAG'))
+from src.agents.agent import EvaluatorAgent
+from src.agents.pre_evaluator import PreEvaluator, calibrate, noun_phrases
+
+NATIONS = "The nations table stores n_nationkey, n_name and n_regionkey for every country."
+REGIONS = "The regions table stores r_regionkey and r_name for the five regions."
+EVIDENCE = [NATIONS, REGIONS]
+
+
+class ScriptedClient:
+    """chat.completions.create() answering every evaluation with `verdict`"""
+
+    def __init__(self, verdict: str):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.verdict = verdict
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = json.dumps({"fully_answered": self.verdict, "reason": "Scripted verdict"})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=None,
+            model=kwargs.get("model")
+        )
+
+
+def test_noun_phrases():
+    assert noun_phrases("What is the difference between the nations and regions table?") == ["nation", "region table"]
+
+
+def test_clear_pass_and_fail_skip_the_llm():
+    client = ScriptedClient("NO")
+    evaluator = EvaluatorAgent(client, "Evaluate.", pre_evaluator=PreEvaluator())
+
+    passed = evaluator.evaluate("Describe the nations table", NATIONS, evidence=EVIDENCE)
+    assert passed["fully_answered"] and passed["tier"] == "local"
+    failed = evaluator.evaluate("Describe the nations table", "I really like pizza with extra cheese on it.", evidence=EVIDENCE)
+    assert not failed["fully_answered"] and failed["tier"] == "local" and "nation table" in failed["reason"]
+    assert client.calls == 0
+
+
+def test_middle_band_escalates_to_the_llm(tmp_path):
+    log_path = str(tmp_path / "pre_eval.jsonl")
+    client = ScriptedClient("YES")
+    evaluator = EvaluatorAgent(client, "Evaluate.", pre_evaluator=PreEvaluator(log_path=log_path))
+
+    # Grounded but covers only one of the two tables
+    result = evaluator.evaluate("What is the difference between the nations and regions table?", NATIONS, evidence=EVIDENCE)
+    assert result["fully_answered"] and result["tier"] == "llm"
+    assert client.calls == 1
+    with open(log_path) as f:
+        logged = [json.loads(line) for line in f]
+    assert logged[0]["verdict"] == "uncertain" and logged[0]["llm_fully_answered"] is True
+
+
+def test_answers_admitting_missing_information_are_not_passed_locally():
+    decision = PreEvaluator().decide("Describe the nations table", NATIONS + " No information was found on its indexes.", EVIDENCE)
+    assert decision["score"] >= 0.8 and decision["verdict"] == "uncertain"
+
+
+def test_calibrate(tmp_path):
+    log_path = tmp_path / "pre_eval.jsonl"
+    # Scores 0.000 .. 0.975: the LLM said NO below 0.5 and YES from 0.5 up; unlabelled cases are ignored
+    records = [{"score": i / 40, "llm_fully_answered": i >= 20} for i in range(40)]
+    records.append({"score": 0.99, "llm_fully_answered": None})
+    log_path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    assert calibrate(str(log_path), target_precision=1.0, min_support=10) == {
+        "pass_threshold": 0.5, "fail_threshold": 19 / 40, "labelled_cases": 40
+    }
+    # Neither side has 25 cases at the required precision: keep deferring both to the LLM
+    assert calibrate(str(log_path), target_precision=1.0, min_support=25) == {
+        "pass_threshold": None, "fail_threshold": None, "labelled_cases": 40
+    }
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from restaurant_tools import availability, database_tool, operations, storage
+
+pytestmark = pytest.mark.usefixtures("fresh_store")
+
+
+def test_visits_overlap_and_opening_hours():
+    # 2025-05-01 is a Thursday, open 11:00-22:00; tables 5 and 6 seat six
+    for table_id in (5, 6):
+        assert operations.create_reservation("Ann", "555-0000", 6, "2025-05-01", "19:00", table_id=table_id)["success"]
+
+    assert [t["id"] for t in operations.check_availability(6, "2025-05-01", "20:00")["tables"]] == []
+    assert [t["id"] for t in operations.check_availability(6, "2025-05-01", "20:30")["tables"]] == [5, 6]
+    # A two-hour visit at 18:00 runs into the 19:00 bookings; the table then can't be booked over it
+    assert operations.check_availability(6, "2025-05-01", "18:00", duration_minutes=120)["tables"] == []
+    assert not operations.create_reservation("Bob", "555-0001", 6, "2025-05-01", "18:00", table_id=5, duration_minutes=120)["success"]
+    late = operations.check_availability(2, "2025-05-01", "21:00")
+    assert late["tables"] == [] and "not open" in late["message"]
+
+    slots = operations.find_open_slots(6, "2025-05-01", "19:00", count=3)["slots"]
+    assert slots == [
+        {"date": "2025-05-01", "time": "20:30", "table_ids": [5, 6]},
+        {"date": "2025-05-02", "time": "11:00", "table_ids": [5, 6]},
+        {"date": "2025-05-02", "time": "11:15", "table_ids": [5, 6]},
+    ]
+
+
+def test_follows_commits_incrementally(tmp_path):
+    rng = random.Random(7)
+    store = storage.RestaurantStore(str(tmp_path / "bench.sqlite"))
+    tables = [{"id": i, "capacity": rng.choice([2, 4, 6]), "status": "available"} for i in range(30)]
+
+    def reservation(n):
+        return {
+            "id": f"R{n}",
+            "table_id": rng.randrange(30),
+            "date": f"2025-05-0{rng.randint(1, 3)}",
+            "time": f"{rng.randint(11, 20):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            "duration_minutes": rng.choice([60, 90, 120]),
+            "status": rng.choice(["confirmed", "confirmed", "cancelled"])
+        }
+
+    store.import_dict({
+        "restaurant_info": {"opening_hours": {}},
+        "tables": tables,
+        "reservations": [reservation(n) for n in range(300)]
+    })
+    engine = availability.AvailabilityEngine(store)
+
+    def brute_force(party_size, start, duration):
+        busy = set()
+        for r in store.snapshot()["reservations"].values():
+            if r["status"] in availability.HOLDING_STATUSES:
+                r_start = availability.to_minute(r["date"], r["time"])
+                if r_start < start + duration and start < r_start + r["duration_minutes"]:
+                    busy.add(r["table_id"])
+        return sorted(
+            (t["capacity"], t["id"]) for t in tables if t["capacity"] >= party_size and t["id"] not in busy
+        )
+
+    for round_ in range(5):
+        for _ in range(50):
+            party_size, duration = rng.choice([1, 3, 5]), rng.choice([60, 90])
+            start = availability.to_minute(f"2025-05-0{rng.randint(1, 3)}", f"{rng.randint(10, 21):02d}:{rng.choice(['00', '30'])}")
+            free = engine.free_tables(party_size, start, duration)
+            assert [(t["capacity"], t["id"]) for t in free] == brute_force(party_size, start, duration)
+        batch = store.batch()
+        for rowid, r in rng.sample(batch.find("reservations"), 20):
+            batch.update("reservations", rowid, {**r, "status": "cancelled" if r["status"] == "confirmed" else "confirmed"})
+        for n in range(10):
+            batch.append("reservations", reservation(1000 * (round_ + 1) + n))
+        store.commit(batch)
+    # Only the first sync rebuilt the index
+    assert engine.rebuilds == 1
+
+
+def test_bookings_follow_the_engine():
+    # Closed at 03:00 on a Monday
+    assert not operations.create_reservation("Ann", "555-0000", 2, "2025-05-05", "03:00", table_id=1)["success"]
+    assert not operations.create_reservation("Ann", "555-0000", 2, "2025-05-05", "19:00", table_id=1, duration_minutes=-500)["success"]
+    assert not operations.check_availability(2, "2025-05-05", "19:00", duration_minutes=0)["success"]
+
+    # Friday open past midnight: a late visit still holds the table into Saturday
+    database_tool.execute_database_operation("db['restaurant_info']['opening_hours']['friday'] = '18:00-02:00'")
+    assert operations.create_reservation("Ann", "555-0000", 2, "2025-05-02", "23:30", table_id=1, duration_minutes=120)["success"]
+    clash = operations.create_reservation("Bob", "555-0001", 2, "2025-05-03", "00:30", table_id=1, duration_minutes=30)
+    assert not clash["success"] and "until 2025-05-03 01:30" in clash["error"]
+    assert operations.create_reservation("Bob", "555-0001", 2, "2025-05-03", "01:30", table_id=1, duration_minutes=30)["success"]
+
+
+def test_tool_arguments_are_validated():
+    # Numbers sent as strings are accepted, anything else is an error response rather than an exception
+    assert [t["id"] for t in operations.check_availability("6", "2025-05-01", "19:00", duration_minutes="90")["tables"]] == [5, 6]
+    assert len(operations.find_open_slots("2", "2025-05-01", "19:00", count="3")["slots"]) == 3
+    for response in (
+        operations.check_availability("six", "2025-05-01", "19:00"),
+        operations.check_availability(2, "2025-05-01", "19:00", duration_minutes=1.5),
+        operations.check_availability(2, None, "19:00"),
+        operations.find_open_slots(2, "2025-05-01", "19:00", count=0),
+        operations.find_open_slots(2, 20250501, "19:00"),
+    ):
+        assert not response["success"] and response["error"]
+
+
+class CountingList(list):
+    reads = 0
+
+    def __getitem__(self, index):
+        CountingList.reads += 1
+        return super().__getitem__(index)
+
+
+def test_long_outlier_does_not_widen_lookups():
+    slots = availability._TableSlots()
+    # A month-long private hire, then 500 one-hour bookings a day later
+    slots.add(0, 30 * 1440, rowid=0)
+    first = 31 * 1440
+    intervals = [(first + 90 * i, first + 90 * i + 60) for i in range(500)]
+    for rowid, (start, end) in enumerate(intervals, 1):
+        slots.add(start, end, rowid)
+    for run in slots.runs.values():
+        run.starts = CountingList(run.starts)
+
+    for start in range(first - 60, first + 90 * 500, 45):
+        CountingList.reads = 0
+        expected = max((e for s, e in intervals + [(0, 30 * 1440)] if s < start + 30 and start < e), default=None)
+        assert slots.busy_until(start, start + 30) == expected
+        assert CountingList.reads < 40
+
+    # Once the outlier is gone its run is empty and the table is free during the month
+    slots.remove(0, 30 * 1440, rowid=0)
+    assert slots.busy_until(1440, 1500) is None
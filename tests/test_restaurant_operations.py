@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from restaurant_tools import database_tool, operations
+from restaurant_tools.storage import WriteConflict
+
+pytestmark = pytest.mark.usefixtures("fresh_store")
+
+
+def test_find_and_reserve():
+    tables = operations.find_available_tables(party_size=4)["tables"]
+    assert tables and all(t["capacity"] >= 4 and t["status"] == "available" for t in tables)
+    assert [t["capacity"] for t in tables] == sorted(t["capacity"] for t in tables)
+
+    table_id = tables[0]["id"]
+    booked = operations.create_reservation("Ann", "555-0000", 4, "2025-05-01", "19:00", table_id=table_id)
+    assert booked["success"] and booked["reservation"]["status"] == "confirmed"
+    clash = operations.create_reservation("Bob", "555-0001", 2, "2025-05-01", "19:00", table_id=table_id)
+    assert not clash["success"]
+
+    reservation_id = booked["reservation"]["id"]
+    assert operations.cancel_reservation(reservation_id)["success"]
+    assert not operations.cancel_reservation(reservation_id)["success"]
+    # The exec tools see the typed operations' writes
+    seen = database_tool.read_only_database_query(
+        f"result = [r['status'] for r in db['reservations'] if r['id'] == '{reservation_id}']"
+    )
+    assert seen["result"] == ["cancelled"]
+
+
+def test_exec_writes_return_a_patch():
+    response = database_tool.execute_database_operation("db['tables'][0]['status'] = 'occupied'\nresult = 'done'")
+    assert response["success"] and response["result"] == "done"
+    assert response["patch"] == [{"op": "replace", "path": "/tables/0/status", "value": "occupied"}]
+    assert "modified_db" not in response
+
+
+def test_seat_and_order():
+    seated = operations.seat_from_waitlist()
+    assert seated["success"]
+    assert seated["table"]["status"] == "occupied" and seated["waitlist_entry"]["status"] == "seated"
+    table_id = seated["table"]["id"]
+
+    first = operations.add_order_items(table_id, [{"item_id": "app001", "quantity": 2}])
+    second = operations.add_order_items(table_id, [{"item_id": "main001"}])
+    assert first["success"] and second["order"]["id"] == first["order"]["id"]
+    assert len(second["order"]["items"]) == 2 and second["order"]["total"] > first["order"]["total"]
+    assert not operations.add_order_items(table_id, [{"item_id": "nope"}])["success"]
+
+    menu = operations.get_menu("desserts")["menu"]
+    assert list(menu) == ["desserts"] and all(item["available"] for item in menu["desserts"])
+
+
+def test_patch_size_cap(monkeypatch):
+    monkeypatch.setattr(database_tool, "PATCH_MAX_CHARS", 200)
+    response = database_tool.execute_database_operation(
+        "for t in db['tables']:\n    t['status'] = 'reserved'\n    t['location'] = 'terrace'"
+    )
+    assert response["success"] and response["patch_truncated"]
+    assert len(response["patch"]) < response["patch_ops"] and response["changes"]["tables"]["updated"] > 1
+
+
+def test_order_totals_conflict_with_menu_changes():
+    store = database_tool.get_store()
+    batch = store.batch()
+    menu = batch.get("menu")
+    rowid, table = batch.find("tables", id=1)[0]
+    batch.update("tables", rowid, {**table, "note": f"{len(menu)} categories"})
+    # A price change after the menu was read: the batch must not commit on the old prices
+    database_tool.execute_database_operation("db['menu']['desserts'][0]['price'] = 1.0")
+    with pytest.raises(WriteConflict):
+        store.commit(batch)
+
+
+def test_numeric_arguments_are_validated():
+    assert operations.find_available_tables(party_size="4")["success"]
+    assert operations.find_available_tables(party_size="four")["error"] == "party_size must be a whole number"
+    assert not operations.create_reservation("Ann", "555-0000", 2.5, "2025-05-01", "19:00")["success"]
+    assert not operations.create_reservation("Ann", "555-0000", 2, "2025-05-01", "19:00", table_id="x")["success"]
+    booked = operations.create_reservation("Ann", "555-0000", "2", "2025-05-01", "19:00", table_id="1")
+    assert booked["success"] and booked["reservation"]["party_size"] == 2 and booked["reservation"]["table_id"] == 1
+    bad_quantity = operations.add_order_items(1, [{"item_id": "main001", "quantity": "two"}])
+    assert bad_quantity["error"] == "quantity must be a whole number"
+
+
+def test_exec_tools_return_unexpected_errors(monkeypatch):
+    store = database_tool.get_store()
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "apply_plan", locked)
+    failed = database_tool.execute_database_operation("db['tables'][0]['status'] = 'occupied'")
+    assert failed["success"] is False and failed["error_type"] == "OperationalError"
+
+    monkeypatch.setattr(database_tool, "_run", locked)
+    failed = database_tool.read_only_database_query("result = len(db['tables'])")
+    assert failed["success"] is False and failed["error"] == "database is locked"
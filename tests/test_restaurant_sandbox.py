@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+
+from restaurant_tools import sandbox, storage
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="sandbox workers need fork")
+
+SEED = {"tables": [{"id": 1, "capacity": 2, "status": "available"}, {"id": 2, "capacity": 4, "status": "available"}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    seed_path = tmp_path / "seed.json"
+    seed_path.write_text(json.dumps(SEED))
+    return storage.RestaurantStore(str(tmp_path / "db.sqlite"), seed_path=str(seed_path))
+
+
+@pytest.fixture
+def pool(store):
+    pool = sandbox.WorkerPool(store.path, size=1, timeout=3, cpu_seconds=1, memory_mb=64)
+    yield pool
+    pool.close()
+
+
+def test_worker_writes_come_back_as_plans(store, pool):
+    reply = pool.run("write", "db['tables'][1]['status'] = 'occupied'\nresult = generate_id('T')")
+    assert reply["ok"] and reply["result"].startswith("T")
+    assert store.commit_plan(reply["plan"]) == {"tables": {"inserted": 0, "updated": 1, "deleted": 0}}
+    # The worker catches up on the commit before its next call
+    assert pool.run("read", "result = [t['status'] for t in db['tables']]")["result"] == ["available", "occupied"]
+    assert pool.run("read", "result = db")["result"]["tables"][1]["status"] == "occupied"
+
+
+def test_runaway_code_is_killed_and_the_worker_replaced(pool):
+    spinning = pool.run("read", "while True: pass")
+    assert not spinning["ok"] and spinning["error_type"] == "TimeoutError"
+    sleeping = pool.run("read", "import time\ntime.sleep(30)")
+    assert not sleeping["ok"] and "Timed out" in sleeping["error"]
+    hungry = pool.run("read", "x = bytearray(1024 * 1024 * 1024)")
+    assert not hungry["ok"] and hungry["error_type"] == "MemoryError"
+    assert pool.respawns == 3
+    assert pool.run("read", "result = len(db['tables'])")["result"] == 2
+
+
+def test_errors_keep_the_worker(pool):
+    failed = pool.run("write", "1 / 0")
+    assert failed == {"ok": False, "error": "division by zero", "error_type": "ZeroDivisionError"}
+    assert pool.respawns == 0
@@ -0,0 +1,155 @@
+import importlib.util
+import json
+import multiprocessing
+import os
+import sqlite3
+
+import pytest
+
+STORAGE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "other_stuff", "restaurant_agent", "src", "tools", "storage.py"
+)
+spec = importlib.util.spec_from_file_location("restaurant_storage", STORAGE_PATH)
+storage = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(storage)
+
+SEED = {
+    "restaurant_info": {"name": "Test", "opening_hours": {"monday": "11:00-22:00"}},
+    "tables": [
+        {"id": 1, "capacity": 2, "status": "available"},
+        {"id": 2, "capacity": 4, "status": "occupied"},
+        {"id": 3, "capacity": 4, "status": "available"},
+    ],
+    "reservations": [],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    seed_path = tmp_path / "seed.json"
+    seed_path.write_text(json.dumps(SEED))
+    return storage.RestaurantStore(str(tmp_path / "db.sqlite"), seed_path=str(seed_path))
+
+
+def rows(store, collection):
+    conn = sqlite3.connect(store.path)
+    return [json.loads(data) for (data,) in conn.execute(
+        "SELECT data FROM records WHERE collection = ? ORDER BY pos", (collection,)
+    )]
+
+
+def test_view_copies_only_what_is_touched(store):
+    db = store.view()
+    db["tables"][0]["status"] = "reserved"
+    assert db.touched == {"tables"}
+    # The shared snapshot is untouched until commit
+    assert store.snapshot()["tables"].values()[0]["status"] == "available"
+    assert json.loads(json.dumps(db))["tables"][0]["status"] == "reserved"
+
+
+def test_commit_writes_changed_rows_and_keeps_order(store):
+    db = store.view()
+    db["tables"][1]["status"] = "available"
+    db["tables"].insert(1, {"id": 9, "capacity": 8, "status": "available"})
+    db["reservations"].append({"id": "R1", "table_id": 9, "date": "2025-01-01", "time": "19:00"})
+    summary = store.commit(db)
+
+    assert summary["tables"] == {"inserted": 1, "updated": 1, "deleted": 0}
+    assert summary["reservations"]["inserted"] == 1
+    assert [t["id"] for t in rows(store, "tables")] == [1, 9, 2, 3]
+    assert store.export_dict()["tables"] == rows(store, "tables")
+
+    reopened = storage.RestaurantStore(store.path)
+    assert reopened.export_dict() == store.export_dict()
+
+
+def test_indexes_follow_commits(store):
+    assert [t["id"] for t in store.lookup("tables", status="available", capacity=4)] == [3]
+    db = store.view()
+    db["tables"][1]["status"] = "available"
+    del db["tables"][0]
+    store.commit(db)
+    assert [t["id"] for t in store.lookup("tables", status="available")] == [2, 3]
+    assert store.lookup("tables", capacity=2) == []
+
+
+def test_stale_write_conflicts_and_other_process_commits_are_seen(store):
+    other = storage.RestaurantStore(store.path)
+    stale = store.view()
+    db = other.view()
+    db["tables"][0]["status"] = "occupied"
+    other.commit(db)
+
+    stale["tables"][2]["status"] = "occupied"
+    with pytest.raises(storage.WriteConflict):
+        store.commit(stale)
+    assert store.snapshot()["tables"].values()[0]["status"] == "occupied"
+
+
+def test_writes_to_other_entries_are_rebased_not_rejected(store):
+    stale = store.view()
+    other = storage.RestaurantStore(store.path)
+    db = other.view()
+    db["reservations"].append({"id": "R1"})
+    other.commit(db)
+
+    stale["tables"][0]["status"] = "occupied"
+    store.commit(stale)
+    assert store.stats == {"commits": 1, "rebased": 1, "conflicts": 0}
+    assert store.export_dict()["reservations"] == [{"id": "R1"}]
+
+
+def _increment(path, times, errors):
+    store = storage.RestaurantStore(path)
+    for _ in range(times):
+        for attempt in range(50):
+            db = store.view()
+            db["tables"][0]["capacity"] += 1
+            try:
+                store.commit(db)
+                break
+            except storage.WriteConflict:
+                storage.conflict_backoff(min(attempt, 5))
+        else:
+            errors.put(1)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_concurrent_sessions_lose_no_updates(store):
+    context = multiprocessing.get_context("fork")
+    errors = context.Queue()
+    sessions = [context.Process(target=_increment, args=(store.path, 20, errors)) for _ in range(4)]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join(timeout=60)
+    assert errors.empty()
+    assert store.snapshot()["tables"].values()[0]["capacity"] == 2 + 4 * 20
+
+
+def test_json_patch_turns_before_into_after(store):
+    import random
+
+    import jsonpatch
+
+    rng = random.Random(7)
+    for round_ in range(30):
+        db = store.view()
+        tables = db["tables"]
+        for step in range(rng.randint(1, 4)):
+            action = rng.choice(["edit", "insert", "delete", "append"])
+            if action == "edit" and tables:
+                rng.choice(tables)["status"] = rng.choice(["available", "occupied", "reserved"])
+            elif action == "insert":
+                tables.insert(rng.randint(0, len(tables)), {"id": 100 + round_ * 10 + step, "capacity": 2, "status": "available"})
+            elif action == "delete" and tables:
+                del tables[rng.randrange(len(tables))]
+            else:
+                tables.append({"id": 500 + round_ * 10 + step, "capacity": 6, "status": "available"})
+        db["restaurant_info"]["name"] = f"Test {round_}"
+        plan = store.plan(db)
+        before, after, _ = store.apply_plan(plan)
+        patch = storage.json_patch(before, after, plan)
+        assert jsonpatch.apply_patch(before.to_dict(), patch) == after.to_dict() == store.export_dict()
+        # The incrementally carried order matches a fresh sort
+        assert after["tables"].order() == sorted(after["tables"].rows, key=lambda r: (after["tables"].rows[r][0], r))
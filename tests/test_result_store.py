@@ -0,0 +1,46 @@
+import importlib.util
+import json
+import os
+
+# restaurant_agent's package is also called `src`, so load the module by path
+_spec = importlib.util.spec_from_file_location(
+    "restaurant_result_store",
+    os.path.join(os.path.dirname(__file__), '..', 'other_stuff', 'restaurant_agent', 'src', 'tools', 'result_store.py')
+)
+result_store = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(result_store)
+
+DB = json.load(open(os.path.join(os.path.dirname(__file__), '..', 'other_stuff', 'restaurant_agent', 'restaurant_database.json')))
+
+
+def test_handles_are_stable_and_stored_once():
+    store = result_store.ResultStore()
+    handle = store.put(DB)
+    assert store.put(json.loads(json.dumps(DB))) == handle
+    assert handle.startswith("res_") and len(store._results) == 1
+
+
+def test_fetch_slices_and_projections():
+    store = result_store.ResultStore()
+    handle = store.put(DB)
+
+    assert store.fetch(handle, "tables[0]")["result"] == DB["tables"][0]
+    assert store.fetch(handle, "tables[1:3]")["result"] == DB["tables"][1:3]
+    assert store.fetch(handle, "tables[*].status")["result"] == [t["status"] for t in DB["tables"]]
+    assert store.fetch(handle, "restaurant_info.name")["result"] == DB["restaurant_info"]["name"]
+
+
+def test_fetch_reports_bad_paths_and_large_slices():
+    store = result_store.ResultStore(max_fetch_chars=100)
+    handle = store.put(DB)
+
+    assert not store.fetch(handle, "tables[99]")["success"]
+    assert not store.fetch("res_missing", "tables")["success"]
+    large = store.fetch(handle, "menu")
+    assert large["truncated"] and "appetizers" in large["summary"]
+
+
+def test_summary_is_bounded():
+    summary = result_store.summarize({"rows": [{"x": "y" * 1000}] * 1000, "name": "n"}, max_chars=300)
+    assert len(summary) <= 300
+    assert summary.startswith("rows: list[1000]")
@@ -0,0 +1,40 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.retrieval.backends import LocalHybridBackend
+
+DOCUMENTS = [
+    "The nations table contains n_nationkey, n_name, n_regionkey and n_comment.",
+    "The region table holds r_regionkey, r_name and r_comment for the five regions.",
+    "Order totals are calculated as the sum of extendedprice * (1 - discount) * (1 + tax).",
+    "Order status is F when all line items are filled.",
+]
+
+
+def test_hybrid_ranking():
+    backend = LocalHybridBackend(DOCUMENTS)
+    results = backend.search("How are order totals calculated?")
+
+    assert results[0]["text"] == DOCUMENTS[2]
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert all(set(r) >= {"text", "score"} for r in results)
+
+
+def test_lexical_interpolation_bounds():
+    lexical_only = LocalHybridBackend(DOCUMENTS, lexical_interpolation=1.0)
+    top = lexical_only.search("n_regionkey")[0]
+
+    assert top["text"] == DOCUMENTS[0]
+    assert top["score"] == 1.0
+
+
+def test_limit_and_from_path(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(json.dumps({"text": d, "source": "tpch"}) for d in DOCUMENTS))
+    backend = LocalHybridBackend.from_path(str(corpus), limit=2)
+
+    results = backend.search("nations table")
+    assert len(results) == 2
+    assert results[0]["source"] == "tpch"
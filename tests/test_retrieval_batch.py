@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.retrieval.batch import search_many
+
+
+def test_search_many_dedupes_and_keeps_order():
+    calls = []
+
+    def search_fn(query):
+        calls.append(query)
+        return [query.upper()]
+
+    results = search_many(["Nations table", "regions table", "nations table?"], search_fn)
+
+    assert list(results) == ["Nations table", "regions table"]
+    assert results["regions table"] == ["REGIONS TABLE"]
+    assert sorted(calls) == ["Nations table", "regions table"]
+
+
+def test_search_many_isolates_errors():
+    def search_fn(query):
+        if query == "bad":
+            raise RuntimeError("boom")
+        return [query]
+
+    results = search_many(["good", "bad"], search_fn)
+
+    assert results["good"] == ["good"]
+    assert results["bad"] == {"error": "RuntimeError: boom"}
@@ -0,0 +1,71 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.retrieval.cache import RetrievalCache, normalize_query
+
+
+def make_cache(tmp_path, **kwargs):
+    return RetrievalCache(path=str(tmp_path / "cache.sqlite"), **kwargs)
+
+
+def test_normalize_query():
+    assert normalize_query("  Describe the NATIONS table. ") == "describe the nations table"
+
+
+def test_exact_and_semantic_tiers(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    def fetch(query):
+        calls.append(query)
+        return [{"text": f"chunk for {query}", "score": 0.9}]
+
+    first = cache.get_or_fetch("Describe the nations table.", fetch)
+    assert cache.get_or_fetch("describe the nations table", fetch) == first
+    assert cache.get_or_fetch("What is the nations table?", fetch) == first
+    cache.get_or_fetch("Describe the regions table.", fetch)
+
+    assert calls == ["Describe the nations table.", "Describe the regions table."]
+    stats = cache.stats.snapshot()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_persistence_and_corpus_version(tmp_path):
+    make_cache(tmp_path).put("nations table", ["a"])
+
+    assert make_cache(tmp_path).get("nations table") == ["a"]
+    assert make_cache(tmp_path, corpus_version="2").get("nations table") is None
+
+
+def test_ttl_expiry(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=-1)
+    cache.put("nations table", ["a"])
+    assert cache.get("nations table") is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("nations table", ["a"])
+    cache.put("regions table", ["b"])
+    cache.get("nations table")
+    cache.put("order totals", ["c"])
+
+    assert cache.get("regions table") is None
+    assert cache.get("nations table") == ["a"]
+    assert cache.get("order totals") == ["c"]
+
+
+def test_switching_embedders(tmp_path):
+    from shared.retrieval.embeddings import HashingEmbedder
+
+    class SmallEmbedder(HashingEmbedder):
+        name = "small"
+
+    make_cache(tmp_path, embedder=HashingEmbedder(dim=512)).put("nations table", ["a"])
+    # Vectors of another embedder are neither compared nor served
+    small = make_cache(tmp_path, embedder=SmallEmbedder(dim=384))
+    assert small.get("nations table") is None
+    assert small.get("the nations table") is None
+    small.put("nations table", ["b"])
+    assert make_cache(tmp_path, embedder=HashingEmbedder(dim=512)).get("nations table") == ["a"]
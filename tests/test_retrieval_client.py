@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import random
+import sys
+
+import httpx
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.retrieval import client as vectara
+from shared.retrieval.client import AsyncVectaraClient, VectaraClient
+
+RESULTS = [{"text": "The nations table", "score": 0.9}]
+
+
+def response(status: int, body: dict = None, headers: dict = None) -> requests.Response:
+    reply = requests.Response()
+    reply.status_code = status
+    reply._content = json.dumps(body or {}).encode()
+    reply.headers.update(headers or {})
+    return reply
+
+
+def refused() -> requests.ConnectionError:
+    return requests.ConnectionError(MaxRetryError(None, "/v2/chats", NewConnectionError(None, "Connection refused")))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(vectara.time, "sleep", delays.append)
+    return delays
+
+
+def scripted_client(mode: str, replies: list, max_retries: int = 3) -> tuple:
+    """VectaraClient whose session answers with `replies` in turn (exceptions are raised)"""
+    client = VectaraClient(api_key="test", base_url="http://vectara.test", mode=mode, max_retries=max_retries)
+    calls = []
+
+    def post(url, json=None, timeout=None):
+        calls.append(url)
+        reply = replies[min(len(calls), len(replies)) - 1]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    client.session.post = post
+    return client, calls
+
+
+def test_modes_pick_endpoint_and_body():
+    path, body = vectara._request_for("search", "nations")
+    assert path == "/v2/query" and "generation" not in body and "chat" not in body
+    assert vectara._is_idempotent(body)
+    path, body = vectara._request_for("chat", "nations")
+    assert path == "/v2/chats" and body["chat"] == {"store": True}
+    assert not vectara._is_idempotent(body)
+    with pytest.raises(ValueError):
+        VectaraClient(mode="generate")
+
+
+def test_backoff_is_jittered_exponential_and_capped(monkeypatch):
+    policy = vectara._RetryPolicy(max_retries=3, backoff_base=0.5, backoff_max=3.0)
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    assert [policy.delay(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    monkeypatch.undo()
+
+    random.seed(3)
+    delays = [policy.delay(2) for _ in range(200)]
+    assert all(0 <= delay <= 2.0 for delay in delays) and len(set(delays)) > 100
+    # A numeric Retry-After wins but is still capped
+    assert policy.delay(0, "1.5") == 1.5 and policy.delay(0, "60") == 3.0
+    assert 0 <= policy.delay(0, "Wed, 21 Oct 2026 07:28:00 GMT") <= 0.5
+
+
+def test_retries_stop_at_the_cap(sleeps):
+    client, calls = scripted_client("search", [response(503)], max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        client.search("nations")
+    assert len(calls) == 3 and len(sleeps) == 2
+
+
+def test_search_mode_retries_timeouts_and_server_errors(sleeps):
+    replies = [requests.ReadTimeout("read timed out"), response(429, headers={"Retry-After": "0.25"}),
+               response(200, {"search_results": RESULTS})]
+    client, calls = scripted_client("search", replies)
+    assert client.search("nations") == RESULTS
+    assert len(calls) == 3 and sleeps[1] == 0.25
+
+
+def test_stored_chats_are_not_resent_after_a_read_timeout(sleeps):
+    client, calls = scripted_client("chat", [requests.ReadTimeout("read timed out")])
+    with pytest.raises(requests.ReadTimeout):
+        client.search("nations")
+    assert len(calls) == 1 and sleeps == []
+
+    # Refused connections and 5xx never created the chat turn, so they are retried
+    client, calls = scripted_client("chat", [refused(), response(502), response(200, {"search_results": RESULTS})])
+    assert client.search("nations") == RESULTS
+    assert len(calls) == 3
+
+
+def test_async_client_applies_the_same_policy(monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(vectara.asyncio, "sleep", no_sleep)
+
+    async def run(mode: str, failure: Exception) -> tuple:
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if len(calls) == 1:
+                raise failure
+            return httpx.Response(200, json={"search_results": RESULTS})
+
+        client = AsyncVectaraClient(api_key="test", base_url="http://vectara.test", mode=mode)
+        client.client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        try:
+            return await client.search("nations"), calls
+        except httpx.HTTPError as e:
+            return e, calls
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run("search", httpx.ReadTimeout("read timed out"))) == (RESULTS, ["/v2/query"] * 2)
+    error, calls = asyncio.run(run("chat", httpx.ReadTimeout("read timed out")))
+    assert isinstance(error, httpx.ReadTimeout) and calls == ["/v2/chats"]
+    assert asyncio.run(run("chat", httpx.ConnectError("refused"))) == (RESULTS, ["/v2/chats"] * 2)
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.retrieval.packing import ContextPacker, count_tokens, strip_tags
+
+NATIONS = "The nations table stores n_nationkey, n_name, n_regionkey and a free-text n_comment column."
+
+
+def test_strip_tags():
+    assert strip_tags("Before %START_SNIPPET%hit%END_SNIPPET% after") == "Before hit after"
+
+
+def test_pack_removes_near_duplicates_across_subqueries():
+    packer = ContextPacker(token_budget=1000)
+    packed = packer.pack([
+        [f"%START_SNIPPET%{NATIONS}%END_SNIPPET%"],
+        [NATIONS + " ", "The region table has five rows."],
+    ])
+
+    assert packed == [[NATIONS], ["The region table has five rows."]]
+
+
+def test_pack_respects_budget_by_rank():
+    chunks = [" ".join(f"w{i}_{j}" for j in range(20)) for i in range(4)]
+    budget = count_tokens(chunks[0]) * 2
+    packed = ContextPacker(token_budget=budget).pack([chunks[:2], chunks[2:]])
+
+    # Each subquery's best chunk is kept before any subquery's second
+    assert packed == [[chunks[0]], [chunks[2]]]
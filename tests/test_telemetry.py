@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from shared.telemetry import (
+    JsonlExporter, OTLPJsonExporter, Tracer, bind_context, phase, set_tracer, tool_span, traced_completion
+)
+from shared.telemetry.report import load_traces, summarize
+
+
+class FakeCompletions:
+    def create(self, **kwargs):
+        return SimpleNamespace(
+            model=kwargs["model"],
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3),
+            choices=[SimpleNamespace(finish_reason="stop", message=SimpleNamespace(content="ok"))]
+        )
+
+
+def test_spans_nest_across_threads(tmp_path):
+    tracer = Tracer(exporters=[JsonlExporter(str(tmp_path / "spans.jsonl"))])
+    set_tracer(tracer)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+
+    def tool(name):
+        with tool_span(name):
+            return name
+
+    try:
+        with phase("query"):
+            with phase("attempt", attempt=1):
+                traced_completion(client, model="gpt-4o-mini", messages=[])
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    list(pool.map(bind_context(tool), ["rag_search", "rag_search"]))
+    finally:
+        set_tracer(None)
+        tracer.close()
+
+    spans = {span.name: span for span in tracer.spans()}
+    llm = spans["chat gpt-4o-mini"]
+    assert llm.phase == "attempt"
+    assert llm.parent_id == spans["attempt"].span_id
+    assert llm.attributes["prompt_tokens"] == 12 and llm.attributes["retries"] == 0
+    tool_spans = [span for span in tracer.spans() if span.kind == "tool"]
+    assert len(tool_spans) == 2
+    assert all(span.parent_id == spans["attempt"].span_id for span in tool_spans)
+    assert len({span.trace_id for span in tracer.spans()}) == 1
+
+    (trace_id, trace), = load_traces(str(tmp_path / "spans.jsonl")).items()
+    summary = summarize(trace)
+    assert summary["name"] == "query"
+    assert summary["llm"]["calls"] == 1 and summary["llm"]["prompt_tokens"] == 12
+    assert summary["tools"]["rag_search"]["calls"] == 2
+
+
+def test_otlp_export_records_errors(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    tracer = Tracer(service_name="corag", exporters=[OTLPJsonExporter(str(path))])
+    set_tracer(tracer)
+    try:
+        with phase("act"):
+            try:
+                with tool_span("get_menu"):
+                    raise ValueError("no menu")
+            except ValueError:
+                pass
+    finally:
+        set_tracer(None)
+        tracer.close()
+
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    resource = requests[0]["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"]["stringValue"] == "corag"
+    span = resource["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "tool get_menu"
+    assert span["status"] == {"code": 2, "message": "ValueError: no menu"}
+    assert {"key": "gen_ai.tool.name", "value": {"stringValue": "get_menu"}} in span["attributes"]
+    assert len(span["traceId"]) == 32 and len(span["parentSpanId"]) == 16
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+
+def test_exporters_write_spans_in_batches(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    exporter = OTLPJsonExporter(str(path))
+    disk = threading.Event()
+    write = exporter._write
+
+    def stalled_write(data):
+        disk.wait(5)
+        write(data)
+
+    exporter._write = stalled_write
+    tracer = Tracer(service_name="corag", exporters=[exporter])
+    # Spans end while the writer is stuck on the disk
+    for i in range(50):
+        with tracer.span(f"step {i}"):
+            pass
+    disk.set()
+    tracer.close()
+
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    names = [
+        span["name"] for request in requests for span in request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    ]
+    assert names == [f"step {i}" for i in range(50)]
+    # At most the first span was written on its own; the rest queued up into one request
+    assert len(requests) <= 2